@@ -1,5 +1,4 @@
 import React, { useState, useEffect } from 'react';
-import neo4j from 'neo4j-driver';
 import { Card, CardHeader, CardTitle, CardContent } from './ui/card';
 import RepetitiveContractsChart from './ui/RepetitiveContractsChart';
 import BuyerDetailsChart from './charts/BuyerDetailsChart';
@@ -7,6 +6,7 @@ import { Badge } from './ui/badge';
 import { AlertTriangle, DollarSign, Users, TrendingUp, Building2, FileCheck } from 'lucide-react';
 import { BarChart, Bar, XAxis, YAxis, Tooltip, ResponsiveContainer } from 'recharts';
 import { useNavigate } from 'react-router-dom'; // Importa useNavigate
+import { fetchPage } from '../utils/api';
 
 const Dashboard = () => {
     const navigate = useNavigate(); // Inicializa useNavigate para navegación
@@ -28,92 +28,23 @@ const Dashboard = () => {
 
     useEffect(() => {
         const fetchData = async () => {
-            let driver = null;
-            let session = null;
-
             try {
-                driver = neo4j.driver(
-                    'bolt://localhost:7687',
-                    neo4j.auth.basic('neo4j', ':kJ7k,G+87.W')
-                );
-
-                await driver.verifyConnectivity();
-                session = driver.session();
-
-                // Estadísticas generales
-                const statsResult = await session.run(`
-                    CALL {
-                        MATCH (b:Buyer) RETURN count(b) as buyers
-                    }
-                    CALL {
-                        MATCH (s:Supplier) RETURN count(s) as suppliers
-                    }
-                    CALL {
-                        MATCH (p:Procurement) RETURN count(p) as procurements
-                    }
-                    CALL {
-                        MATCH (a:Award) RETURN count(a) as awards
-                    }
-                    RETURN buyers, suppliers, procurements, awards
-                `);
-
-                // Top 5 compradores
-                const buyersResult = await session.run(`
-                    MATCH (b:Buyer)-[:PUBLISHED]->(p:Procurement)
-                    WITH b.name as name, count(p) as total
-                    ORDER BY total DESC
-                    LIMIT 5
-                    RETURN name, total
-                `);
-
-                // Top 5 proveedores
-                const suppliersResult = await session.run(`
-                    MATCH (s:Supplier)<-[:AWARDED_TO]-(a:Award)
-                    WITH s.name as name, count(a) as awards
-                    ORDER BY awards DESC
-                    LIMIT 5
-                    RETURN name, awards
-                `);
-
-                // Proveedores frecuentes (más de 5 adjudicaciones)
-                const frequentSuppliersResult = await session.run(`
-                    MATCH (s:Supplier)<-[:AWARDED_TO]-(a:Award)
-                    WITH s, count(a) as awards
-                    WHERE awards > 5
-                    RETURN count(s) as count
-                `);
-
-                // Contratos repetitivos (más de 3 adjudicaciones por el mismo proveedor)
-                const repetitiveContractsResult = await session.run(`
-                    MATCH (b:Buyer)-[:PUBLISHED]->(p:Procurement)-[:HAS_AWARD]->(a:Award)-[:AWARDED_TO]->(s:Supplier)
-                    WITH b.name AS entidad, s.name AS proveedor, count(a) AS adjudicaciones
-                    WHERE adjudicaciones > 3
-                    RETURN entidad, proveedor, adjudicaciones
-                    ORDER BY adjudicaciones DESC
-                    LIMIT 10
-                `);
+                // Resumen que arma la carga: totales, top 5 y contratos repetitivos
+                const summary = await fetchPage('summary');
+                if (!summary.items.length) {
+                    throw new Error('No hay resumen del dashboard; ejecute la carga de datos');
+                }
+                const { generalStats, topBuyers, topSuppliers, frequentSuppliers, repetitiveContracts } =
+                    summary.items[0];
 
                 setMetrics({
-                    generalStats: {
-                        buyers: statsResult.records[0].get('buyers').toNumber(),
-                        suppliers: statsResult.records[0].get('suppliers').toNumber(),
-                        procurements: statsResult.records[0].get('procurements').toNumber(),
-                        awards: statsResult.records[0].get('awards').toNumber()
-                    },
-                    topBuyers: buyersResult.records.map(record => ({
-                        name: record.get('name'),
-                        total: record.get('total').toNumber()
-                    })),
-                    topSuppliers: suppliersResult.records.map(record => ({
-                        name: record.get('name'),
-                        awards: record.get('awards').toNumber()
-                    })),
-                    frequentSuppliers: frequentSuppliersResult.records[0].get('count').toNumber(),
-                    repetitiveContracts: repetitiveContractsResult.records.map(record => ({
-                        entidad: record.get('entidad'),
-                        proveedor: record.get('proveedor'),
-                        adjudicaciones: record.get('adjudicaciones').toNumber()
-                    }))
+                    generalStats,
+                    topBuyers: topBuyers.slice(0, 5),
+                    topSuppliers: topSuppliers.slice(0, 5),
+                    // Proveedores frecuentes (más de 5 adjudicaciones)
+                    frequentSuppliers,
+                    // Contratos repetitivos (más de 3 adjudicaciones por el mismo proveedor)
+                    repetitiveContracts
                 });
 
                 setLoading(false);
@@ -122,9 +53,6 @@ const Dashboard = () => {
                 console.error('Error:', e);
                 setError(e.message);
                 setLoading(false);
-            } finally {
-                if (session) await session.close();
-                if (driver) await driver.close();
             }
         };
 
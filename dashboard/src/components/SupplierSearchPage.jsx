@@ -13,7 +13,7 @@ import {
     Users,
     Clock
 } from 'lucide-react';
-import neo4j from 'neo4j-driver';
+import { fetchPage } from '../utils/api';
 
 // Componente de Skeleton para carga
 const SupplierCardSkeleton = () => (
@@ -34,49 +34,18 @@ const SupplierSearchPage = () => {
 
     const handleSearch = async () => {
         setIsLoading(true);
-        let driver = null;
-        let session = null;
-
         try {
-            driver = neo4j.driver(
-                'bolt://localhost:7687',
-                neo4j.auth.basic('neo4j', ':kJ7k,G+87.W')
-            );
-
-            session = driver.session();
-
-            const result = await session.run(`
-                MATCH (s:Supplier)
-                WHERE toLower(s.name) CONTAINS toLower($searchTerm)
-                OPTIONAL MATCH (s)<-[:AWARDED_TO]-(a)
-                OPTIONAL MATCH (a)-[:HAS_AWARD]->(p:Procurement)-[:PUBLISHED]->(b:Buyer)
-                WITH s, a, b, p
-                RETURN 
-                    s.name AS NombreProveedor, 
-                    s.ruc AS RUC,
-                    count(DISTINCT a) AS TotalAdjudicaciones,
-                    count(DISTINCT b) AS CompradoresUnicos,
-                    CASE 
-                        WHEN count(a) > 0 
-                        THEN round(100.0 * count(CASE WHEN p.quickAward = true THEN 1 END) / count(a))
-                        ELSE 0 
-                    END AS PorcentajeAdjudicacionesRapidas,
-                    CASE 
-                        WHEN count(a) > 0 
-                        THEN round(avg(toFloat(a.value)))
-                        ELSE 0 
-                    END AS ValorPromedioContrato
-            `, { searchTerm: searchTerm });
-
-            console.log('Resultado de la consulta:', result.records);
-
-            const formattedResults = result.records.map(record => ({
-                name: record.get('NombreProveedor'),
-                ruc: record.get('RUC') || 'No disponible',
-                totalAwards: record.get('TotalAdjudicaciones').low,
-                uniqueBuyers: record.get('CompradoresUnicos').low,
-                quickAwardRatio: parseFloat(record.get('PorcentajeAdjudicacionesRapidas')),
-                avgContractValue: parseFloat(record.get('ValorPromedioContrato'))
+            const result = await fetchPage('suppliers/search', { q: searchTerm });
+
+            console.log('Resultado de la consulta:', result.items);
+
+            const formattedResults = result.items.map(record => ({
+                name: record.NombreProveedor,
+                ruc: record.RUC || 'No disponible',
+                totalAwards: record.TotalAdjudicaciones,
+                uniqueBuyers: record.CompradoresUnicos,
+                quickAwardRatio: parseFloat(record.PorcentajeAdjudicacionesRapidas),
+                avgContractValue: parseFloat(record.ValorPromedioContrato)
             }));
 
             console.log('Resultados formateados:', formattedResults);
@@ -85,8 +54,6 @@ const SupplierSearchPage = () => {
         } catch (error) {
             console.error('Error en la búsqueda:', error);
         } finally {
-            if (session) await session.close();
-            if (driver) await driver.close();
             setIsLoading(false);
         }
     };
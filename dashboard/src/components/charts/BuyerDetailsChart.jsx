@@ -3,7 +3,7 @@ import { Card, CardHeader, CardTitle, CardContent } from '../ui/card';
 import { Dialog, DialogContent, DialogHeader, DialogTitle } from '../ui/dialog';
 import { AlertTriangle } from 'lucide-react';
 import { BarChart, Bar, XAxis, YAxis, Tooltip, ResponsiveContainer } from 'recharts';
-import neo4j from 'neo4j-driver';
+import { fetchPage } from '../../utils/api';
 
 const BuyerDetailsChart = ({ data }) => {
     const [isModalOpen, setIsModalOpen] = useState(false);
@@ -12,37 +12,13 @@ const BuyerDetailsChart = ({ data }) => {
     const handleBarClick = async (data) => {
         if (!data.payload) return;
 
-        let driver = null;
-        let session = null;
-
         try {
-            driver = neo4j.driver(
-                'bolt://localhost:7687',
-                neo4j.auth.basic('neo4j', ':kJ7k,G+87.W')
-            );
-
-            session = driver.session();
-
-            const result = await session.run(`
-                MATCH (b:Buyer)-[:PUBLISHED]->(p:Procurement)-[:HAS_AWARD]->(a:Award)-[:AWARDED_TO]->(s:Supplier)
-                WHERE b.name = $buyerName
-                RETURN s.name as proveedor,
-                       count(a) as adjudicaciones,
-                       sum(toFloat(a.value)) as montoTotal
-                ORDER BY adjudicaciones DESC
-                LIMIT 10
-            `, {
-                buyerName: data.payload.name
-            });
+            const result = await fetchPage('buyers/suppliers', { name: data.payload.name, limit: 10 });
 
             const details = {
                 name: data.payload.name,
                 total: data.payload.total,
-                suppliers: result.records.map(record => ({
-                    proveedor: record.get('proveedor'),
-                    adjudicaciones: record.get('adjudicaciones').toNumber(),
-                    montoTotal: record.get('montoTotal')
-                }))
+                suppliers: result.items
             };
 
             setBuyerDetails(details);
@@ -50,9 +26,6 @@ const BuyerDetailsChart = ({ data }) => {
 
         } catch (error) {
             console.error("Error:", error);
-        } finally {
-            if (session) await session.close();
-            if (driver) await driver.close();
         }
     };
 
@@ -4,7 +4,7 @@ import { Dialog, DialogContent, DialogHeader, DialogTitle } from './dialog';
 import { ScrollArea } from './scroll-area';
 import { AlertTriangle } from 'lucide-react';
 import { BarChart, Bar, XAxis, YAxis, Tooltip, ResponsiveContainer } from 'recharts';
-import neo4j from 'neo4j-driver';
+import { fetchPage } from '../../utils/api';
 
 // Agrega esta función al principio de tu componente, después de tus imports o estado inicial
 const formatAmountWithCurrency = (amount, currency) => {
@@ -38,43 +38,20 @@ const RepetitiveContractsChart = ({ data }) => {
 
         console.log("Procesando entrada:", entry);
 
-        let driver = null;
-        let session = null;
-
         try {
-            driver = neo4j.driver(
-                'bolt://localhost:7687',
-                neo4j.auth.basic('neo4j', ':kJ7k,G+87.W')
-            );
-
-            session = driver.session();
-
-            const result = await session.run(`
-            MATCH (b:Buyer)-[:PUBLISHED]->(p:Procurement)-[:HAS_AWARD]->(a:Award)-[:AWARDED_TO]->(s:Supplier)
-            WHERE s.name = $supplierName
-            RETURN 
-                b.name as entidad,
-                p.ocid as ocid,
-                COALESCE(p.description, 'Sin descripción') as description,
-                toFloat(a.value) as amount,
-                a.currency as currency,
-                p.publishedDate as date
-            ORDER BY date DESC
-        `, {
-                supplierName: entry.proveedor
-            });
+            const result = await fetchPage('suppliers/contracts', { name: entry.proveedor, limit: 500 });
 
-            console.log("Resultado de Neo4j:", result.records);
+            console.log("Resultado de la API:", result.items);
 
-            const contracts = result.records.map(record => {
-                const amount = parseFloat(record.get('amount')); // Convertimos el monto a número si no lo es
-                const currency = record.get('currency'); // Capturamos la moneda
-                const date = record.get('date');
+            const contracts = result.items.map(record => {
+                const amount = parseFloat(record.amount); // Convertimos el monto a número si no lo es
+                const currency = record.currency; // Capturamos la moneda
+                const date = record.date;
 
                 return {
-                    ocid: record.get('ocid'),
-                    entidad: record.get('entidad'),
-                    description: record.get('description'),
+                    ocid: record.ocid,
+                    entidad: record.entidad,
+                    description: record.description,
                     amount: amount || 0, // Manejamos valores nulos
                     currency: currency,
                     date: date ? new Date(date).toLocaleDateString() : 'Fecha no disponible'
@@ -102,9 +79,6 @@ const RepetitiveContractsChart = ({ data }) => {
         } catch (error) {
             console.error("Error al obtener detalles del contrato:", error);
             console.error("Stack trace:", error.stack);
-        } finally {
-            if (session) await session.close();
-            if (driver) await driver.close();
         }
     };
 
@@ -0,0 +1,15 @@
+// src/utils/api.js
+// Cliente de la API de lectura (grafos-implementacion-python/Grafos/read_api.py)
+const API_URL = import.meta.env.VITE_API_URL || '';
+
+export const fetchPage = async (path, params = {}) => {
+    const query = new URLSearchParams(
+        Object.entries(params).filter(([, value]) => value !== undefined && value !== null)
+    );
+    const response = await fetch(`${API_URL}/api/${path}${query.size ? `?${query}` : ''}`);
+    if (!response.ok) {
+        throw new Error(`Error ${response.status} al consultar /api/${path}`);
+    }
+    // { generation, skip, limit, items, count }
+    return response.json();
+};
@@ -4,4 +4,10 @@ import react from '@vitejs/plugin-react'
 // https://vite.dev/config/
 export default defineConfig({
   plugins: [react()],
+  server: {
+    // API de lectura (read_api.py) en desarrollo
+    proxy: {
+      '/api': 'http://localhost:8000',
+    },
+  },
 })
@@ -0,0 +1,93 @@
+"""Compara el pico de memoria (RSS) de la lectura completa con json.load frente al camino
+de la carga: staging SQLite, lectura por lotes con payloads() y project_rows de cada lote,
+para entradas de tamaño creciente.
+
+Uso: python benchmarks/bench_memoria.py --sizes 10000 50000 200000
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+GRAFOS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_input(path, count, seed=42):
+    """Archivo `{"records": [...]}` con ~10% de OCID duplicados"""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('{"records": [\n')
+        for index in range(count):
+            ocid = f"ocds-bench-{rng.randrange(int(count * 0.9) + 1)}"
+            record = {
+                'ocid': ocid,
+                'compiledRelease': {
+                    'ocid': ocid,
+                    'publishedDate': f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T10:00:00-05:00",
+                    'buyer': {'id': f"PE-CONSUCODE-{rng.randrange(500)}", 'name': 'ENTIDAD'},
+                    'planning': {'budget': {'description': 'Fondos Públicos' * 10}},
+                    'tender': {
+                        'id': str(index), 'title': 'AS-SM-1-2024', 'description': 'SERVICIO ' * 40,
+                        'mainProcurementCategory': 'services',
+                        'items': [{'id': f"{index}-{i}", 'description': 'ITEM ' * 20, 'quantity': 1.0}
+                                  for i in range(3)],
+                    },
+                    'awards': [{'id': f"{index}-a", 'value': {'amount': rng.random() * 1e5, 'currency': 'PEN'},
+                                'suppliers': [{'id': f"PE-RUC-{rng.randrange(5000)}", 'name': 'PROVEEDOR'}]}],
+                },
+            }
+            file.write(('' if index == 0 else ',\n') + json.dumps(record, indent=4))
+        file.write('\n]}\n')
+
+
+def measure(mode, path):
+    """Ejecuta el modo en un subproceso limpio y devuelve su RSS máximo en MB"""
+    code = f"""
+import json, resource, sys
+sys.path.insert(0, {GRAFOS_DIR!r})
+from projection import project_rows
+from record_stream import RecordSource
+from staging import StagingStore, decode_payload
+if {mode!r} == 'json.load':
+    with open({path!r}, encoding='utf-8') as file:
+        records = json.load(file)['records']
+    latest = {{}}
+    for record in records:
+        latest.setdefault(record['compiledRelease']['ocid'], []).append(record)
+    count = len(latest)
+else:
+    store = StagingStore(RecordSource({path!r}), cache_mb=16)
+    count = 0
+    for entries in store.payloads(5000):
+        rows = project_rows(decode_payload(payload) for _, _, payload in entries)
+        count += len(rows.procurements)
+    store.close()
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+    output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return int(output.strip()) / divisor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 20000, 80000])
+    args = parser.parse_args()
+
+    print(f"{'registros':>10} {'archivo MB':>11} {'json.load MB':>13} {'staging MB':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f"bench-{size}.json")
+            write_input(path, size)
+            file_mb = os.path.getsize(path) / (1024 * 1024)
+            print(f"{size:>10} {file_mb:>11.1f} {measure('json.load', path):>13.1f} "
+                  f"{measure('staging', path):>11.1f}")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""Benchmarks del pipeline sobre datos sintéticos (synthetic_ocds.py) con comparación
+contra una línea base guardada.
+
+Mide el parseo, la deduplicación en el staging, la proyección, el pipeline de
+transformación con cada cantidad de procesos de --processes (transform@N, para ver cómo
+escala con los núcleos), cada algoritmo de análisis en Python y, si se indica --neo4j-uri,
+la carga completa en una base local (que se vacía). Cada medición es la mejor de --repeat
+ejecuciones.
+
+Uso: python benchmarks/bench_pipeline.py --sizes 1000 10000 --save-baseline base.json
+     python benchmarks/bench_pipeline.py --sizes 1000 10000 --baseline base.json
+     python benchmarks/bench_pipeline.py --sizes 10000000 --only parse dedup --ndjson
+     python benchmarks/bench_pipeline.py --sizes 200000 --only transform --processes 1 2 4 8
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+GRAFOS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GRAFOS_DIR)
+
+from cooccurrence import supplier_pairs
+from projection import project_rows
+from record_stream import RecordSource
+from related_time import related_time_edges
+from risk_scoring import (daily_activity, high_frequency_suppliers, potential_splitting, quick_awards,
+                          unusual_amounts)
+from staging import StagingStore
+from synthetic_ocds import SyntheticOCDS, write_json, write_shards
+from transform_pipeline import TransformPipeline
+
+ANALYSES = ['related_time', 'high_frequency', 'quick_awards', 'unusual_amounts', 'regional_cooperation',
+            'splitting', 'daily_activity']
+BENCHMARKS = ['generate', 'parse', 'dedup', 'read_staging', 'projection', 'transform'] + ANALYSES + ['neo4j_load']
+# Por debajo de este tiempo la variación es ruido y no se reporta como regresión
+MIN_SECONDS = 0.05
+
+
+def measure(func, repeat):
+    """Mejor tiempo de `repeat` ejecuciones y lo que devolvió la última (filas procesadas)"""
+    best, rows = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return {'seconds': round(best, 6), 'rows': rows,
+            'rowsPerSecond': round(rows / best, 1) if rows and best > 0 else None}
+
+
+def related_time_input(rows):
+    """Tuplas (comprador, ocid, epoch_ms, categoría) como las lee create_related_time"""
+    procurements = []
+    for edge in rows.published.values():
+        procurement = rows.procurements.get(edge['ocid'])
+        epoch_millis = procurement.published_millis if procurement else None
+        if epoch_millis is not None:
+            procurements.append((edge['buyerId'], edge['ocid'], epoch_millis, procurement['mainCategory']))
+    return procurements
+
+
+def cooperation_input(rows):
+    """Pares (ocid, proveedor) y regiones como los lee create_regional_cooperation"""
+    suppliers_by_award = {}
+    for edge in rows.awarded_to.values():
+        suppliers_by_award.setdefault(edge['awardId'], []).append(edge['supplierId'])
+    pairs = [(edge['ocid'], supplier_id) for edge in rows.has_award.values()
+             for supplier_id in suppliers_by_award.get(edge['awardId'], [])]
+    regions = {supplier_id: row['region'] for supplier_id, row in rows.suppliers.items()}
+    return pairs, regions
+
+
+def transform(store, pool, processes, chunk_size):
+    """Pipeline de transformación completo con escritores que descartan los lotes: mide
+    decodificación, proyección y colas sin base de datos"""
+    rows = []
+    pipeline = TransformPipeline(lambda chunk: rows.append(chunk.row_count()), pool=pool, max_pending=2 * processes)
+    pipeline.run([payload for _, _, payload in entries] for entries in store.payloads(chunk_size))
+    return sum(rows)
+
+
+def neo4j_load(path, args):
+    """Carga completa con Neo4jLoader (el script tiene guiones, se importa por ruta)"""
+    spec = importlib.util.spec_from_file_location('loader', os.path.join(GRAFOS_DIR, 'move-json-to-neo4j.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    loader = module.Neo4jLoader(args.neo4j_uri, args.neo4j_user, args.neo4j_password, workers=args.workers)
+    try:
+        return len(loader.load_data(RecordSource(path)))
+    finally:
+        loader.close()
+
+
+def run_size(size, args, directory):
+    """Ejecuta los benchmarks seleccionados para `size` registros sintéticos"""
+    selected = set(args.only or BENCHMARKS)
+    if 'neo4j_load' in selected and not args.neo4j_uri:
+        selected.discard('neo4j_load')
+    results = {}
+    records = SyntheticOCDS(size, seed=args.seed)
+    path = os.path.join(directory, f"synthetic-{size}" + ('' if args.ndjson else '.json'))
+
+    def generate():
+        # ShardWriter continúa los shards existentes; con --keep se parte de cero
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        if args.ndjson:
+            write_shards(records, path)
+        else:
+            write_json(records, path)
+        return size
+
+    # La entrada se genera una sola vez; su tiempo solo se mide si se pide
+    results_generate = measure(generate, 1)
+    if 'generate' in selected:
+        results['generate'] = results_generate
+
+    if 'parse' in selected:
+        results['parse'] = measure(lambda: sum(1 for _ in RecordSource(path)), args.repeat)
+
+    if 'dedup' in selected:
+        def dedup():
+            store = StagingStore(RecordSource(path))
+            store.close()
+            return store.total
+        results['dedup'] = measure(dedup, args.repeat)
+
+    if selected & {'read_staging', 'projection', 'transform', *ANALYSES}:
+        store = StagingStore(RecordSource(path))
+        try:
+            if 'read_staging' in selected:
+                results['read_staging'] = measure(lambda: sum(1 for _ in store), args.repeat)
+            rows = project_rows(store)
+            if 'projection' in selected:
+                results['projection'] = measure(lambda: sum(project_rows(store).counts().values()), args.repeat)
+            for processes in args.processes if 'transform' in selected else ():
+                # Un pool por cantidad, reutilizado entre repeticiones: con --repeat > 1 el
+                # arranque de los procesos queda fuera de la mejor medición
+                pool = ProcessPoolExecutor(processes, mp_context=get_context('spawn')) if processes > 1 else None
+                try:
+                    results[f'transform@{processes}'] = measure(
+                        lambda: transform(store, pool, processes, args.chunk_size), args.repeat)
+                finally:
+                    if pool is not None:
+                        pool.shutdown()
+        finally:
+            store.close()
+
+        analyses = {
+            'high_frequency': lambda: len(high_frequency_suppliers(rows)),
+            'quick_awards': lambda: len(quick_awards(rows)),
+            'unusual_amounts': lambda: len(unusual_amounts(rows)),
+            'splitting': lambda: len(potential_splitting(rows)[0]),
+            'daily_activity': lambda: len(daily_activity(rows)),
+        }
+        if 'related_time' in selected:
+            procurements = related_time_input(rows)
+            analyses['related_time'] = lambda: sum(1 for _ in related_time_edges(procurements))
+        if 'regional_cooperation' in selected:
+            pairs, regions = cooperation_input(rows)
+            analyses['regional_cooperation'] = lambda: sum(1 for _ in supplier_pairs(pairs, regions=regions))
+        for name in ANALYSES:
+            if name in selected:
+                results[name] = measure(analyses[name], args.repeat)
+
+    if 'neo4j_load' in selected:
+        results['neo4j_load'] = measure(lambda: neo4j_load(path, args), 1)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Imprime la variación contra la línea base y devuelve las regresiones"""
+    regressions = []
+    print(f"\n{'registros':>10} {'benchmark':<22} {'base s':>10} {'actual s':>10} {'cambio':>8}")
+    for size, benchmarks in results.items():
+        for name, current in benchmarks.items():
+            previous = baseline.get(size, {}).get(name)
+            if previous is None:
+                continue
+            change = current['seconds'] / previous['seconds'] - 1 if previous['seconds'] > 0 else 0.0
+            regressed = change > tolerance and current['seconds'] >= MIN_SECONDS
+            if regressed:
+                regressions.append((size, name, change))
+            print(f"{size:>10} {name:<22} {previous['seconds']:>10.3f} {current['seconds']:>10.3f} "
+                  f"{change:>+7.0%}{' ¡REGRESIÓN!' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3, help="Ejecuciones por medición (se toma la mejor)")
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, help="Ejecutar solo estos benchmarks")
+    parser.add_argument('--ndjson', action='store_true', help="Generar shards NDJSON en lugar de un JSON")
+    parser.add_argument('--keep', metavar='DIR', help="Conservar los datos generados en DIR")
+    parser.add_argument('--output', help="Guardar los resultados en este JSON")
+    parser.add_argument('--baseline', help="JSON de resultados anteriores contra el que comparar")
+    parser.add_argument('--save-baseline', metavar='FILE', help="Guardar los resultados como nueva línea base")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Aumento relativo de tiempo tolerado antes de marcar regresión")
+    parser.add_argument('--neo4j-uri', help="Medir también la carga en esta base local (se vacía)")
+    parser.add_argument('--neo4j-user', default='neo4j')
+    parser.add_argument('--neo4j-password', default='neo4j')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, os.cpu_count() or 1],
+                        help="Cantidades de procesos a medir en el benchmark transform")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="Registros por lote del pipeline")
+    args = parser.parse_args()
+
+    directory = args.keep or tempfile.mkdtemp(prefix='bench-')
+    os.makedirs(directory, exist_ok=True)
+    results = {}
+    print(f"{'registros':>10} {'benchmark':<22} {'segundos':>10} {'filas':>10} {'filas/s':>12}")
+    for size in args.sizes:
+        results[str(size)] = run_size(size, args, directory)
+        for name, result in results[str(size)].items():
+            rate = f"{result['rowsPerSecond']:,.0f}" if result['rowsPerSecond'] else '-'
+            print(f"{size:>10} {name:<22} {result['seconds']:>10.3f} {result['rows'] or 0:>10} {rate:>12}")
+    if not args.keep:
+        shutil.rmtree(directory)
+
+    report = {
+        'meta': {
+            'generatedAt': datetime.now(timezone.utc).isoformat(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'format': 'ndjson' if args.ndjson else 'json',
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            print(f"Resultados guardados en '{path}'")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        if baseline['meta'].get('seed') != args.seed:
+            print("¡Advertencia! La línea base usó otra semilla; los datos no son comparables")
+        if baseline['meta'].get('format') != report['meta']['format']:
+            print("¡Advertencia! La línea base usó otro formato de entrada")
+        regressions = compare(results, baseline['results'], args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regresiones sobre {args.tolerance:.0%} de tolerancia")
+            sys.exit(1)
+        print("\nSin regresiones respecto a la línea base")
+
+
+if __name__ == "__main__":
+    main()
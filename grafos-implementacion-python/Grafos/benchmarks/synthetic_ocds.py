@@ -0,0 +1,263 @@
+"""Generador reproducible de registros OCDS sintéticos con la forma de `json_ejemplo.json`.
+
+Los compradores, proveedores y categorías siguen una distribución de Zipf (pocas
+entidades concentran la mayoría de las contrataciones), cada contratación trae varios
+ítems, adjudicaciones y contratos, una fracción de los OCID se repite con una fecha de
+publicación posterior y algunos compradores adjudican en ráfagas (fraccionamiento).
+
+Los registros se generan en streaming, así que sirve de 1k a 10M registros.
+
+Uso: python benchmarks/synthetic_ocds.py 100000 --output datos.json
+     python benchmarks/synthetic_ocds.py 1000000 --output shards/ --ndjson --seed 7
+"""
+import argparse
+import json
+import os
+import random
+import sys
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ndjson_store import ShardWriter
+
+PERU = timezone(timedelta(hours=-5))
+REGIONS = ['LIMA', 'AREQUIPA', 'CUSCO', 'PIURA', 'LA LIBERTAD', 'JUNIN', 'PUNO', 'CAJAMARCA', 'LAMBAYEQUE',
+           'ANCASH', 'LORETO', 'ICA', 'SAN MARTIN', 'HUANUCO', 'AYACUCHO', 'UCAYALI', 'APURIMAC', 'TACNA',
+           'AMAZONAS', 'PASCO', 'HUANCAVELICA', 'TUMBES', 'MOQUEGUA', 'MADRE DE DIOS', 'CALLAO']
+CATEGORIES = ['goods', 'services', 'works']
+# (detalle del procedimiento, monto mediano en soles)
+METHODS = [('Adjudicación Simplificada', 80000.0), ('Subasta Inversa Electrónica', 40000.0),
+           ('Licitación Pública', 900000.0), ('Concurso Público', 600000.0), ('Contratación Directa', 30000.0),
+           ('Comparación de Precios', 15000.0)]
+UNITS = [('36', 'Servicio'), ('58', 'Unidad'), ('12', 'Kilogramo'), ('44', 'Global')]
+
+
+class ZipfSampler:
+    """Índices 0..n-1 con probabilidad proporcional a 1 / (rango + 1) ** s"""
+
+    def __init__(self, rng, size, exponent):
+        self.rng = rng
+        self.population = range(size)
+        self.cum_weights = list(accumulate(1.0 / (rank + 1) ** exponent for rank in range(size)))
+
+    def __call__(self):
+        return self.rng.choices(self.population, cum_weights=self.cum_weights)[0]
+
+
+def _iso(moment):
+    return moment.isoformat()
+
+
+def _party(party_id, name, identifier, ruc, region, role):
+    return {
+        'id': party_id,
+        'name': name,
+        'identifier': {'id': identifier, 'scheme': party_id.rsplit('-', 1)[0], 'legalName': name},
+        'additionalIdentifiers': [{'id': ruc, 'scheme': 'PE-RUC', 'legalName': name}],
+        'address': {'streetAddress': f"AV. PRINCIPAL {identifier}", 'locality': region, 'region': region,
+                    'department': region, 'countryName': 'PERU'},
+        'contactPoint': {'telephone': f"0{identifier[-6:]}"},
+        'roles': [role],
+    }
+
+
+class SyntheticOCDS:
+    """Fuente re-iterable de registros `{'ocid', 'compiledRelease'}`; la misma semilla
+    produce los mismos registros.
+
+    `duplicate_rate` es la fracción de registros que repiten un OCID reciente con otra
+    versión, y `burst_rate` la de contrataciones que continúan una ráfaga del mismo
+    comprador y categoría a pocos días de la anterior.
+    """
+
+    def __init__(self, count, seed=42, buyers=None, suppliers=None, zipf_exponent=1.1,
+                 duplicate_rate=0.05, burst_rate=0.1, start=datetime(2024, 1, 1, tzinfo=PERU), days=365):
+        self.count = count
+        self.seed = seed
+        # Por defecto la población crece con el volumen, como en los datos reales
+        self.buyers = buyers or max(20, count // 50)
+        self.suppliers = suppliers or max(50, count // 8)
+        self.zipf_exponent = zipf_exponent
+        self.duplicate_rate = duplicate_rate
+        self.burst_rate = burst_rate
+        self.start = start
+        self.days = days
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        rng = random.Random(self.seed)
+        pick_buyer = ZipfSampler(rng, self.buyers, self.zipf_exponent)
+        pick_supplier = ZipfSampler(rng, self.suppliers, self.zipf_exponent)
+        buyer_regions = [rng.choice(REGIONS) for _ in range(self.buyers)]
+        supplier_regions = [rng.choice(REGIONS) for _ in range(self.suppliers)]
+        recent = deque(maxlen=1000)
+        burst = None
+
+        for index in range(self.count):
+            if recent and rng.random() < self.duplicate_rate:
+                # Nueva versión de un OCID ya emitido: misma contratación, otra fecha y montos
+                ocid, tender, buyer, category, published = rng.choice(recent)
+                published += timedelta(days=rng.randint(1, 30), seconds=rng.randint(0, 86399))
+            else:
+                if burst is not None and rng.random() < self.burst_rate:
+                    buyer, category, previous = burst
+                    published = previous + timedelta(days=rng.randint(0, 3), seconds=rng.randint(0, 86399))
+                else:
+                    buyer = pick_buyer()
+                    category = CATEGORIES[min(int(rng.paretovariate(1.5)) - 1, len(CATEGORIES) - 1)]
+                    published = self.start + timedelta(days=rng.randrange(self.days),
+                                                       seconds=rng.randint(0, 86399))
+                burst = (buyer, category, published)
+                tender = index
+                ocid = f"ocds-dgv273-seacev3-{published.year}-{buyer}-{tender}"
+                recent.append((ocid, tender, buyer, category, published))
+
+            yield self._record(rng, tender, ocid, buyer, category, published, pick_supplier,
+                               buyer_regions, supplier_regions)
+
+    def _record(self, rng, index, ocid, buyer, category, published, pick_supplier,
+                buyer_regions, supplier_regions):
+        buyer_id = f"PE-CONSUCODE-{buyer}"
+        buyer_name = f"ENTIDAD PUBLICA {buyer}"
+        method, median = METHODS[rng.randrange(len(METHODS))]
+        tender_id = str(1000000 + index)
+
+        items = []
+        for position in range(1, rng.choice((1, 1, 1, 2, 3, 5)) + 1):
+            unit_id, unit_name = rng.choice(UNITS)
+            items.append({
+                'id': f"{tender_id}{position:03d}",
+                'position': str(position),
+                'description': f"ITEM {position} DE LA CONTRATACION {tender_id}",
+                'statusDetails': 'CONVOCADO',
+                'status': 'active',
+                'classification': {'id': f"80{rng.randrange(10 ** 14):014d}", 'description': 'CUBSO',
+                                   'scheme': 'CUBSO'},
+                'quantity': float(rng.randint(1, 100)),
+                'totalValue': {'amount': 0.0, 'currency': 'PEN', 'currencyName': 'Soles'},
+                'unit': {'id': unit_id, 'name': unit_name, 'scheme': 'PE-SEACE3-UnidadMedida'},
+            })
+
+        parties = [_party(buyer_id, buyer_name, str(buyer), f"20{buyer:09d}", buyer_regions[buyer], 'buyer')]
+        awards, contracts = [], []
+        # Algunas contrataciones siguen en convocatoria y no tienen adjudicaciones
+        award_count = 0 if rng.random() < 0.15 else rng.choice((1, 1, 1, 2, 3))
+        currency = 'USD' if rng.random() < 0.03 else 'PEN'
+        for award_number in range(1, award_count + 1):
+            award_id = f"{tender_id}-{award_number}"
+            award_date = published + timedelta(days=min(int(rng.expovariate(1 / 20)), 180),
+                                               seconds=rng.randint(0, 86399))
+            amount = round(rng.lognormvariate(0, 1.2) * median, 2)
+            # Consorcios: a veces la adjudicación es a varios proveedores
+            supplier_ids = {pick_supplier() for _ in range(rng.choice((1, 1, 1, 1, 2, 3)))}
+            suppliers = []
+            for supplier in sorted(supplier_ids):
+                supplier_party_id = f"PE-RUC-{10 ** 10 + supplier}"
+                supplier_name = f"PROVEEDOR {supplier} S.A.C."
+                suppliers.append({'id': supplier_party_id, 'name': supplier_name})
+                parties.append(_party(supplier_party_id, supplier_name, str(10 ** 10 + supplier),
+                                      str(10 ** 10 + supplier), supplier_regions[supplier], 'supplier'))
+            awards.append({
+                'id': award_id,
+                'title': f"ADJUDICACION {award_id}",
+                'date': _iso(award_date),
+                'status': 'active',
+                'value': {'amount': amount, 'currency': currency},
+                'suppliers': suppliers,
+            })
+            if rng.random() < 0.9:
+                contracts.append({
+                    'id': f"{award_id}-C",
+                    'awardID': award_id,
+                    'title': f"CONTRATO {award_id}",
+                    'description': f"CONTRATO DERIVADO DE {tender_id}",
+                    'status': 'active',
+                    'value': {'amount': amount, 'currency': currency},
+                    'dateSigned': _iso(award_date + timedelta(days=rng.randint(1, 15))),
+                })
+
+        release = {
+            'tag': ['compiled'],
+            'id': f"{ocid}-{_iso(published)}",
+            'date': _iso(published),
+            'ocid': ocid,
+            'publishedDate': _iso(published),
+            'initiationType': 'tender',
+            'buyer': {'id': buyer_id, 'name': buyer_name},
+            'planning': {'budget': {'description': 'Fondos Públicos'}},
+            'tender': {
+                'id': tender_id,
+                'title': f"{method[:2].upper()}-SM-{index}-{published.year}",
+                'description': f"CONTRATACION DE {category.upper()} PARA {buyer_name}",
+                'procuringEntity': {'id': buyer_id, 'name': buyer_name},
+                'datePublished': _iso(published),
+                'procurementMethod': 'direct' if method == 'Contratación Directa' else 'open',
+                'procurementMethodDetails': method,
+                'mainProcurementCategory': category,
+                'additionalProcurementCategories': [category],
+                'value': {'amount': 0.0, 'currency': 'PEN', 'currencyName': 'Soles', 'amount_PEN': 0.0},
+                'items': items,
+            },
+            'parties': parties,
+            'sources': [{'id': 'seace_v3', 'name': 'Sistema Electrónico de Contrataciones del Estado'}],
+            'dataSegmentation': {'id': published.strftime('%Y-%m'), 'criteria': ['añoInicioConvocatoria']},
+        }
+        if awards:
+            release['awards'] = awards
+        if contracts:
+            release['contracts'] = contracts
+        return {'ocid': ocid, 'compiledRelease': release}
+
+
+def write_json(records, path):
+    """Archivo `{"records": [...]}` como el que produce la extracción original"""
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('{"records": [\n')
+        for index, record in enumerate(records):
+            file.write(('' if index == 0 else ',\n') + json.dumps(record, ensure_ascii=False))
+        file.write('\n]}\n')
+
+
+def write_shards(records, directory, max_records_per_shard=50000, compress=False, batch_size=1000):
+    """Directorio de shards NDJSON como el de extraccion-de-datos.py"""
+    writer = ShardWriter(directory, max_records_per_shard=max_records_per_shard, compress=compress)
+    try:
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                writer.write_records(batch)
+                batch = []
+        writer.write_records(batch)
+    finally:
+        writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('count', type=int, help="Registros a generar (incluye duplicados)")
+    parser.add_argument('--output', required=True, help="Archivo JSON o directorio de shards con --ndjson")
+    parser.add_argument('--ndjson', action='store_true', help="Escribir shards NDJSON en lugar de un JSON")
+    parser.add_argument('--compress', action='store_true', help="Comprimir los shards NDJSON con gzip")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--duplicate-rate', type=float, default=0.05)
+    parser.add_argument('--burst-rate', type=float, default=0.1)
+    parser.add_argument('--zipf', type=float, default=1.1, help="Exponente de Zipf de compradores y proveedores")
+    args = parser.parse_args()
+
+    records = SyntheticOCDS(args.count, seed=args.seed, zipf_exponent=args.zipf,
+                            duplicate_rate=args.duplicate_rate, burst_rate=args.burst_rate)
+    if args.ndjson:
+        write_shards(records, args.output, compress=args.compress)
+    else:
+        write_json(records, args.output)
+    print(f"{args.count} registros sintéticos escritos en '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
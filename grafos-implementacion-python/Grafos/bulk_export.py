@@ -0,0 +1,252 @@
+"""Exporta el grafo a CSV para `neo4j-admin database import full` (carga inicial en frío)."""
+import csv
+import json
+import os
+import uuid
+
+from cooccurrence import supplier_pairs
+from dashboard_summary import buyer_supplier_pairs, counters, summary
+from entity_resolution import entity_stats, resolve_suppliers
+from load_queries import CONSTRAINTS
+from outliers import group_key
+from related_time import related_time_edges
+from risk_scoring import score_all
+
+# Etiqueta -> (tipo de filas en EntityRows, columnas (encabezado, propiedad))
+NODE_FILES = {
+    'Buyer': ('buyers', [
+        ('id:ID(Buyer)', 'id'), ('name', 'name'), ('ruc', 'ruc'), ('address', 'address'),
+        ('contactPoint', 'contactPoint'), ('email', 'email'), ('telephone', 'telephone'), ('region', 'region'),
+        ('potentialSplitting:boolean', 'potentialSplitting'), ('splittingCategory', 'splittingCategory'),
+        ('splittingDate:date', 'splittingDate'), ('splittingValue:float', 'splittingValue'),
+        ('splittingCount:int', 'splittingCount'), ('riskLevel', 'riskLevel'),
+        ('procurementCount:int', 'procurementCount'),
+    ]),
+    'Procurement': ('procurements', [
+        ('ocid:ID(Procurement)', 'ocid'), ('id', 'id'), ('title', 'title'), ('description', 'description'),
+        ('publishedDate:datetime', 'publishedDate'), ('procurementMethod', 'procurementMethod'),
+        ('procurementMethodDetails', 'procurementMethodDetails'), ('mainCategory', 'mainCategory'),
+        ('contentHash', 'contentHash'), ('quickAward:boolean', 'quickAward'), ('awardDays:int', 'awardDays'),
+        ('awardSpeed', 'awardSpeed'), ('riskLevel', 'riskLevel'), ('avgDailyValue:float', 'avgDailyValue'),
+        ('dailyAwards:int', 'dailyAwards'), ('unusualDailyActivity', 'unusualDailyActivity'),
+    ]),
+    'Item': ('items', [
+        ('id:ID(Item)', 'id'), ('description', 'description'), ('status', 'status'),
+        ('quantity:float', 'quantity'),
+    ]),
+    'Award': ('awards', [
+        ('id:ID(Award)', 'id'), ('title', 'title'), ('value:float', 'value'), ('currency', 'currency'),
+        ('date', 'date'), ('category', 'category'), ('unusualAmount:boolean', 'unusualAmount'), ('categoryAvg:float', 'categoryAvg'),
+        ('categoryStdDev:float', 'categoryStdDev'), ('categoryMedian:float', 'categoryMedian'),
+        ('categoryMAD:float', 'categoryMAD'), ('deviation:float', 'deviation'),
+        ('percentileRank:float', 'percentileRank'), ('riskLevel', 'riskLevel'),
+    ]),
+    'Contract': ('contracts', [
+        ('id:ID(Contract)', 'id'), ('title', 'title'), ('description', 'description'), ('value:float', 'value'),
+        ('currency', 'currency'), ('awardID', 'awardID'), ('status', 'status'),
+    ]),
+    'Supplier': ('suppliers', [
+        ('id:ID(Supplier)', 'id'), ('name', 'name'), ('ruc', 'ruc'), ('legalName', 'legalName'),
+        ('address', 'address'), ('region', 'region'), ('highFrequencySupplier:boolean', 'highFrequencySupplier'),
+        ('totalAwards:int', 'totalAwards'), ('totalValue:float', 'totalValue'),
+        ('averageAwardValue:float', 'averageAwardValue'), ('currencies:string[]', 'currencies'),
+        ('riskLevel', 'riskLevel'), ('awardCount:int', 'awardCount'), ('awardValue:float', 'awardValue'),
+        ('buyerCount:int', 'buyerCount'), ('avgAwardValue:float', 'avgAwardValue'),
+        ('quickAwardPercent:float', 'quickAwardPercent'), ('searchName', 'searchName'),
+    ]),
+}
+
+# Tipo de relación -> (filas en EntityRows, clave y etiqueta de origen, clave y etiqueta de destino)
+RELATIONSHIP_FILES = {
+    'PUBLISHED': ('published', 'buyerId', 'Buyer', 'ocid', 'Procurement'),
+    'INCLUDES': ('includes', 'ocid', 'Procurement', 'itemId', 'Item'),
+    'HAS_AWARD': ('has_award', 'ocid', 'Procurement', 'awardId', 'Award'),
+    'AWARDED_TO': ('awarded_to', 'awardId', 'Award', 'supplierId', 'Supplier'),
+    'HAS_CONTRACT': ('has_contract', 'awardId', 'Award', 'contractId', 'Contract'),
+}
+
+SPLITTING_ALERT_COLUMNS = [
+    ('id:ID(SplittingAlert)', 'id'), ('category', 'category'), ('supplierId', 'supplierId'),
+    ('windowStart:datetime', 'windowStart'), ('windowEnd:datetime', 'windowEnd'), ('windowDays:int', 'windowDays'),
+    ('awardCount:int', 'awardCount'), ('totalValue:float', 'totalValue'), ('maxAwardValue:float', 'maxAwardValue'),
+    ('awardIds:string[]', 'awardIds'), ('riskLevel', 'riskLevel'),
+]
+
+SUPPLIER_ENTITY_COLUMNS = [
+    ('id:ID(SupplierEntity)', 'id'), ('name', 'name'), ('ruc', 'ruc'), ('memberCount:int', 'memberCount'),
+    ('awardCount:int', 'awardCount'), ('awardValue:float', 'awardValue'),
+    ('highFrequencySupplier:boolean', 'highFrequencySupplier'), ('riskLevel', 'riskLevel'),
+]
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (list, tuple)):
+        return ';'.join(str(item) for item in value)
+    return value
+
+
+def _write_csv(directory, name, header, rows):
+    with open(os.path.join(directory, f"{name}_header.csv"), 'w', newline='', encoding='utf-8') as file:
+        csv.writer(file).writerow(header)
+    count = 0
+    with open(os.path.join(directory, f"{name}.csv"), 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        for row in rows:
+            writer.writerow([_cell(value) for value in row])
+            count += 1
+    return count
+
+
+def _related_time_rows(rows, window_days):
+    procurements = []
+    for edge in rows.published.values():
+        procurement = rows.procurements.get(edge['ocid'])
+        epoch_millis = procurement.published_millis if procurement else None
+        if epoch_millis is not None and edge['buyerId'] in rows.buyers:
+            procurements.append((edge['buyerId'], edge['ocid'], epoch_millis, procurement['mainCategory']))
+    for edge in related_time_edges(procurements, window_days=window_days):
+        yield [edge['source'], edge['target'], edge['days'], _cell(edge['sameCategory'])]
+
+
+def _regional_cooperation_rows(rows, min_shared, same_region):
+    suppliers_by_award = {}
+    for edge in rows.awarded_to.values():
+        if edge['supplierId'] in rows.suppliers:
+            suppliers_by_award.setdefault(edge['awardId'], []).append(edge['supplierId'])
+    pairs = [
+        (edge['ocid'], supplier_id)
+        for edge in rows.has_award.values()
+        if edge['ocid'] in rows.procurements and edge['awardId'] in rows.awards
+        for supplier_id in suppliers_by_award.get(edge['awardId'], [])
+    ]
+    regions = {supplier_id: row['region'] for supplier_id, row in rows.suppliers.items()}
+    for edge in supplier_pairs(pairs, regions=regions, min_shared=min_shared, same_region=same_region):
+        yield [edge['source'], edge['target'], edge['sharedProcurements'], edge['region'], edge['riskLevel']]
+
+
+def _category_stats_rows(rows, by_currency):
+    """Agregados por grupo que el modo delta actualiza en CategoryStats"""
+    stats = {}
+    for award in rows.awards.values():
+        if award['category'] is None:
+            continue
+        currency = award['currency'] if by_currency else None
+        key = group_key(award['category'], currency)
+        row = stats.setdefault(key, [key, award['category'], currency, 0, 0.0, 0.0])
+        row[3] += 1
+        row[4] += award['value']
+        row[5] += award['value'] * award['value']
+    return stats.values()
+
+
+def export_bulk(rows, directory, database='neo4j', related_window_days=30, outlier_method='stddev',
+                outlier_by_currency=False, cooperation_min_shared=2, cooperation_same_region=True,
+                splitting_options=None, summary_top_k=10, entity_threshold=0.85, entity_max_block=200):
+    """Escribe nodos, relaciones y propiedades de riesgo de `rows` (EntityRows de todo el
+    dataset ya deduplicado) y devuelve el comando de importación"""
+    os.makedirs(directory, exist_ok=True)
+
+    # Contratos sin Award no se cargan, igual que en la carga con Cypher
+    rows.contracts = {key: row for key, row in rows.contracts.items() if row['awardID'] in rows.awards}
+    risk = score_all(rows, outlier_method=outlier_method, outlier_by_currency=outlier_by_currency,
+                     splitting_options=splitting_options)
+    pairs = buyer_supplier_pairs(rows)
+    quick_ocids = {ocid for ocid, props in risk['Procurement'].items() if props.get('quickAward')}
+    counter_props = counters(rows, pairs, quick_ocids)
+
+    arguments = []
+    for label, (kind, columns) in NODE_FILES.items():
+        derived = risk.get(label, {})
+        counted = counter_props.get(label, {})
+        key = columns[0][1]
+        records = (
+            [{**row, **derived.get(row[key], {}), **counted.get(row[key], {})}.get(prop) for _, prop in columns]
+            for row in getattr(rows, kind).values()
+        )
+        count = _write_csv(directory, label, [header for header, _ in columns], records)
+        print(f"- {label}: {count} nodos")
+        arguments.append(f"--nodes={label}={label}_header.csv,{label}.csv")
+
+    alerts = risk['SplittingAlert'].values()
+    count = _write_csv(directory, 'SplittingAlert', [header for header, _ in SPLITTING_ALERT_COLUMNS],
+                       ([alert[prop] for _, prop in SPLITTING_ALERT_COLUMNS] for alert in alerts))
+    print(f"- SplittingAlert: {count} nodos")
+    arguments.append("--nodes=SplittingAlert=SplittingAlert_header.csv,SplittingAlert.csv")
+
+    header = ['key:ID(CategoryStats)', 'category', 'currency', 'count:long', 'sum:double', 'sumSquares:double']
+    count = _write_csv(directory, 'CategoryStats', header, _category_stats_rows(rows, outlier_by_currency))
+    print(f"- CategoryStats: {count} nodos")
+    arguments.append("--nodes=CategoryStats=CategoryStats_header.csv,CategoryStats.csv")
+
+    links, entities = resolve_suppliers(
+        ((supplier_id, row['name'], row['ruc']) for supplier_id, row in rows.suppliers.items()),
+        threshold=entity_threshold, max_block=entity_max_block)
+    stats = entity_stats(entities, links, counter_props['Supplier'])
+    count = _write_csv(directory, 'SupplierEntity', [header for header, _ in SUPPLIER_ENTITY_COLUMNS],
+                       ([{**entity, **stats[entity['id']]}.get(prop) for _, prop in SUPPLIER_ENTITY_COLUMNS]
+                        for entity in entities))
+    print(f"- SupplierEntity: {count} nodos")
+    arguments.append("--nodes=SupplierEntity=SupplierEntity_header.csv,SupplierEntity.csv")
+
+    for rel_type, (kind, source_key, source_label, target_key, target_label) in RELATIONSHIP_FILES.items():
+        source_nodes = getattr(rows, NODE_FILES[source_label][0])
+        target_nodes = getattr(rows, NODE_FILES[target_label][0])
+        # Solo relaciones con ambos extremos, como el MATCH de la carga
+        records = (
+            [edge[source_key], edge[target_key]] for edge in getattr(rows, kind).values()
+            if edge[source_key] in source_nodes and edge[target_key] in target_nodes
+        )
+        header = [f":START_ID({source_label})", f":END_ID({target_label})"]
+        count = _write_csv(directory, rel_type, header, records)
+        print(f"- {rel_type}: {count} relaciones")
+        arguments.append(f"--relationships={rel_type}={rel_type}_header.csv,{rel_type}.csv")
+
+    header = [":START_ID(Buyer)", ":END_ID(Supplier)", "awards:int", "totalValue:float"]
+    count = _write_csv(directory, 'BUYS_FROM', header,
+                       ([buyer_id, supplier_id, pair['awards'], pair['totalValue']]
+                        for (buyer_id, supplier_id), pair in pairs.items()))
+    print(f"- BUYS_FROM: {count} relaciones")
+    arguments.append("--relationships=BUYS_FROM=BUYS_FROM_header.csv,BUYS_FROM.csv")
+
+    header = [":START_ID(Supplier)", ":END_ID(SupplierEntity)", "score:float", "reason"]
+    count = _write_csv(directory, 'SAME_AS', header,
+                       ([link['supplierId'], link['entityId'], link['score'], link['reason']] for link in links))
+    print(f"- SAME_AS: {count} relaciones")
+    arguments.append("--relationships=SAME_AS=SAME_AS_header.csv,SAME_AS.csv")
+
+    header = [":START_ID(Procurement)", ":END_ID(Procurement)", "daysBetween:int", "sameCategory:boolean"]
+    count = _write_csv(directory, 'RELATED_TIME', header, _related_time_rows(rows, related_window_days))
+    print(f"- RELATED_TIME: {count} relaciones")
+    arguments.append("--relationships=RELATED_TIME=RELATED_TIME_header.csv,RELATED_TIME.csv")
+
+    count = _write_csv(directory, 'HAS_ALERT', [":START_ID(Buyer)", ":END_ID(SplittingAlert)"],
+                       ([alert['buyerId'], alert['id']] for alert in alerts))
+    print(f"- HAS_ALERT: {count} relaciones")
+    arguments.append("--relationships=HAS_ALERT=HAS_ALERT_header.csv,HAS_ALERT.csv")
+
+    header = [":START_ID(Supplier)", ":END_ID(Supplier)", "sharedProcurements:int", "region", "riskLevel"]
+    records = _regional_cooperation_rows(rows, cooperation_min_shared, cooperation_same_region)
+    count = _write_csv(directory, 'REGIONAL_COOPERATION', header, records)
+    print(f"- REGIONAL_COOPERATION: {count} relaciones")
+    arguments.append("--relationships=REGIONAL_COOPERATION=REGIONAL_COOPERATION_header.csv,"
+                     "REGIONAL_COOPERATION.csv")
+
+    command = (f"neo4j-admin database import full {database} --overwrite-destination "
+               f"--multiline-fields=true " + ' '.join(arguments))
+    with open(os.path.join(directory, 'import.sh'), 'w', encoding='utf-8') as file:
+        file.write("#!/bin/sh\n# Ejecutar con la base detenida, desde este directorio\n")
+        file.write(command + "\n")
+    with open(os.path.join(directory, 'post_import.cypher'), 'w', encoding='utf-8') as file:
+        file.write(';\n'.join(CONSTRAINTS) + ';\n')
+        # Resumen del dashboard; un valor JSON (texto, número o lista) es un literal válido de Cypher
+        props = summary(rows, counter_props, pairs, top_k=summary_top_k)
+        assignments = ', '.join(f"d.{name} = {json.dumps(value)}" for name, value in props.items())
+        file.write(f"MERGE (d:DashboardSummary {{id: 'current'}}) SET {assignments}, d.updatedAt = datetime();\n")
+        # Sello de carga para que la API de lectura descarte respuestas de la base anterior
+        file.write(f"MERGE (g:LoadGeneration {{id: 'current'}}) SET g.stamp = '{uuid.uuid4().hex}', "
+                   "g.mode = 'bulk', g.loadedAt = datetime();\n")
+    return command
@@ -0,0 +1,60 @@
+"""Pares de proveedores que coinciden en contrataciones (REGIONAL_COOPERATION) con matrices dispersas.
+
+Con la matriz de incidencia A (contratación × proveedor), Aᵀ·A cuenta para cada par de
+proveedores las contrataciones compartidas en un solo producto disperso, en lugar de
+unir cada proveedor con todos los demás de cada contratación desde Cypher.
+"""
+import numpy as np
+from scipy import sparse
+
+NO_REGION = "No Region"
+
+
+def _index(values):
+    """Códigos enteros por valor y la lista de valores en orden de código"""
+    codes = {}
+    return np.fromiter((codes.setdefault(value, len(codes)) for value in values), dtype=np.int64), list(codes)
+
+
+def supplier_pairs(pairs, regions=None, min_shared=2, same_region=True):
+    """Genera dicts {source, target, sharedProcurements, region, riskLevel} por cada par de
+    proveedores con `min_shared` o más contrataciones en común.
+
+    `pairs` son tuplas (ocid, supplier_id); `regions` un dict supplier_id -> región. Con
+    `same_region` solo se conservan pares de la misma región conocida.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return
+    procurement_codes, _ = _index(ocid for ocid, _ in pairs)
+    supplier_codes, suppliers = _index(supplier_id for _, supplier_id in pairs)
+
+    incidence = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.int32), (procurement_codes, supplier_codes)),
+        shape=(procurement_codes.max() + 1, len(suppliers)),
+    )
+    # Un proveedor con varias adjudicaciones en la misma contratación cuenta una vez
+    incidence.data[:] = 1
+
+    shared = sparse.triu(incidence.T @ incidence, k=1).tocoo()
+    mask = shared.data >= min_shared
+    sources, targets, counts = shared.row[mask], shared.col[mask], shared.data[mask]
+
+    regions = regions or {}
+    region_codes, region_names = _index(regions.get(supplier_id) or NO_REGION for supplier_id in suppliers)
+    if same_region:
+        known = np.array([name != NO_REGION for name in region_names], dtype=bool)
+        keep = (region_codes[sources] == region_codes[targets]) & known[region_codes[sources]]
+        sources, targets, counts = sources[keep], targets[keep], counts[keep]
+
+    for source, target, count in zip(sources.tolist(), targets.tolist(), counts.tolist()):
+        region = region_names[region_codes[source]]
+        # Misma orientación que la consulta original: s1.id < s2.id
+        source_id, target_id = sorted((suppliers[source], suppliers[target]))
+        yield {
+            'source': source_id,
+            'target': target_id,
+            'sharedProcurements': count,
+            'region': region if region != NO_REGION and region_codes[source] == region_codes[target] else None,
+            'riskLevel': 'ALTO' if count >= 5 else 'MEDIO' if count >= 3 else 'BAJO',
+        }
@@ -0,0 +1,104 @@
+"""Agregados del dashboard calculados en Python para la exportación masiva.
+
+Son los mismos que la carga con Cypher deja en el grafo (BUYER_COUNTERS_QUERY,
+SUPPLIER_COUNTERS_QUERY y DASHBOARD_SUMMARY_QUERY): contadores por comprador y
+proveedor (con las estadísticas del buscador), pares comprador-proveedor (BUYS_FROM) y
+el nodo DashboardSummary.
+"""
+from collections import defaultdict
+
+# Umbrales del Dashboard
+FREQUENT_SUPPLIER_AWARDS = 5
+REPETITIVE_CONTRACT_AWARDS = 3
+
+
+def buyer_supplier_pairs(rows):
+    """{(buyer_id, supplier_id): {'awards', 'totalValue'}} sobre el camino
+    Buyer-PUBLISHED-Procurement-HAS_AWARD-Award-AWARDED_TO-Supplier"""
+    buyer_by_ocid = {edge['ocid']: edge['buyerId'] for edge in rows.published.values()
+                     if edge['buyerId'] in rows.buyers and edge['ocid'] in rows.procurements}
+    suppliers_by_award = defaultdict(list)
+    for edge in rows.awarded_to.values():
+        if edge['supplierId'] in rows.suppliers:
+            suppliers_by_award[edge['awardId']].append(edge['supplierId'])
+
+    pairs = {}
+    for edge in rows.has_award.values():
+        buyer_id = buyer_by_ocid.get(edge['ocid'])
+        award = rows.awards.get(edge['awardId'])
+        if buyer_id is None or award is None:
+            continue
+        for supplier_id in suppliers_by_award.get(edge['awardId'], ()):
+            pair = pairs.setdefault((buyer_id, supplier_id), {'awards': 0, 'totalValue': 0.0})
+            pair['awards'] += 1
+            if award['value'] is not None:
+                pair['totalValue'] += award['value']
+    return pairs
+
+
+def counters(rows, pairs, quick_ocids=()):
+    """Propiedades de contadores por etiqueta: {'Buyer': {id: props}, 'Supplier': {id: props}};
+    `quick_ocids` son las contrataciones marcadas como adjudicación rápida"""
+    buyers = {buyer_id: {'procurementCount': 0} for buyer_id in rows.buyers}
+    for edge in rows.published.values():
+        if edge['buyerId'] in buyers and edge['ocid'] in rows.procurements:
+            buyers[edge['buyerId']]['procurementCount'] += 1
+
+    ocid_by_award = {edge['awardId']: edge['ocid'] for edge in rows.has_award.values()
+                     if edge['ocid'] in rows.procurements}
+    suppliers = {supplier_id: {'awardCount': 0, 'awardValue': 0.0, 'buyerCount': 0}
+                 for supplier_id in rows.suppliers}
+    # Montos con valor y adjudicaciones rápidas por proveedor, para promedio y porcentaje
+    valued = defaultdict(int)
+    quick = defaultdict(int)
+    for edge in rows.awarded_to.values():
+        award = rows.awards.get(edge['awardId'])
+        supplier_id = edge['supplierId']
+        if award is None or supplier_id not in suppliers:
+            continue
+        props = suppliers[supplier_id]
+        props['awardCount'] += 1
+        if award['value'] is not None:
+            props['awardValue'] += award['value']
+            valued[supplier_id] += 1
+        if ocid_by_award.get(edge['awardId']) in quick_ocids:
+            quick[supplier_id] += 1
+    for _, supplier_id in pairs:
+        suppliers[supplier_id]['buyerCount'] += 1
+    for supplier_id, props in suppliers.items():
+        awards = props['awardCount']
+        props['avgAwardValue'] = float(round(props['awardValue'] / valued[supplier_id])) if valued[supplier_id] else 0.0
+        props['quickAwardPercent'] = float(round(100.0 * quick[supplier_id] / awards)) if awards else 0.0
+    return {'Buyer': buyers, 'Supplier': suppliers}
+
+
+def summary(rows, counter_props, pairs, top_k=10):
+    """Propiedades del nodo DashboardSummary"""
+    buyers, suppliers = counter_props['Buyer'], counter_props['Supplier']
+    top_buyers = sorted(
+        ((rows.buyers[buyer_id]['name'], props['procurementCount'])
+         for buyer_id, props in buyers.items() if props['procurementCount'] > 0),
+        key=lambda entry: (-entry[1], entry[0] or ''))[:top_k]
+    top_suppliers = sorted(
+        ((rows.suppliers[supplier_id]['name'], props['awardCount'])
+         for supplier_id, props in suppliers.items() if props['awardCount'] > 0),
+        key=lambda entry: (-entry[1], entry[0] or ''))[:top_k]
+    repetitive = sorted(
+        ((rows.buyers[buyer_id]['name'], rows.suppliers[supplier_id]['name'], pair['awards'])
+         for (buyer_id, supplier_id), pair in pairs.items() if pair['awards'] > REPETITIVE_CONTRACT_AWARDS),
+        key=lambda entry: (-entry[2], entry[0] or '', entry[1] or ''))[:top_k]
+    return {
+        'buyers': len(rows.buyers),
+        'suppliers': len(rows.suppliers),
+        'procurements': len(rows.procurements),
+        'awards': len(rows.awards),
+        'frequentSuppliers': sum(1 for props in suppliers.values()
+                                 if props['awardCount'] > FREQUENT_SUPPLIER_AWARDS),
+        'topBuyerNames': [name for name, _ in top_buyers],
+        'topBuyerTotals': [total for _, total in top_buyers],
+        'topSupplierNames': [name for name, _ in top_suppliers],
+        'topSupplierAwards': [awards for _, awards in top_suppliers],
+        'repetitiveBuyers': [buyer for buyer, _, _ in repetitive],
+        'repetitiveSuppliers': [supplier for _, supplier, _ in repetitive],
+        'repetitiveAwards': [awards for _, _, awards in repetitive],
+    }
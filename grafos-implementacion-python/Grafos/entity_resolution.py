@@ -0,0 +1,218 @@
+"""Resolución de entidades de proveedores: agrupa ids que son la misma empresa.
+
+El mismo RUC bajo ids distintos se une siempre. Dos proveedores con RUC válidos distintos
+nunca se unen por nombre, aunque se llamen igual o los encadene un proveedor sin RUC
+parecido a ambos. El RUC se toma del campo ruc o del id ('PE-RUC-...'), así que la
+comparación por nombre sirve para juntar variantes y erratas sin RUC con el proveedor que
+sí lo tiene. Esa comparación se hace solo dentro de bloques: mismo RUC, misma
+palabra poco frecuente del nombre o misma clave fonética, así que nunca se evalúan todos
+los pares. Cada par candidato se puntúa con el coseno de trigramas de caracteres
+ponderados por TF-IDF, del nombre y de su clave fonética; todos los pares se calculan
+juntos con matrices dispersas. Los grupos se forman con componentes conexas.
+"""
+import re
+from collections import Counter
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from supplier_search import normalize_name
+
+# Formas societarias y palabras vacías que no distinguen a una empresa de otra
+LEGAL_WORDS = {
+    'sac', 'sa', 'saa', 'srl', 'eirl', 'scrl', 'sc', 'sociedad', 'anonima', 'cerrada', 'abierta', 'comercial',
+    'empresa', 'individual', 'responsabilidad', 'limitada', 'de', 'del', 'la', 'las', 'el', 'los', 'y', 'e',
+}
+_RUC = re.compile(r'(?<!\d)(\d{11})(?!\d)')
+# Reglas fonéticas del español, en orden
+_PHONETIC_RULES = [
+    (re.compile(r'qu'), 'k'), (re.compile(r'c([ei])'), r's\1'), (re.compile(r'g([ei])'), r'j\1'),
+    (re.compile(r'll'), 'y'), (re.compile(r'h'), ''), (re.compile(r'[cq]'), 'k'), (re.compile(r'z'), 's'),
+    (re.compile(r'v'), 'b'), (re.compile(r'w'), 'u'), (re.compile(r'x'), 'ks'), (re.compile(r'(.)\1+'), r'\1'),
+]
+# Peso de la similitud entre claves fonéticas: misma pronunciación con otra ortografía
+# ('konstructora basques') alcanza el umbral por defecto, pero no la supera una coincidencia
+# exacta de nombre
+PHONETIC_WEIGHT = 0.9
+PAIR_BATCH = 1_000_000
+
+
+def normalize_ruc(*values):
+    """Primer RUC de 11 dígitos en `values` (el campo ruc o el id 'PE-RUC-...'), o None"""
+    for value in values:
+        match = _RUC.search(value or '')
+        if match:
+            return match.group(1)
+    return None
+
+
+def core_name(name):
+    """Nombre normalizado sin forma societaria ni palabras vacías"""
+    return ' '.join(word for word in normalize_name(name).split() if word not in LEGAL_WORDS)
+
+
+def phonetic_key(core):
+    """Clave fonética del nombre: 'constructora vasquez' y 'konstructora basques' coinciden"""
+    words = []
+    for word in core.split():
+        if word.isdigit():
+            words.append(word)
+            continue
+        for pattern, replacement in _PHONETIC_RULES:
+            word = pattern.sub(replacement, word)
+        # Solo se conserva la primera vocal de cada palabra
+        words.append(word[:1] + re.sub(r'[aeiou]', '', word[1:]))
+    return ' '.join(words)
+
+
+def _trigram_matrix(names):
+    """Filas TF-IDF de trigramas de caracteres normalizadas (norma L2)"""
+    vocabulary = {}
+    rows, columns = [], []
+    for row, name in enumerate(names):
+        padded = f"  {name} "
+        for start in range(len(padded) - 2):
+            rows.append(row)
+            columns.append(vocabulary.setdefault(padded[start:start + 3], len(vocabulary)))
+    matrix = sparse.csr_matrix((np.ones(len(rows)), (rows, columns)), shape=(len(names), max(len(vocabulary), 1)))
+    matrix.sum_duplicates()
+    document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    idf = np.log((1 + len(names)) / (1 + document_frequency)) + 1
+    matrix = matrix @ sparse.diags(idf)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix)
+
+
+def _block_pairs(blocks, max_block):
+    """Pares (i, j) con i < j que comparten algún bloque, sin repetir"""
+    chunks = []
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > max_block:
+            continue
+        members = np.asarray(members, dtype=np.int64)
+        first, second = np.triu_indices(len(members), k=1)
+        chunks.append(np.stack((members[first], members[second]), axis=1))
+    if not chunks:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(chunks), axis=1)
+    return np.unique(pairs, axis=0)
+
+
+def _similarities(matrix, pairs):
+    """Coseno de cada par, por lotes para acotar la memoria de los productos"""
+    scores = np.empty(len(pairs))
+    for start in range(0, len(pairs), PAIR_BATCH):
+        batch = pairs[start:start + PAIR_BATCH]
+        products = matrix[batch[:, 0]].multiply(matrix[batch[:, 1]])
+        scores[start:start + len(batch)] = np.asarray(products.sum(axis=1)).ravel()
+    return scores
+
+
+def resolve_suppliers(suppliers, threshold=0.85, max_block=200):
+    """Agrupa `suppliers`, tuplas (id, nombre, ruc), en entidades.
+
+    Devuelve (links, entities): por proveedor {supplierId, entityId, score, reason} con
+    reason 'ruc', 'name' o 'self', y por entidad {id, name, ruc, memberCount}. El id de
+    la entidad es 'RUC-<ruc>' o, sin RUC, el menor id de sus proveedores, así que se
+    mantiene entre cargas mientras el grupo no cambie.
+    """
+    suppliers = sorted(suppliers, key=lambda supplier: supplier[0])
+    count = len(suppliers)
+    if not count:
+        return [], []
+    rucs = [normalize_ruc(ruc, supplier_id) for supplier_id, _, ruc in suppliers]
+    cores = [core_name(name) for _, name, _ in suppliers]
+    phonetics = [phonetic_key(core) for core in cores]
+
+    # Las palabras que aparecen en muchos nombres (constructora, servicios) no bloquean
+    word_frequency = Counter(word for core in cores for word in set(core.split()))
+    blocks = {}
+    for index, (ruc, core, phonetic) in enumerate(zip(rucs, cores, phonetics)):
+        if ruc:
+            blocks.setdefault(('ruc', ruc), []).append(index)
+        if not core:
+            continue
+        blocks.setdefault(('phonetic', phonetic), []).append(index)
+        for word in set(core.split()):
+            if len(word) >= 3 and word_frequency[word] <= max_block:
+                blocks.setdefault(('word', word), []).append(index)
+
+    pairs = _block_pairs(blocks, max_block)
+    codes = {}
+    ruc_codes = np.array([codes.setdefault(ruc, len(codes)) if ruc else -1 for ruc in rucs], dtype=np.int64)
+    has_ruc = ruc_codes >= 0
+    left, right = pairs[:, 0], pairs[:, 1]
+    same_ruc = has_ruc[left] & has_ruc[right] & (ruc_codes[left] == ruc_codes[right])
+    # Dos RUC válidos distintos son dos empresas aunque se llamen igual
+    by_name = ~(has_ruc[left] & has_ruc[right])
+    scores = np.zeros(len(pairs))
+    if by_name.any():
+        candidates = pairs[by_name]
+        scores[by_name] = np.maximum(_similarities(_trigram_matrix(cores), candidates),
+                                     PHONETIC_WEIGHT * _similarities(_trigram_matrix(phonetics), candidates))
+    matched = same_ruc | (by_name & (scores >= threshold))
+    left, right, scores, same_ruc = left[matched], right[matched], scores[matched], same_ruc[matched]
+
+    graph = sparse.coo_matrix((np.ones(len(left)), (left, right)), shape=(count, count))
+    _, labels = connected_components(graph, directed=False)
+
+    # Mejor evidencia de cada proveedor para el SAME_AS
+    best_score = np.zeros(count)
+    best_reason = np.full(count, 'self', dtype=object)
+    for index, score, ruc_match in zip(np.concatenate((left, right)).tolist(),
+                                       np.concatenate((scores, scores)).tolist(),
+                                       np.concatenate((same_ruc, same_ruc)).tolist()):
+        score = 1.0 if ruc_match else score
+        if score > best_score[index] or best_reason[index] == 'self':
+            best_score[index], best_reason[index] = score, 'ruc' if ruc_match else 'name'
+
+    members = {}
+    for index, label in enumerate(labels.tolist()):
+        members.setdefault(label, []).append(index)
+
+    links, entities = [], []
+    for group in members.values():
+        group_rucs = {rucs[index] for index in group if rucs[index]}
+        # El encadenamiento por nombre puede juntar RUC distintos: se separa por RUC y
+        # los proveedores sin RUC del grupo quedan como entidad propia
+        if len(group_rucs) > 1:
+            subgroups = {}
+            for index in group:
+                subgroups.setdefault(rucs[index] or suppliers[index][0], []).append(index)
+            groups = list(subgroups.values())
+        else:
+            groups = [group]
+        for subgroup in groups:
+            ruc = next((rucs[index] for index in subgroup if rucs[index]), None)
+            entity_id = f"RUC-{ruc}" if ruc else suppliers[subgroup[0]][0]
+            names = Counter(suppliers[index][1] for index in subgroup)
+            name = min(names, key=lambda candidate: (-names[candidate], candidate or ''))
+            entities.append({'id': entity_id, 'name': name, 'ruc': ruc, 'memberCount': len(subgroup)})
+            for index in subgroup:
+                alone = len(subgroup) == 1
+                links.append({
+                    'supplierId': suppliers[index][0],
+                    'entityId': entity_id,
+                    'score': 1.0 if alone else round(float(best_score[index]), 4),
+                    'reason': 'self' if alone else best_reason[index],
+                })
+    return links, entities
+
+
+def entity_stats(entities, links, supplier_counters, min_awards=3):
+    """Adjudicaciones por entidad sumando las de sus proveedores, con la marca de alta
+    frecuencia de SUPPLIER_ENTITY_STATS_QUERY; `supplier_counters` es {id: {awardCount, awardValue}}"""
+    stats = {entity['id']: {'awardCount': 0, 'awardValue': 0.0} for entity in entities}
+    for link in links:
+        counted = supplier_counters.get(link['supplierId'])
+        if counted:
+            stats[link['entityId']]['awardCount'] += counted['awardCount']
+            stats[link['entityId']]['awardValue'] += counted['awardValue']
+    for props in stats.values():
+        awards = props['awardCount']
+        if awards >= min_awards:
+            props['highFrequencySupplier'] = True
+            props['riskLevel'] = 'ALTO' if awards >= 10 else 'MEDIO' if awards >= 5 else 'BAJO'
+    return stats
@@ -1,44 +1,84 @@
-import requests
-import json
-
-# Configurar la URL inicial de la API
-url = 'https://contratacionesabiertas.osce.gob.pe/api/v1/recordsAfter?size=100&sourceId=seace_v3&startDate=2024-04-01&endDate=2024-11-01'
-
-# Almacenar todos los registros
-all_records = []
-max_pages = 100  # Define el número máximo de páginas para obtener
-page_count = 0  # Contador de páginas
-
-# Bucle para obtener todas las páginas
-while page_count < max_pages:
-    # Hacer la solicitud
-    response = requests.get(url)
-
-    # Comprobar si la solicitud fue exitosa
-    if response.status_code == 200:
-        data = response.json()
-        records = data.get('records', [])
-        print(f"Registros obtenidos en esta llamada: {len(records)}")
-
-        # Agregar los registros de esta página a la lista completa
-        all_records.extend(records)
-
-        # Verificar si hay más registros en la siguiente página
-        next_link = data.get('links', {}).get('next')
-        print(f"Enlace next: {next_link}")  # Imprimir el enlace `next` para diagnóstico
-
-        if not next_link:
-            print("No hay más páginas disponibles.")
-            break
+import argparse
+import os
+from datetime import datetime, timedelta
+
+from ndjson_store import CHECKPOINT_FILE, Checkpoint, ShardWriter
+from ocds_harvester import OCDSHarvester, BASE_URL, SOURCE_ID
+from record_archive import RecordArchive
+from watermark import LIMA_TZ, WATERMARK_FILE, DeltaFilter, WatermarkStore
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Descarga registros OCDS de SEACE por ventanas de fechas")
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--source-id', default=SOURCE_ID)
+    parser.add_argument('--start-date', default='2024-04-01')
+    parser.add_argument('--end-date', default='2024-11-01')
+    parser.add_argument('--window-days', type=int, default=7, help="Días por ventana de descarga")
+    parser.add_argument('--workers', type=int, default=8, help="Ventanas descargadas en paralelo")
+    parser.add_argument('--max-pages', type=int, default=None, help="Máximo de páginas por ventana")
+    parser.add_argument('--output-dir', default='contratos_ndjson', help="Directorio de shards NDJSON")
+    parser.add_argument('--shard-size', type=int, default=50000, help="Registros por shard")
+    parser.add_argument('--compress', action='store_true', help="Comprimir los shards con gzip")
+    parser.add_argument('--restart', action='store_true', help="Ignorar el checkpoint y descargar todo de nuevo")
+    parser.add_argument('--archive', help="Guardar además los compiledRelease en un archivo indexado por OCID")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Descargar solo lo publicado o modificado después de la última marca de agua")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    writer = ShardWriter(args.output_dir, max_records_per_shard=args.shard_size, compress=args.compress)
+    checkpoint_path = os.path.join(args.output_dir, CHECKPOINT_FILE)
+    if args.restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = Checkpoint(checkpoint_path)
+
+    start_date, end_date = args.start_date, args.end_date
+    watermarks = WatermarkStore(os.path.join(args.output_dir, WATERMARK_FILE))
+    delta_filter = DeltaFilter(watermarks.get(args.source_id) if args.incremental else None)
+    if args.incremental:
+        if delta_filter.watermark is not None:
+            start_date = delta_filter.watermark.astimezone(LIMA_TZ).date().isoformat()
+            print(f"Modo incremental: marca de agua {delta_filter.watermark.isoformat()}")
         else:
-            # Actualizar la URL con el enlace `next`
-            url = next_link
-            page_count += 1  # Incrementar el contador de páginas
-    else:
-        print(f"Error en la solicitud: {response.status_code}")
-        break
-
-# Guardar todos los datos en un archivo JSON
-with open('contratos_completos.json', 'w') as file:
-    json.dump({"records": all_records}, file, indent=4)
-print(f"Datos guardados en 'contratos_completos.json' con un total de {len(all_records)} registros.")
+            print("Modo incremental: no hay marca de agua previa, se descarga el rango completo")
+        end_date = (datetime.now(LIMA_TZ).date() + timedelta(days=1)).isoformat()
+    archive = RecordArchive(args.archive) if args.archive else None
+
+    def on_page(window, records, next_link):
+        delta = delta_filter(records)
+        print(f"Registros obtenidos en esta llamada ({window[0]} a {window[1]}): {len(records)}, nuevos: {len(delta)}")
+        writer.write_records(delta)
+        if archive is not None:
+            archive.add_records(delta)
+
+    harvester = OCDSHarvester(base_url=args.base_url, source_id=args.source_id, max_workers=args.workers)
+    try:
+        stats = harvester.harvest(start_date, end_date, on_page, window_days=args.window_days,
+                                  max_pages_per_window=args.max_pages, checkpoint=checkpoint)
+    finally:
+        harvester.close()
+        writer.close()
+        if archive is not None:
+            archive.close()
+
+    print(f"Datos guardados en '{args.output_dir}' con {writer.total_records} registros nuevos.")
+
+    # La marca solo avanza si todas las ventanas terminaron; si no, se perderían registros
+    if args.incremental:
+        if stats.failed_windows or args.max_pages is not None:
+            print("La marca de agua no se actualiza porque la descarga quedó incompleta")
+        else:
+            if delta_filter.new_watermark is not None:
+                watermarks.set(args.source_id, delta_filter.new_watermark)
+                print(f"Nueva marca de agua: {delta_filter.new_watermark.isoformat()}")
+            # Las ventanas completas no deben saltarse en la siguiente corrida incremental
+            if os.path.exists(checkpoint_path):
+                os.remove(checkpoint_path)
+
+
+if __name__ == "__main__":
+    main()
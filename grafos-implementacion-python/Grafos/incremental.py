@@ -0,0 +1,45 @@
+"""Alcance de una carga delta: qué entidades hay que volver a analizar.
+
+Se registra el estado de las contrataciones modificadas antes de borrarlas y el de las
+contrataciones escritas después de cargarlas; con ambos se sabe qué compradores y
+proveedores revisar y cómo ajustar los agregados por categoría sin releer el historial.
+"""
+from outliers import group_key
+
+
+class DeltaScope:
+    """OCID escritos, compradores y proveedores afectados y adjudicaciones antes/después"""
+
+    def __init__(self):
+        self.ocids = set()
+        self.buyers = set()
+        self.suppliers = set()
+        # award_id -> (categoría, moneda, monto)
+        self.removed_awards = {}
+        self.added_awards = {}
+
+    def add(self, rows, before):
+        """Registra filas de SCOPE_QUERY; `before` indica que son el estado previo al borrado"""
+        awards = self.removed_awards if before else self.added_awards
+        for row in rows:
+            if not before:
+                self.ocids.add(row['ocid'])
+            self.buyers.update(row['buyerIds'])
+            self.suppliers.update(row['supplierIds'])
+            for award in row['awards']:
+                if award['id'] is not None and award['category'] is not None and award['value'] is not None:
+                    awards[award['id']] = (award['category'], award['currency'], award['value'])
+
+    def category_deltas(self, by_currency=False):
+        """Cambios de conteo, suma y suma de cuadrados por grupo: {key: fila para CategoryStats}"""
+        deltas = {}
+        for awards, sign in ((self.removed_awards, -1), (self.added_awards, 1)):
+            for category, currency, value in awards.values():
+                currency = currency if by_currency else None
+                key = group_key(category, currency)
+                row = deltas.setdefault(key, {'key': key, 'category': category, 'currency': currency,
+                                              'count': 0, 'sum': 0.0, 'sumSquares': 0.0})
+                row['count'] += sign
+                row['sum'] += sign * value
+                row['sumSquares'] += sign * value * value
+        return deltas
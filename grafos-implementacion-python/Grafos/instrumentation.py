@@ -0,0 +1,353 @@
+"""Métricas por etapa de la carga: tiempo, filas, memoria, contadores de Neo4j y
+profundidad de las colas entre etapas.
+
+Cada etapa se mide con `Instrumentation.stage(nombre)`; las que se repiten (una por lote)
+se acumulan bajo el mismo nombre. El resultado se exporta como JSON y en el formato de
+texto de Prometheus, y opcionalmente con cProfile o tracemalloc para etapas en Python.
+"""
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILERS = ('cprofile', 'tracemalloc')
+
+
+def peak_rss_mb():
+    """Pico de memoria residente del proceso hasta ahora, en MB (None si no se puede medir)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB y macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class StageMetrics:
+    """Acumulado de una etapa: llamadas, segundos, filas leídas y escritas, pico de RSS"""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows_in = None
+        self.rows_out = None
+        self.peak_rss_mb = None
+        self.python_peak_mb = None
+
+    def rows_per_second(self):
+        rows = self.rows_out if self.rows_out is not None else self.rows_in
+        if rows is None or self.seconds <= 0:
+            return None
+        return rows / self.seconds
+
+    def as_dict(self):
+        return {
+            'stage': self.name,
+            'calls': self.calls,
+            'seconds': round(self.seconds, 6),
+            'rowsIn': self.rows_in,
+            'rowsOut': self.rows_out,
+            'rowsPerSecond': self.rows_per_second(),
+            'peakRssMb': self.peak_rss_mb,
+            'pythonPeakMb': self.python_peak_mb,
+        }
+
+
+class QueueMetrics:
+    """Profundidad de una cola entre etapas, muestreada en cada entrada y salida"""
+
+    def __init__(self, name, capacity):
+        self.name = name
+        self.capacity = capacity
+        self.samples = 0
+        self.total = 0
+        self.max_depth = 0
+        # Veces que el productor encontró la cola llena y tuvo que esperar
+        self.full = 0
+
+    def observe(self, depth):
+        self.samples += 1
+        self.total += depth
+        self.max_depth = max(self.max_depth, depth)
+        if self.capacity and depth >= self.capacity:
+            self.full += 1
+
+    def as_dict(self):
+        return {
+            'queue': self.name,
+            'capacity': self.capacity,
+            'samples': self.samples,
+            'meanDepth': round(self.total / self.samples, 3) if self.samples else None,
+            'maxDepth': self.max_depth,
+            'fullSamples': self.full,
+        }
+
+
+class StageCall:
+    """Medición en curso; la etapa suma filas con count_in/count_out"""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.rows_in = None
+        self.rows_out = None
+
+    def count_in(self, rows):
+        self.rows_in = (self.rows_in or 0) + rows
+
+    def count_out(self, rows):
+        self.rows_out = (self.rows_out or 0) + rows
+
+
+class Instrumentation:
+    """Registro de métricas de una carga, compartido por los hilos de las etapas.
+
+    `profile` activa 'cprofile' o 'tracemalloc' en las etapas marcadas `python=True`;
+    ambos son globales al intérprete, así que se mide una de esas etapas a la vez y las
+    que coinciden en el tiempo quedan sin perfil.
+    """
+
+    def __init__(self, profile=None):
+        if profile not in (None,) + PROFILERS:
+            raise ValueError(f"Perfilador desconocido: {profile}")
+        self.profile = profile
+        self.stages = {}
+        self.started = time.perf_counter()
+        self.profiles = {}
+        self.queues = {}
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+        self._local = threading.local()
+
+    def current(self):
+        """Medición activa en este hilo, o None"""
+        return getattr(self._local, 'call', None)
+
+    def current_name(self, default=None):
+        call = self.current()
+        return call.metrics.name if call is not None else default
+
+    def count_in(self, rows):
+        call = self.current()
+        if call is not None:
+            call.count_in(rows)
+
+    def count_out(self, rows):
+        call = self.current()
+        if call is not None:
+            call.count_out(rows)
+
+    @contextmanager
+    def stage(self, name, rows_in=None, python=False):
+        with self._lock:
+            metrics = self.stages.setdefault(name, StageMetrics(name))
+        call = StageCall(metrics)
+        if rows_in is not None:
+            call.count_in(rows_in)
+        outer, self._local.call = self.current(), call
+
+        profiling = python and self.profile is not None and self._profile_lock.acquire(blocking=False)
+        profiler = None
+        if profiling:
+            if self.profile == 'cprofile':
+                profiler = cProfile.Profile()
+                profiler.enable()
+            else:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                tracemalloc.reset_peak()
+
+        started = time.perf_counter()
+        try:
+            yield call
+        finally:
+            seconds = time.perf_counter() - started
+            python_peak = None
+            if profiling:
+                if profiler is not None:
+                    profiler.disable()
+                else:
+                    python_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+                self._profile_lock.release()
+            self._local.call = outer
+            self._record(metrics, call, seconds, profiler, python_peak)
+
+    def _record(self, metrics, call, seconds, profiler, python_peak):
+        rss = peak_rss_mb()
+        with self._lock:
+            metrics.calls += 1
+            metrics.seconds += seconds
+            if call.rows_in is not None:
+                metrics.rows_in = (metrics.rows_in or 0) + call.rows_in
+            if call.rows_out is not None:
+                metrics.rows_out = (metrics.rows_out or 0) + call.rows_out
+            if rss is not None:
+                metrics.peak_rss_mb = max(metrics.peak_rss_mb or 0.0, rss)
+            if python_peak is not None:
+                metrics.python_peak_mb = max(metrics.python_peak_mb or 0.0, python_peak)
+            if profiler is not None:
+                if metrics.name in self.profiles:
+                    self.profiles[metrics.name].add(profiler)
+                else:
+                    self.profiles[metrics.name] = pstats.Stats(profiler)
+
+    def record(self, name, seconds, rows_in=None, rows_out=None):
+        """Suma a la etapa `name` trabajo medido en otro proceso (p. ej. el pool de
+        transformación), que no pasa por stage()"""
+        with self._lock:
+            metrics = self.stages.setdefault(name, StageMetrics(name))
+        call = StageCall(metrics)
+        call.rows_in, call.rows_out = rows_in, rows_out
+        self._record(metrics, call, seconds, None, None)
+
+    def queue_depth(self, name, depth, capacity=None):
+        """Muestra de la profundidad de la cola `name` (elementos esperando)"""
+        with self._lock:
+            queue = self.queues.get(name)
+            if queue is None:
+                queue = self.queues[name] = QueueMetrics(name, capacity)
+            queue.observe(depth)
+
+    def timed(self, name, func, python=False):
+        """Envuelve `func` para medirla como la etapa `name`"""
+        def run(*args, **kwargs):
+            with self.stage(name, python=python):
+                return func(*args, **kwargs)
+        return run
+
+    def propagate(self, func):
+        """Envuelve `func` para que en otro hilo siga contando filas en la etapa actual"""
+        call = self.current()
+
+        def run(*args, **kwargs):
+            outer, self._local.call = self.current(), call
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._local.call = outer
+        return run
+
+    def counted(self, rows):
+        """Recorre `rows` sumando lo leído a las filas de entrada de la etapa actual"""
+        call = self.current()
+        count = 0
+        try:
+            for row in rows:
+                count += 1
+                yield row
+        finally:
+            if call is not None:
+                call.count_in(count)
+
+    def iterate(self, name, iterable):
+        """Mide como etapa `name` el tiempo dentro del iterador (p. ej. el parseo); ese
+        tiempo también queda incluido en la etapa que lo consume"""
+        with self._lock:
+            metrics = self.stages.setdefault(name, StageMetrics(name))
+        call = StageCall(metrics)
+        call.rows_out = 0
+        seconds = 0.0
+        iterator = iter(iterable)
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    seconds += time.perf_counter() - started
+                call.rows_out += 1
+                yield item
+        finally:
+            self._record(metrics, call, seconds, None, None)
+
+    def as_dict(self, write_counters=None):
+        """Métricas por etapa en orden de primera ejecución, con los contadores de escritura
+        de Neo4j (WriteCounters.as_dict) de la etapa del mismo nombre"""
+        write_counters = write_counters or {}
+        with self._lock:
+            stages = []
+            for metrics in self.stages.values():
+                stage = metrics.as_dict()
+                stage['neo4j'] = write_counters.get(metrics.name)
+                stages.append(stage)
+            return {
+                'totalSeconds': round(time.perf_counter() - self.started, 6),
+                'peakRssMb': peak_rss_mb(),
+                'profile': self.profile,
+                'stages': stages,
+                'queues': [queue.as_dict() for queue in self.queues.values()],
+            }
+
+    def to_prometheus(self, write_counters=None, prefix='ocds_loader'):
+        """Métricas en el formato de texto de Prometheus (p. ej. para el textfile collector)"""
+        report = self.as_dict(write_counters)
+        series = {
+            'stage_seconds': ('Tiempo de pared acumulado por etapa', 'seconds'),
+            'stage_calls': ('Veces que se ejecutó la etapa', 'calls'),
+            'stage_rows_in': ('Filas leídas por la etapa', 'rowsIn'),
+            'stage_rows_out': ('Filas escritas por la etapa', 'rowsOut'),
+            'stage_rows_per_second': ('Filas por segundo de la etapa', 'rowsPerSecond'),
+            'stage_peak_rss_megabytes': ('Pico de RSS del proceso al terminar la etapa', 'peakRssMb'),
+        }
+        lines = []
+        for metric, (help_text, field) in series.items():
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} gauge")
+            for stage in report['stages']:
+                if stage[field] is not None:
+                    lines.append(f'{prefix}_{metric}{{stage="{stage["stage"]}"}} {stage[field]}')
+
+        counter_fields = sorted({field for stage in report['stages'] for field in (stage['neo4j'] or {})})
+        for field in counter_fields:
+            lines.append(f"# HELP {prefix}_neo4j_{field} Contador {field} de Neo4j por etapa")
+            lines.append(f"# TYPE {prefix}_neo4j_{field} gauge")
+            for stage in report['stages']:
+                if stage['neo4j']:
+                    lines.append(f'{prefix}_neo4j_{field}{{stage="{stage["stage"]}"}} {stage["neo4j"][field]}')
+
+        queue_series = {
+            'queue_depth_mean': ('Profundidad media de la cola entre etapas', 'meanDepth'),
+            'queue_depth_max': ('Profundidad máxima de la cola entre etapas', 'maxDepth'),
+            'queue_capacity': ('Capacidad de la cola entre etapas', 'capacity'),
+            'queue_full_samples': ('Muestras con la cola llena (el productor espera)', 'fullSamples'),
+        }
+        for metric, (help_text, field) in queue_series.items():
+            if not report['queues']:
+                break
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} gauge")
+            for queue in report['queues']:
+                if queue[field] is not None:
+                    lines.append(f'{prefix}_{metric}{{queue="{queue["queue"]}"}} {queue[field]}')
+
+        lines.append(f"# HELP {prefix}_total_seconds Duración total de la carga")
+        lines.append(f"# TYPE {prefix}_total_seconds gauge")
+        lines.append(f"{prefix}_total_seconds {report['totalSeconds']}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, json_path=None, prometheus_path=None, profile_dir=None, write_counters=None):
+        if json_path:
+            with open(json_path, 'w', encoding='utf-8') as file:
+                json.dump(self.as_dict(write_counters), file, ensure_ascii=False, indent=2)
+        if prometheus_path:
+            with open(prometheus_path, 'w', encoding='utf-8') as file:
+                file.write(self.to_prometheus(write_counters))
+        if profile_dir and self.profiles:
+            os.makedirs(profile_dir, exist_ok=True)
+            for name, stats in self.profiles.items():
+                stats.dump_stats(os.path.join(profile_dir, f"{name}.prof"))
+
+    def slowest(self, count=5):
+        with self._lock:
+            return sorted(self.stages.values(), key=lambda metrics: metrics.seconds, reverse=True)[:count]
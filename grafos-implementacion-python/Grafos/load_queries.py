@@ -0,0 +1,669 @@
+from supplier_search import SEARCH_INDEX_QUERY
+
+# Constraints e índices del esquema; los crea la carga en línea y los escribe
+# bulk_export para después de neo4j-admin import
+CONSTRAINTS = [
+    "CREATE CONSTRAINT buyer_id IF NOT EXISTS FOR (b:Buyer) REQUIRE b.id IS UNIQUE",
+    "CREATE CONSTRAINT item_id IF NOT EXISTS FOR (i:Item) REQUIRE i.id IS UNIQUE",
+    "CREATE CONSTRAINT award_id IF NOT EXISTS FOR (a:Award) REQUIRE a.id IS UNIQUE",
+    "CREATE CONSTRAINT contract_id IF NOT EXISTS FOR (c:Contract) REQUIRE c.id IS UNIQUE",
+    "CREATE CONSTRAINT procurement_ocid IF NOT EXISTS FOR (p:Procurement) REQUIRE p.ocid IS UNIQUE",
+    "CREATE CONSTRAINT supplier_id IF NOT EXISTS FOR (s:Supplier) REQUIRE s.id IS UNIQUE",
+    "CREATE CONSTRAINT category_stats_key IF NOT EXISTS FOR (c:CategoryStats) REQUIRE c.key IS UNIQUE",
+    "CREATE INDEX award_category_value IF NOT EXISTS FOR (a:Award) ON (a.category, a.value)",
+    "CREATE CONSTRAINT splitting_alert_id IF NOT EXISTS FOR (s:SplittingAlert) REQUIRE s.id IS UNIQUE",
+    "CREATE CONSTRAINT supplier_entity_id IF NOT EXISTS FOR (e:SupplierEntity) REQUIRE e.id IS UNIQUE",
+    "CREATE INDEX buyer_procurement_count IF NOT EXISTS FOR (b:Buyer) ON (b.procurementCount)",
+    "CREATE INDEX supplier_award_count IF NOT EXISTS FOR (s:Supplier) ON (s.awardCount)",
+    "CREATE INDEX buys_from_awards IF NOT EXISTS FOR ()-[r:BUYS_FROM]-() ON (r.awards)",
+    SEARCH_INDEX_QUERY,
+]
+
+# Consultas de carga por entidad; cada una recibe `$rows` con las filas de projection.EntityRows
+# (EntityRows.load_rows: valores por defecto y fechas ya resueltos en Python). En una carga
+# completa cada nodo se queda con su primera aparición (ON CREATE SET), como en projection
+NODE_QUERIES = {
+    'buyers': """
+        UNWIND $rows AS row
+        MERGE (b:Buyer {id: row.id})
+        ON CREATE SET b.name = row.name,
+            b.ruc = row.ruc,
+            b.address = row.address,
+            b.contactPoint = row.contactPoint,
+            b.email = row.email,
+            b.telephone = row.telephone,
+            b.region = row.region
+    """,
+    'procurements': """
+        UNWIND $rows AS row
+        MERGE (p:Procurement {ocid: row.ocid})
+        ON CREATE SET p.id = row.id,
+            p.title = row.title,
+            p.description = row.description,
+            p.publishedDate = row.publishedDate,
+            p.procurementMethod = row.procurementMethod,
+            p.procurementMethodDetails = row.procurementMethodDetails,
+            p.mainCategory = row.mainCategory,
+            p.contentHash = row.contentHash
+    """,
+    'items': """
+        UNWIND $rows AS row
+        MERGE (i:Item {id: row.id})
+        ON CREATE SET i.description = row.description,
+            i.status = row.status,
+            i.quantity = row.quantity
+    """,
+    'awards': """
+        UNWIND $rows AS row
+        MERGE (a:Award {id: row.id})
+        ON CREATE SET a.title = row.title,
+            a.value = row.value,
+            a.currency = row.currency,
+            a.date = row.date,
+            a.category = row.category
+    """,
+    # Un contrato se escribe con el lote que trae su Award; si no llega, no se carga (transform_pipeline.py)
+    'contracts': """
+        UNWIND $rows AS row
+        MERGE (c:Contract {id: row.id})
+        ON CREATE SET c.title = row.title,
+            c.description = row.description,
+            c.value = row.value,
+            c.currency = row.currency,
+            c.awardID = row.awardID,
+            c.status = row.status
+    """,
+    'suppliers': """
+        UNWIND $rows AS row
+        MERGE (s:Supplier {id: row.id})
+        ON CREATE SET s.name = row.name,
+            s.ruc = row.ruc,
+            s.legalName = row.legalName,
+            s.address = row.address,
+            s.region = row.region,
+            s.searchName = row.searchName
+    """,
+}
+
+# Modo delta: un OCID modificado vuelve a escribir sus nodos, así que las propiedades se
+# sobrescriben en vez de conservar las de la primera carga
+DELTA_NODE_QUERIES = {kind: query.replace('ON CREATE SET', 'SET') for kind, query in NODE_QUERIES.items()}
+
+EDGE_QUERIES = {
+    'published': """
+        UNWIND $rows AS row
+        MATCH (b:Buyer {id: row.buyerId})
+        MATCH (p:Procurement {ocid: row.ocid})
+        MERGE (b)-[:PUBLISHED]->(p)
+    """,
+    'includes': """
+        UNWIND $rows AS row
+        MATCH (p:Procurement {ocid: row.ocid})
+        MATCH (i:Item {id: row.itemId})
+        MERGE (p)-[:INCLUDES]->(i)
+    """,
+    'awarded_to': """
+        UNWIND $rows AS row
+        MATCH (a:Award {id: row.awardId})
+        MATCH (s:Supplier {id: row.supplierId})
+        MERGE (a)-[:AWARDED_TO]->(s)
+    """,
+    'has_award': """
+        UNWIND $rows AS row
+        MATCH (p:Procurement {ocid: row.ocid})
+        MATCH (a:Award {id: row.awardId})
+        MERGE (p)-[:HAS_AWARD]->(a)
+    """,
+    'has_contract': """
+        UNWIND $rows AS row
+        MATCH (a:Award {id: row.awardId})
+        MATCH (c:Contract {id: row.contractId})
+        MERGE (a)-[:HAS_CONTRACT]->(c)
+    """,
+}
+
+NODE_MESSAGES = {
+    'buyers': "3. Cargando compradores con información extendida...",
+    'procurements': "4. Cargando contrataciones...",
+    'items': "5. Cargando ítems...",
+    'awards': "6. Cargando adjudicaciones...",
+    'contracts': "7. Cargando contratos...",
+    'suppliers': "8. Cargando proveedores con información extendida...",
+}
+
+# Etiqueta que escribe cada etapa de nodos y etapas que deben terminar antes
+NODE_LABELS = {
+    'buyers': 'Buyer',
+    'procurements': 'Procurement',
+    'items': 'Item',
+    'awards': 'Award',
+    'contracts': 'Contract',
+    'suppliers': 'Supplier',
+}
+# Ninguna por ahora: los contratos esperan a su Award al transformar, sin consultar la base
+NODE_DEPENDENCIES = {}
+
+# Relación -> (clave de origen, clave de destino, etapas de nodos de sus extremos)
+EDGE_ENDPOINTS = {
+    'published': ('buyerId', 'ocid', ('buyers', 'procurements')),
+    'includes': ('ocid', 'itemId', ('procurements', 'items')),
+    'awarded_to': ('awardId', 'supplierId', ('awards', 'suppliers')),
+    'has_award': ('ocid', 'awardId', ('procurements', 'awards')),
+    'has_contract': ('awardId', 'contractId', ('awards', 'contracts')),
+}
+
+# Modo delta: huellas guardadas y limpieza de lo que cuelga de una contratación modificada
+EXISTING_HASHES_QUERY = """
+    UNWIND $ocids AS ocid
+    MATCH (p:Procurement {ocid: ocid})
+    RETURN p.ocid AS ocid, p.contentHash AS contentHash
+"""
+
+REMOVE_STALE_QUERY = """
+    UNWIND $rows AS ocid
+    MATCH (p:Procurement {ocid: ocid})
+    OPTIONAL MATCH (p)-[:HAS_AWARD]->(a:Award)
+    OPTIONAL MATCH (a)-[:HAS_CONTRACT]->(c:Contract)
+    WITH p, collect(DISTINCT a) AS awards, collect(DISTINCT c) AS contracts
+    FOREACH (c IN contracts | DETACH DELETE c)
+    FOREACH (a IN awards | DETACH DELETE a)
+    WITH p
+    OPTIONAL MATCH (p)-[r:INCLUDES|PUBLISHED|RELATED_TIME]-()
+    DELETE r
+"""
+
+# Estado de contrataciones para DeltaScope: compradores, proveedores y adjudicaciones
+SCOPE_QUERY = """
+    UNWIND $ocids AS ocid
+    MATCH (p:Procurement {ocid: ocid})
+    OPTIONAL MATCH (b:Buyer)-[:PUBLISHED]->(p)
+    OPTIONAL MATCH (p)-[:HAS_AWARD]->(a:Award)
+    OPTIONAL MATCH (a)-[:AWARDED_TO]->(s:Supplier)
+    RETURN p.ocid AS ocid, collect(DISTINCT b.id) AS buyerIds, collect(DISTINCT s.id) AS supplierIds,
+           collect(DISTINCT {id: a.id, category: a.category, currency: a.currency, value: a.value}) AS awards
+"""
+
+# Análisis de riesgo: versión global y versión limitada a los `$rows` (ids) de un delta.
+# Las versiones limitadas van precedidas de su RESET, porque las propiedades solo se
+# asignan cuando se cumple la condición.
+HIGH_FREQUENCY_BODY = """
+    WITH s, count(a) as awards_count, collect(a) as awards,
+         sum(a.value) as total_value,
+         collect(DISTINCT a.currency) as currencies
+    WHERE awards_count >= 3
+    SET s.highFrequencySupplier = true,
+        s.totalAwards = awards_count,
+        s.totalValue = total_value,
+        s.averageAwardValue = total_value / awards_count,
+        s.currencies = currencies,
+        s.riskLevel = CASE
+            WHEN awards_count >= 10 THEN 'ALTO'
+            WHEN awards_count >= 5 THEN 'MEDIO'
+            ELSE 'BAJO'
+        END
+"""
+HIGH_FREQUENCY_QUERY = "MATCH (s:Supplier)<-[:AWARDED_TO]-(a:Award)" + HIGH_FREQUENCY_BODY
+HIGH_FREQUENCY_SCOPED_QUERY = """
+    UNWIND $rows AS supplierId
+    MATCH (s:Supplier {id: supplierId})<-[:AWARDED_TO]-(a:Award)
+""" + HIGH_FREQUENCY_BODY
+HIGH_FREQUENCY_RESET_QUERY = """
+    UNWIND $rows AS supplierId
+    MATCH (s:Supplier {id: supplierId})
+    REMOVE s.highFrequencySupplier, s.totalAwards, s.totalValue, s.averageAwardValue, s.currencies, s.riskLevel
+"""
+
+QUICK_AWARD_BODY = """
+    WHERE a.date IS NOT NULL
+    AND p.publishedDate IS NOT NULL
+    AND datetime(a.date) IS NOT NULL
+    AND datetime(p.publishedDate) IS NOT NULL
+    WITH p, a, duration.inDays(datetime(p.publishedDate), datetime(a.date)).days as days
+    WHERE days <= 3
+    SET p.quickAward = true,
+        p.awardDays = days,
+        p.awardSpeed = CASE
+            WHEN days = 0 THEN 'MISMO_DIA'
+            WHEN days = 1 THEN 'UN_DIA'
+            ELSE 'DOS_A_TRES_DIAS'
+        END,
+        p.riskLevel = CASE
+            WHEN days = 0 THEN 'ALTO'
+            WHEN days = 1 THEN 'MEDIO'
+            ELSE 'BAJO'
+        END
+"""
+QUICK_AWARD_QUERY = "MATCH (p:Procurement)-[:HAS_AWARD]->(a:Award)" + QUICK_AWARD_BODY
+QUICK_AWARD_SCOPED_QUERY = """
+    UNWIND $rows AS ocid
+    MATCH (p:Procurement {ocid: ocid})-[:HAS_AWARD]->(a:Award)
+""" + QUICK_AWARD_BODY
+
+QUICK_AWARD_RESET_QUERY = """
+    UNWIND $rows AS ocid
+    MATCH (p:Procurement {ocid: ocid})
+    REMOVE p.quickAward, p.awardDays, p.awardSpeed, p.riskLevel
+"""
+
+DAILY_ACTIVITY_BODY = """
+    WHERE p.publishedDate IS NOT NULL
+    WITH p, date(p.publishedDate) as award_date, avg(a.value) as avg_daily_value, count(a) as daily_awards
+    SET p.avgDailyValue = avg_daily_value,
+        p.dailyAwards = daily_awards,
+        p.unusualDailyActivity = CASE
+            WHEN daily_awards >= 10 THEN 'ALTO'
+            WHEN daily_awards >= 5 THEN 'MEDIO'
+            ELSE 'NORMAL'
+        END
+"""
+DAILY_ACTIVITY_QUERY = "MATCH (p:Procurement)-[:HAS_AWARD]->(a:Award)" + DAILY_ACTIVITY_BODY
+DAILY_ACTIVITY_SCOPED_QUERY = """
+    UNWIND $rows AS ocid
+    MATCH (p:Procurement {ocid: ocid})-[:HAS_AWARD]->(a:Award)
+""" + DAILY_ACTIVITY_BODY
+
+
+DAILY_ACTIVITY_RESET_QUERY = """
+    UNWIND $rows AS ocid
+    MATCH (p:Procurement {ocid: ocid})
+    REMOVE p.avgDailyValue, p.dailyAwards, p.unusualDailyActivity
+"""
+
+# Estadísticas que se imprimen al terminar el análisis
+REGION_STATS_QUERY = """
+    MATCH (s:Supplier)<-[:AWARDED_TO]-(a:Award)
+    WHERE s.region <> 'No Region'  // Excluir explícitamente "No Region"
+    WITH s.region as region,
+         count(DISTINCT s) as supplier_count,
+         sum(a.value) as total_value
+    WHERE region IS NOT NULL
+    WITH region, supplier_count, total_value
+    ORDER BY total_value DESC
+    LIMIT 5
+    RETURN
+        region,
+        supplier_count,
+        total_value,
+        CASE
+            WHEN supplier_count <= 3 THEN 'ALTA'
+            WHEN supplier_count <= 5 THEN 'MEDIA'
+            ELSE 'BAJA'
+        END as concentration
+"""
+
+DAILY_STATS_QUERY = """
+    MATCH (p:Procurement)
+    WHERE p.unusualDailyActivity = 'ALTO'
+    RETURN count(p) as high_activity_days,
+           avg(p.dailyAwards) as avg_awards_per_day,
+           max(p.dailyAwards) as max_awards_per_day
+"""
+
+QUICK_AWARD_STATS_QUERY = """
+    MATCH (p:Procurement)
+    WHERE p.quickAward = true AND p.awardSpeed IS NOT NULL
+    WITH
+        count(p) as quick_awards,
+        count(CASE WHEN p.awardSpeed = 'MISMO_DIA' THEN p END) as same_day,
+        count(CASE WHEN p.awardSpeed = 'UN_DIA' THEN p END) as one_day,
+        count(CASE WHEN p.awardSpeed = 'DOS_A_TRES_DIAS' THEN p END) as two_to_three_days
+    RETURN
+        quick_awards,
+        same_day,
+        one_day,
+        two_to_three_days,
+        round(100.0 * same_day / quick_awards, 2) as same_day_percentage,
+        round(100.0 * one_day / quick_awards, 2) as one_day_percentage
+"""
+
+HIGH_RISK_SUPPLIERS_QUERY = """
+    MATCH (s:Supplier)
+    WHERE s.riskLevel = 'ALTO'
+    RETURN count(s) as count, avg(s.totalValue) as avg_value
+"""
+
+# RELATED_TIME: fechas por comprador para el barrido en Python y escritura de las relaciones
+RELATED_TIME_SOURCE_QUERY = """
+    MATCH (b:Buyer)-[:PUBLISHED]->(p:Procurement)
+    WHERE p.publishedDate IS NOT NULL
+    RETURN b.id AS buyerId, p.ocid AS ocid, p.publishedDate.epochMillis AS epochMillis,
+           p.mainCategory AS category
+"""
+
+RELATED_TIME_SCOPED_SOURCE_QUERY = """
+    UNWIND $buyerIds AS buyerId
+    MATCH (b:Buyer {id: buyerId})-[:PUBLISHED]->(p:Procurement)
+    WHERE p.publishedDate IS NOT NULL
+    RETURN b.id AS buyerId, p.ocid AS ocid, p.publishedDate.epochMillis AS epochMillis,
+           p.mainCategory AS category
+"""
+
+RELATED_TIME_WRITE_QUERY = """
+    UNWIND $rows AS row
+    MATCH (p1:Procurement {ocid: row.source})
+    MATCH (p2:Procurement {ocid: row.target})
+    MERGE (p1)-[r:RELATED_TIME]->(p2)
+    SET r.daysBetween = row.days,
+        r.sameCategory = row.sameCategory
+"""
+
+# Montos inusuales: valores por categoría en columnas para outliers.py y escritura del resultado
+AWARD_AMOUNTS_QUERY = """
+    MATCH (p:Procurement)-[:HAS_AWARD]->(a:Award)
+    WHERE a.value IS NOT NULL
+    RETURN a.id AS id, a.value AS value, p.mainCategory AS category, a.currency AS currency
+"""
+
+# Agregados acumulados por grupo (categoría o categoría|moneda) para el modo delta
+CATEGORY_STATS_SET_QUERY = """
+    UNWIND $rows AS row
+    MERGE (c:CategoryStats {key: row.key})
+    SET c.category = row.category,
+        c.currency = row.currency,
+        c.count = row.count,
+        c.sum = row.sum,
+        c.sumSquares = row.sumSquares
+"""
+
+CATEGORY_STATS_UPDATE_QUERY = """
+    UNWIND $rows AS row
+    MERGE (c:CategoryStats {key: row.key})
+    SET c.category = row.category,
+        c.currency = row.currency,
+        c.count = coalesce(c.count, 0) + row.count,
+        c.sum = coalesce(c.sum, 0.0) + row.sum,
+        c.sumSquares = coalesce(c.sumSquares, 0.0) + row.sumSquares
+    RETURN c.key AS key, c.category AS category, c.currency AS currency, c.count AS count,
+           c.sum AS sum, c.sumSquares AS sumSquares
+"""
+
+# Montos de un grupo sobre `$threshold` (índice award_category_value)
+CATEGORY_AWARDS_QUERY = """
+    MATCH (a:Award)
+    WHERE a.category = $category AND a.value > $threshold
+    AND ($currency IS NULL OR a.currency = $currency)
+    RETURN a.id AS id, a.value AS value
+"""
+
+UNUSUAL_AMOUNT_CLEAR_QUERY = """
+    MATCH (a:Award)
+    WHERE a.category = $category AND a.unusualAmount = true
+    AND ($currency IS NULL OR a.currency = $currency)
+    AND NOT a.id IN $keep
+    REMOVE a.unusualAmount, a.categoryAvg, a.categoryStdDev, a.categoryMedian, a.categoryMAD, a.deviation,
+           a.percentileRank, a.riskLevel
+"""
+
+UNUSUAL_AMOUNT_WRITE_QUERY = """
+    UNWIND $rows AS row
+    MATCH (a:Award {id: row.id})
+    SET a += row.props
+"""
+
+# REGIONAL_COOPERATION: pares (contratación, proveedor) para cooccurrence.py y escritura de los pares
+SUPPLIER_PAIRS_SOURCE_QUERY = """
+    MATCH (p:Procurement)-[:HAS_AWARD]->(:Award)-[:AWARDED_TO]->(s:Supplier)
+    RETURN DISTINCT p.ocid AS ocid, s.id AS supplierId, s.region AS region
+"""
+
+SUPPLIER_PAIRS_SCOPED_SOURCE_QUERY = """
+    UNWIND $supplierIds AS supplierId
+    MATCH (:Supplier {id: supplierId})<-[:AWARDED_TO]-(:Award)<-[:HAS_AWARD]-(p:Procurement)
+    WITH DISTINCT p
+    MATCH (p)-[:HAS_AWARD]->(:Award)-[:AWARDED_TO]->(s:Supplier)
+    RETURN DISTINCT p.ocid AS ocid, s.id AS supplierId, s.region AS region
+"""
+
+REGIONAL_COOPERATION_RESET_QUERY = """
+    UNWIND $rows AS supplierId
+    MATCH (:Supplier {id: supplierId})-[r:REGIONAL_COOPERATION]-()
+    WITH DISTINCT r
+    DELETE r
+"""
+
+REGIONAL_COOPERATION_WRITE_QUERY = """
+    UNWIND $rows AS row
+    MATCH (s1:Supplier {id: row.source})
+    MATCH (s2:Supplier {id: row.target})
+    MERGE (s1)-[r:REGIONAL_COOPERATION]->(s2)
+    SET r.sharedProcurements = row.sharedProcurements,
+        r.region = row.region,
+        r.riskLevel = row.riskLevel
+"""
+
+# Fraccionamiento: adjudicaciones por comprador para splitting.py, alertas y marca del comprador
+SPLITTING_SOURCE_QUERY = """
+    MATCH (b:Buyer)-[:PUBLISHED]->(p:Procurement)-[:HAS_AWARD]->(a:Award)
+    WHERE p.publishedDate IS NOT NULL
+    OPTIONAL MATCH (a)-[:AWARDED_TO]->(s:Supplier)
+    RETURN b.id AS buyerId, p.mainCategory AS category, p.publishedDate.epochMillis AS epochMillis,
+           a.id AS awardId, a.value AS value, collect(s.id) AS supplierIds
+"""
+
+SPLITTING_SCOPED_SOURCE_QUERY = """
+    UNWIND $buyerIds AS buyerId
+    MATCH (b:Buyer {id: buyerId})-[:PUBLISHED]->(p:Procurement)-[:HAS_AWARD]->(a:Award)
+    WHERE p.publishedDate IS NOT NULL
+    OPTIONAL MATCH (a)-[:AWARDED_TO]->(s:Supplier)
+    RETURN b.id AS buyerId, p.mainCategory AS category, p.publishedDate.epochMillis AS epochMillis,
+           a.id AS awardId, a.value AS value, collect(s.id) AS supplierIds
+"""
+
+SPLITTING_RESET_QUERY = """
+    UNWIND $rows AS buyerId
+    MATCH (b:Buyer {id: buyerId})
+    REMOVE b.potentialSplitting, b.splittingCategory, b.splittingDate, b.splittingValue, b.splittingCount,
+           b.riskLevel
+    WITH b
+    OPTIONAL MATCH (b)-[:HAS_ALERT]->(alert:SplittingAlert)
+    DETACH DELETE alert
+"""
+
+SPLITTING_ALERT_WRITE_QUERY = """
+    UNWIND $rows AS row
+    MATCH (b:Buyer {id: row.buyerId})
+    MERGE (alert:SplittingAlert {id: row.id})
+    SET alert.category = row.category,
+        alert.supplierId = row.supplierId,
+        alert.windowStart = datetime(row.windowStart),
+        alert.windowEnd = datetime(row.windowEnd),
+        alert.windowDays = row.windowDays,
+        alert.awardCount = row.awardCount,
+        alert.totalValue = row.totalValue,
+        alert.maxAwardValue = row.maxAwardValue,
+        alert.awardIds = row.awardIds,
+        alert.riskLevel = row.riskLevel
+    MERGE (b)-[:HAS_ALERT]->(alert)
+"""
+
+BUYER_SPLITTING_WRITE_QUERY = """
+    UNWIND $rows AS row
+    MATCH (b:Buyer {id: row.id})
+    SET b.potentialSplitting = true,
+        b.splittingCategory = row.props.splittingCategory,
+        b.splittingDate = date(row.props.splittingDate),
+        b.splittingValue = row.props.splittingValue,
+        b.splittingCount = row.props.splittingCount,
+        b.riskLevel = row.props.riskLevel
+"""
+
+# Agregados del dashboard: contadores por comprador y proveedor, pares comprador-proveedor
+# (BUYS_FROM) y el resumen global. Se recalculan por lotes de ids; en modo delta solo los
+# afectados, borrando antes sus pares porque un par puede desaparecer.
+BUYER_IDS_QUERY = "MATCH (b:Buyer) RETURN b.id AS id"
+SUPPLIER_IDS_QUERY = "MATCH (s:Supplier) RETURN s.id AS id"
+
+BUYER_COUNTERS_RESET_QUERY = """
+    UNWIND $rows AS buyerId
+    MATCH (b:Buyer {id: buyerId})-[r:BUYS_FROM]->()
+    DELETE r
+"""
+
+BUYER_COUNTERS_QUERY = """
+    UNWIND $rows AS buyerId
+    MATCH (b:Buyer {id: buyerId})
+    CALL {
+        WITH b
+        OPTIONAL MATCH (b)-[:PUBLISHED]->(p:Procurement)
+        RETURN count(p) AS procurements
+    }
+    SET b.procurementCount = procurements
+    WITH b
+    MATCH (b)-[:PUBLISHED]->(:Procurement)-[:HAS_AWARD]->(a:Award)-[:AWARDED_TO]->(s:Supplier)
+    WITH b, s, count(a) AS awards, sum(toFloat(a.value)) AS totalValue
+    MERGE (b)-[r:BUYS_FROM]->(s)
+    SET r.awards = awards,
+        r.totalValue = totalValue
+"""
+
+# Después de BUYER_COUNTERS_QUERY, que deja los BUYS_FROM al día, y de marcar las adjudicaciones
+# rápidas; incluye las estadísticas que muestra el buscador de proveedores
+SUPPLIER_COUNTERS_QUERY = """
+    UNWIND $rows AS supplierId
+    MATCH (s:Supplier {id: supplierId})
+    CALL {
+        WITH s
+        OPTIONAL MATCH (s)<-[:AWARDED_TO]-(a:Award)
+        OPTIONAL MATCH (p:Procurement)-[:HAS_AWARD]->(a)
+        RETURN count(a) AS awards, sum(toFloat(a.value)) AS awardValue, avg(toFloat(a.value)) AS avgValue,
+               count(CASE WHEN p.quickAward = true THEN 1 END) AS quickAwards
+    }
+    CALL {
+        WITH s
+        OPTIONAL MATCH (s)<-[:BUYS_FROM]-(b:Buyer)
+        RETURN count(b) AS buyers
+    }
+    SET s.awardCount = awards,
+        s.awardValue = awardValue,
+        s.buyerCount = buyers,
+        s.avgAwardValue = round(coalesce(avgValue, 0.0)),
+        s.quickAwardPercent = CASE WHEN awards > 0 THEN round(100.0 * quickAwards / awards) ELSE 0.0 END
+"""
+
+# Umbrales del Dashboard: proveedores frecuentes (> 5 adjudicaciones) y contratos
+# repetitivos (> 3 adjudicaciones del mismo comprador al mismo proveedor)
+DASHBOARD_SUMMARY_QUERY = """
+    CALL { MATCH (b:Buyer) RETURN count(b) AS buyers }
+    CALL { MATCH (s:Supplier) RETURN count(s) AS suppliers }
+    CALL { MATCH (p:Procurement) RETURN count(p) AS procurements }
+    CALL { MATCH (a:Award) RETURN count(a) AS awards }
+    CALL { MATCH (s:Supplier) WHERE s.awardCount > 5 RETURN count(s) AS frequentSuppliers }
+    CALL {
+        MATCH (b:Buyer) WHERE b.procurementCount > 0
+        WITH b ORDER BY b.procurementCount DESC, b.name LIMIT $topK
+        RETURN collect(b.name) AS topBuyerNames, collect(b.procurementCount) AS topBuyerTotals
+    }
+    CALL {
+        MATCH (s:Supplier) WHERE s.awardCount > 0
+        WITH s ORDER BY s.awardCount DESC, s.name LIMIT $topK
+        RETURN collect(s.name) AS topSupplierNames, collect(s.awardCount) AS topSupplierAwards
+    }
+    CALL {
+        MATCH (b:Buyer)-[r:BUYS_FROM]->(s:Supplier) WHERE r.awards > 3
+        WITH b, r, s ORDER BY r.awards DESC, b.name, s.name LIMIT $topK
+        RETURN collect(b.name) AS repetitiveBuyers, collect(s.name) AS repetitiveSuppliers,
+               collect(r.awards) AS repetitiveAwards
+    }
+    MERGE (d:DashboardSummary {id: 'current'})
+    SET d.buyers = buyers,
+        d.suppliers = suppliers,
+        d.procurements = procurements,
+        d.awards = awards,
+        d.frequentSuppliers = frequentSuppliers,
+        d.topBuyerNames = topBuyerNames,
+        d.topBuyerTotals = topBuyerTotals,
+        d.topSupplierNames = topSupplierNames,
+        d.topSupplierAwards = topSupplierAwards,
+        d.repetitiveBuyers = repetitiveBuyers,
+        d.repetitiveSuppliers = repetitiveSuppliers,
+        d.repetitiveAwards = repetitiveAwards,
+        d.updatedAt = datetime()
+"""
+
+# Resolución de entidades (entity_resolution.py): cada Supplier apunta con SAME_AS a su
+# SupplierEntity; la entidad suma las adjudicaciones de todos sus ids y lleva la misma marca de
+# alta frecuencia que HIGH_FREQUENCY_QUERY, que por id separado no se ve
+SUPPLIER_RESOLUTION_SOURCE_QUERY = """
+    MATCH (s:Supplier)
+    OPTIONAL MATCH (s)-[:SAME_AS]->(e:SupplierEntity)
+    RETURN s.id AS id, s.name AS name, s.ruc AS ruc, e.id AS entityId
+"""
+
+SUPPLIER_ENTITY_WRITE_QUERY = """
+    UNWIND $rows AS row
+    MERGE (e:SupplierEntity {id: row.id})
+    SET e.name = row.name,
+        e.ruc = row.ruc,
+        e.memberCount = row.memberCount
+"""
+
+# Un proveedor que cambia de entidad pierde su SAME_AS anterior
+SAME_AS_WRITE_QUERY = """
+    UNWIND $rows AS row
+    MATCH (s:Supplier {id: row.supplierId})
+    MATCH (e:SupplierEntity {id: row.entityId})
+    OPTIONAL MATCH (s)-[old:SAME_AS]->(other:SupplierEntity) WHERE other <> e
+    DELETE old
+    MERGE (s)-[r:SAME_AS]->(e)
+    SET r.score = row.score,
+        r.reason = row.reason
+"""
+
+SUPPLIER_ENTITY_CLEANUP_QUERY = """
+    UNWIND $rows AS entityId
+    MATCH (e:SupplierEntity {id: entityId})
+    WHERE NOT (e)<-[:SAME_AS]-(:Supplier)
+    DELETE e
+"""
+
+SUPPLIER_ENTITY_STATS_QUERY = """
+    UNWIND $rows AS entityId
+    MATCH (e:SupplierEntity {id: entityId})
+    CALL {
+        WITH e
+        OPTIONAL MATCH (e)<-[:SAME_AS]-(:Supplier)<-[:AWARDED_TO]-(a:Award)
+        RETURN count(a) AS awards, sum(toFloat(a.value)) AS awardValue
+    }
+    SET e.awardCount = awards,
+        e.awardValue = awardValue,
+        e.highFrequencySupplier = CASE WHEN awards >= 3 THEN true END,
+        e.riskLevel = CASE
+            WHEN awards >= 10 THEN 'ALTO'
+            WHEN awards >= 5 THEN 'MEDIO'
+            WHEN awards >= 3 THEN 'BAJO'
+        END
+"""
+
+# Verificación: conteos por etiqueta y tipo de relación (count store) en una sola consulta
+COUNTED_LABELS = ['Buyer', 'Procurement', 'Item', 'Award', 'Contract', 'Supplier', 'SplittingAlert',
+                  'SupplierEntity']
+COUNTED_RELATIONSHIPS = ['PUBLISHED', 'INCLUDES', 'AWARDED_TO', 'HAS_AWARD', 'HAS_CONTRACT', 'RELATED_TIME',
+                         'REGIONAL_COOPERATION', 'HAS_ALERT', 'BUYS_FROM',
+                         'SAME_AS']
+
+COUNTS_QUERY = "\n".join(
+    [f"CALL {{ MATCH (n:{label}) RETURN count(n) AS `{label}` }}" for label in COUNTED_LABELS]
+    + [f"CALL {{ MATCH ()-[r:{rel_type}]->() RETURN count(r) AS `{rel_type}` }}"
+       for rel_type in COUNTED_RELATIONSHIPS]
+    + ["RETURN " + ", ".join(f"`{name}`" for name in COUNTED_LABELS + COUNTED_RELATIONSHIPS)]
+)
+
+RISK_COUNTS_QUERY = """
+    CALL { MATCH (s:Supplier) WHERE s.highFrequencySupplier = true RETURN count(s) AS highFrequencySuppliers }
+    CALL {
+        MATCH (e:SupplierEntity) WHERE e.highFrequencySupplier = true
+        RETURN count(e) AS highFrequencyEntities
+    }
+    CALL { MATCH (p:Procurement) WHERE p.quickAward = true RETURN count(p) AS quickAwards }
+    CALL { MATCH (a:Award) WHERE a.unusualAmount = true RETURN count(a) AS unusualAmounts }
+    CALL { MATCH (b:Buyer) WHERE b.potentialSplitting = true RETURN count(b) AS splittingBuyers }
+    RETURN highFrequencySuppliers, highFrequencyEntities, quickAwards, unusualAmounts, splittingBuyers
+"""
+
+# Sello de la carga: la API de lectura (read_api.py) vacía su caché de respuestas al cambiar
+LOAD_GENERATION_QUERY = """
+    MERGE (g:LoadGeneration {id: 'current'})
+    SET g.stamp = $stamp,
+        g.mode = $mode,
+        g.loadedAt = datetime($loadedAt)
+"""
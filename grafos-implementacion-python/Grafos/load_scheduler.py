@@ -0,0 +1,180 @@
+import threading
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+# Cada cuánto revisa run_stages si se liberaron etiquetas tomadas por otras llamadas
+LOCK_POLL_SECONDS = 0.05
+
+
+class Stage:
+    """Etapa de carga: `run()` hace el trabajo, `locks` son las etiquetas que escribe
+    y `after` las etapas que deben terminar antes.
+
+    `reads` y `writes` son los datos (propiedades, relaciones) que la etapa lee y
+    escribe; infer_dependencies los usa para ordenar etapas declaradas en secuencia.
+    """
+
+    def __init__(self, name, run, locks=(), after=(), reads=(), writes=()):
+        self.name = name
+        self.run = run
+        self.locks = frozenset(locks)
+        self.after = frozenset(after)
+        self.reads = frozenset(reads)
+        self.writes = frozenset(writes)
+        self.started = None
+        self.duration = None
+
+    def conflicts_with(self, other):
+        return bool(self.locks & other.locks)
+
+
+class LabelLocks:
+    """Etiquetas tomadas por las etapas en curso. Compartida entre varias llamadas a
+    run_stages (por ejemplo, escritores que cargan lotes distintos a la vez), hace que dos
+    etapas que escriben la misma etiqueta no se solapen aunque vengan de lotes distintos.
+
+    Una etapa toma todas sus etiquetas de una vez o ninguna, así que no hay esperas cruzadas.
+    """
+
+    def __init__(self):
+        self._held = set()
+        self._released = threading.Condition()
+        self.generation = 0
+
+    def try_acquire(self, labels):
+        with self._released:
+            if self._held & labels:
+                return False
+            self._held |= labels
+            return True
+
+    def release(self, labels):
+        with self._released:
+            self._held -= labels
+            self.generation += 1
+            self._released.notify_all()
+
+    def wait(self, generation):
+        """Espera a que se libere alguna etiqueta después de `generation`"""
+        with self._released:
+            self._released.wait_for(lambda: self.generation != generation)
+
+    @contextmanager
+    def hold(self, labels):
+        """Toma `labels` (esperando a que se liberen) mientras dura el bloque"""
+        labels = frozenset(labels)
+        with self._released:
+            self._released.wait_for(lambda: not self._held & labels)
+            self._held |= labels
+        try:
+            yield
+        finally:
+            self.release(labels)
+
+
+def infer_dependencies(stages):
+    """Agrega a `after` las etapas anteriores (en el orden de la lista) con las que hay
+    un conflicto de datos: leer lo que otra escribe, escribir lo que otra lee o escribir
+    lo mismo. Las etapas sin conflicto quedan libres para correr en paralelo."""
+    for index, stage in enumerate(stages):
+        earlier = [
+            other.name for other in stages[:index]
+            if other.writes & (stage.reads | stage.writes) or other.reads & stage.writes
+        ]
+        stage.after = stage.after | frozenset(earlier)
+    return stages
+
+
+def critical_path(stages):
+    """Cadena más larga de la ejecución: etapas unidas por `after` o por compartir bloqueos
+    (en el orden en que corrieron). Devuelve (segundos, [nombres])."""
+    order = sorted((stage for stage in stages if stage.started is not None), key=lambda stage: stage.started)
+    best = {}
+    for index, stage in enumerate(order):
+        previous = [
+            best[other.name] for other in order[:index]
+            if other.name in stage.after or other.conflicts_with(stage)
+        ]
+        seconds, names = max(previous, default=(0.0, []), key=lambda item: item[0])
+        best[stage.name] = (seconds + stage.duration, names + [stage.name])
+    return max(best.values(), default=(0.0, []), key=lambda item: item[0])
+
+
+def run_stages(stages, max_workers, locks=None):
+    """Ejecuta las etapas en paralelo respetando dependencias y sin solapar etiquetas bloqueadas.
+
+    Con `locks` (LabelLocks) las etiquetas también se respetan frente a etapas de otras
+    llamadas que compartan el mismo registro. Devuelve {nombre: segundos} con la duración
+    de cada etapa.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    missing = {dep for stage in stages for dep in stage.after} - set(by_name)
+    if missing:
+        raise ValueError(f"Dependencias desconocidas: {sorted(missing)}")
+
+    locks = locks or LabelLocks()
+    pending = list(stages)
+    done = set()
+    running = {}
+
+    def start(stage):
+        stage.started = time.perf_counter()
+        try:
+            stage.run()
+        finally:
+            stage.duration = time.perf_counter() - stage.started
+            locks.release(stage.locks)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            generation = locks.generation
+            blocked = False
+            for stage in list(pending):
+                if len(running) >= max_workers:
+                    break
+                if not stage.after <= done:
+                    continue
+                if not locks.try_acquire(stage.locks):
+                    blocked = True
+                    continue
+                pending.remove(stage)
+                running[executor.submit(start, stage)] = stage
+
+            if not running:
+                if not blocked:
+                    raise RuntimeError(f"Etapas sin poder ejecutarse: {[stage.name for stage in pending]}")
+                # Lo que falta espera etiquetas que tienen etapas de otras llamadas
+                locks.wait(generation)
+                continue
+
+            finished, _ = wait(running, timeout=LOCK_POLL_SECONDS if blocked else None,
+                               return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                # Un error detiene el plan; las etapas en curso terminan al salir del executor
+                future.result()
+                done.add(stage.name)
+
+    return {stage.name: stage.duration for stage in stages}
+
+
+def _bucket(key, partitions):
+    return zlib.crc32(str(key).encode('utf-8')) % partitions
+
+
+def mix_and_batch(rows, source_key, target_key, partitions):
+    """Reparte relaciones en rondas sin conflictos de bloqueo.
+
+    Cada fila cae en la celda (hash(origen), hash(destino)) de una grilla NxN. En la
+    ronda r se ejecutan juntas las celdas (i, (i + r) % N): ninguna comparte nodo de
+    origen ni de destino con otra, así las transacciones paralelas no se bloquean.
+    """
+    grid = [[[] for _ in range(partitions)] for _ in range(partitions)]
+    for row in rows:
+        grid[_bucket(row[source_key], partitions)][_bucket(row[target_key], partitions)].append(row)
+    return [
+        [grid[i][(i + offset) % partitions] for i in range(partitions) if grid[i][(i + offset) % partitions]]
+        for offset in range(partitions)
+    ]
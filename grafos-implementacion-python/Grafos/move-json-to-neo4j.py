@@ -1,17 +1,105 @@
 from neo4j import GraphDatabase
+import argparse
 import json
+import math
 import os
+import time
+import uuid
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
+from itertools import count, islice
+from multiprocessing import get_context
+
+from bulk_export import export_bulk
+from cooccurrence import supplier_pairs
+from entity_resolution import resolve_suppliers
+from incremental import DeltaScope
+from instrumentation import PROFILERS, Instrumentation
+from load_queries import (AWARD_AMOUNTS_QUERY, BUYER_COUNTERS_QUERY, BUYER_COUNTERS_RESET_QUERY, BUYER_IDS_QUERY,
+                          BUYER_SPLITTING_WRITE_QUERY, CATEGORY_AWARDS_QUERY, CATEGORY_STATS_SET_QUERY,
+                          CATEGORY_STATS_UPDATE_QUERY, CONSTRAINTS, COUNTS_QUERY, DAILY_ACTIVITY_QUERY,
+                          DAILY_ACTIVITY_RESET_QUERY, DAILY_ACTIVITY_SCOPED_QUERY, DAILY_STATS_QUERY,
+                          DASHBOARD_SUMMARY_QUERY, DELTA_NODE_QUERIES, EDGE_ENDPOINTS, EDGE_QUERIES,
+                          EXISTING_HASHES_QUERY, HIGH_FREQUENCY_QUERY, HIGH_FREQUENCY_RESET_QUERY,
+                          HIGH_FREQUENCY_SCOPED_QUERY, HIGH_RISK_SUPPLIERS_QUERY, LOAD_GENERATION_QUERY,
+                          NODE_DEPENDENCIES, NODE_LABELS, NODE_MESSAGES, NODE_QUERIES, QUICK_AWARD_QUERY,
+                          QUICK_AWARD_RESET_QUERY, QUICK_AWARD_SCOPED_QUERY, QUICK_AWARD_STATS_QUERY,
+                          REGIONAL_COOPERATION_RESET_QUERY, REGIONAL_COOPERATION_WRITE_QUERY, REGION_STATS_QUERY,
+                          RELATED_TIME_SCOPED_SOURCE_QUERY, RELATED_TIME_SOURCE_QUERY, RELATED_TIME_WRITE_QUERY,
+                          REMOVE_STALE_QUERY, RISK_COUNTS_QUERY, SCOPE_QUERY, SPLITTING_ALERT_WRITE_QUERY,
+                          SPLITTING_RESET_QUERY, SAME_AS_WRITE_QUERY, SPLITTING_SCOPED_SOURCE_QUERY,
+                          SPLITTING_SOURCE_QUERY, SUPPLIER_COUNTERS_QUERY, SUPPLIER_ENTITY_CLEANUP_QUERY,
+                          SUPPLIER_ENTITY_STATS_QUERY, SUPPLIER_ENTITY_WRITE_QUERY, SUPPLIER_IDS_QUERY,
+                          SUPPLIER_PAIRS_SCOPED_SOURCE_QUERY, SUPPLIER_PAIRS_SOURCE_QUERY,
+                          SUPPLIER_RESOLUTION_SOURCE_QUERY, UNUSUAL_AMOUNT_CLEAR_QUERY, UNUSUAL_AMOUNT_WRITE_QUERY)
+from load_scheduler import LabelLocks, Stage, critical_path, infer_dependencies, mix_and_batch, run_stages
+from outliers import group_key, score_tail, score_unusual_amounts, stats_from_sums
+from projection import EntityRows, project_rows
+from related_time import related_time_edges
+from record_archive import RecordArchive
+from record_stream import RecordSource, chunked
+from splitting import buyer_flags, splitting_alerts
+from staging import StagingStore
+from transform_pipeline import TransformPipeline
+from verification import IntegrityCheck, WriteCounters, write_report
 
 class Neo4jLoader:
-    def __init__(self, uri, username, password):
+    # Análisis que leen filas y puntúan en Python (el resto corre entero en Cypher)
+    PYTHON_ANALYSES = ('related_time', 'unusual_amounts', 'regional_cooperation', 'splitting', 'entity_resolution')
+
+    def __init__(self, uri, username, password, batch_size=1000, workers=4, partitions=4,
+                 staging_dir=None, staging_cache_mb=64, related_window_days=30,
+                 outlier_method='stddev', outlier_by_currency=False, cooperation_min_shared=2,
+                 cooperation_same_region=True, splitting_options=None, report_path=None,
+                 metrics_path=None, prometheus_path=None, profile=None, profile_dir='perfiles',
+                 summary_top_k=10, entity_threshold=0.85, entity_max_block=200, transform_processes=None,
+                 writers=2, queue_size=4):
         self.driver = GraphDatabase.driver(uri, auth=(username, password))
+        self.batch_size = batch_size
+        self.workers = workers
+        self.partitions = partitions
+        self.staging_dir = staging_dir
+        self.staging_cache_mb = staging_cache_mb
+        self.related_window_days = related_window_days
+        self.outlier_method = outlier_method
+        self.outlier_by_currency = outlier_by_currency
+        self.cooperation_min_shared = cooperation_min_shared
+        self.cooperation_same_region = cooperation_same_region
+        # Argumentos de splitting.splitting_alerts (ventana, umbrales, por proveedor)
+        self.splitting_options = splitting_options or {}
+        self.report_path = report_path
+        # Métricas por etapa (instrumentation.py); `profile` es 'cprofile', 'tracemalloc' o None
+        self.metrics_path = metrics_path
+        self.prometheus_path = prometheus_path
+        self.profile = profile
+        self.profile_dir = profile_dir
+        # Largo de las listas top del resumen del dashboard (DashboardSummary)
+        self.summary_top_k = summary_top_k
+        # Resolución de entidades: similitud mínima de nombres y tamaño máximo de un bloque
+        self.entity_threshold = entity_threshold
+        self.entity_max_block = entity_max_block
+        # Pipeline de carga (transform_pipeline.py): procesos que decodifican y proyectan,
+        # hilos que escriben lotes (cada uno con `workers` etapas a la vez) y lugares en la
+        # cola entre ambos
+        self.transform_processes = transform_processes or os.cpu_count() or 1
+        self.writers = writers
+        self.queue_size = queue_size
+        # Etiquetas tomadas por las etapas de todos los escritores: dos lotes no escriben
+        # la misma etiqueta a la vez, igual que las etapas de un mismo lote
+        self.label_locks = LabelLocks()
+        self.counters = WriteCounters()
+        self.integrity = IntegrityCheck()
+        self.metrics = Instrumentation(profile)
+        self.node_queries = NODE_QUERIES
 
     def close(self):
         self.driver.close()
 
-    def analyze_json_structure(self, data):
+    def analyze_json_structure(self, records):
         print("\nAnalizando estructura del JSON:")
-        for record in data['records'][:5]:  # Analizamos los primeros 5 registros como muestra
+        for record in islice(records, 5):  # Analizamos los primeros 5 registros como muestra
             compile_release = record.get('compiledRelease', {})
             print("\nRegistro ID:", compile_release.get('id'))
 
@@ -56,633 +144,796 @@ class Neo4jLoader:
             session.run("MATCH (n) DETACH DELETE n")
             print("Base de datos limpiada exitosamente!")
 
-    def verify_data_before_load(self, data):
-        """Verifica y limpia los datos antes de cargarlos"""
+    def verify_data_before_load(self, records, pool=None):
+        """Verifica y limpia los datos antes de cargarlos: deduplica por OCID en una sola
+        pasada sobre el staging en disco. Con `pool`, los shards NDJSON se parsean en sus
+        procesos"""
         print("\nVerificando datos antes de cargar...")
 
-        # Verificar duplicados de ocid
-        ocids = {}
-        for record in data['records']:
-            ocid = record.get('compiledRelease', {}).get('ocid')
-            if ocid:
-                if ocid in ocids:
-                    ocids[ocid].append(record)
-                else:
-                    ocids[ocid] = [record]
-
-        # Mantener solo el registro más reciente para cada ocid
-        cleaned_records = []
-        duplicates_removed = 0
-        for ocid, records in ocids.items():
-            if len(records) > 1:
-                # Ordenar por fecha de publicación y tomar el más reciente
-                sorted_records = sorted(
-                    records,
-                    key=lambda x: x.get('compiledRelease', {}).get('publishedDate', ''),
-                    reverse=True
-                )
-                cleaned_records.append(sorted_records[0])
-                duplicates_removed += len(records) - 1
-                print(f"- Removiendo {len(records) - 1} duplicados para OCID {ocid}")
+        # Se mantiene solo el registro más reciente para cada ocid
+        with self.metrics.stage('dedup', python=True) as stage:
+            if pool is not None and isinstance(records, RecordSource) and records.is_sharded():
+                source = records
             else:
-                cleaned_records.append(records[0])
-
-        print(f"- Total de registros duplicados removidos: {duplicates_removed}")
-        print(f"- Registros originales: {len(data['records'])}")
+                source = self.metrics.iterate('parse', records)
+            cleaned_records = StagingStore(source, directory=self.staging_dir, cache_mb=self.staging_cache_mb,
+                                           pool=pool, max_pending=2 * self.transform_processes)
+            stage.rows_in, stage.rows_out = cleaned_records.total, len(cleaned_records)
+
+        print(f"- OCIDs con duplicados: {cleaned_records.duplicated_ocids}")
+        print(f"- Total de registros duplicados removidos: {cleaned_records.duplicates_removed}")
+        print(f"- Registros originales: {cleaned_records.total}")
         print(f"- Registros después de limpieza: {len(cleaned_records)}")
 
-        # Verificar contratos sin award
-        contracts_without_award = 0
-        for record in cleaned_records:
-            contracts = record.get('compiledRelease', {}).get('contracts', [])
-            for contract in contracts:
-                if not contract.get('awardID'):
-                    contracts_without_award += 1
-
-        if contracts_without_award > 0:
-            print(f"- ¡Advertencia! {contracts_without_award} contratos sin award detectados")
-
-        return {'records': cleaned_records}
-
-    def load_data(self, data):
+        return cleaned_records
+
+    def load_data(self, data, chunk_size=5000, delta=False):
+        """Carga registros OCDS en lotes; `data` es un iterable re-recorrible de registros
+        (o el dict legado con 'records').
+
+        En modo delta no se limpia la base: solo se actualizan los OCID nuevos o cuyo
+        contenido cambió, y el análisis de riesgo se limita a los compradores, proveedores
+        y categorías que tocan. Devuelve el conjunto de OCID escritos.
+        """
+        if isinstance(data, dict):
+            data = data['records']
+        self.counters = WriteCounters()
+        self.integrity = IntegrityCheck()
+        self.metrics = Instrumentation(self.profile)
+        # La carga completa conserva la primera aparición de cada nodo; el delta la actualiza
+        self.node_queries = DELTA_NODE_QUERIES if delta else NODE_QUERIES
+        # spawn y no fork: el proceso ya tiene los hilos del driver de Neo4j
+        pool = ProcessPoolExecutor(self.transform_processes, mp_context=get_context('spawn')) \
+            if self.transform_processes > 1 else None
         try:
             # Primero limpiamos y verificamos los datos
-            cleaned_data = self.verify_data_before_load(data)
+            cleaned_data = self.verify_data_before_load(data, pool)
+        except BaseException:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            raise
+        try:
 
             self.analyze_json_structure(cleaned_data)
 
-            print("\n1. Limpiando base de datos existente...")
-            self.cleanup_database()
-
-            # Usamos cleaned_data en lugar de data para todas las operaciones
-            data = cleaned_data  # Esta es la línea clave
+            if delta:
+                print("\n1. Modo delta: se conserva la base de datos existente")
+            else:
+                print("\n1. Limpiando base de datos existente...")
+                with self.metrics.stage('cleanup'):
+                    self.cleanup_database()
 
             print("\n2. Creando nuevos constraints...")
-            with self.driver.session() as session:
-                constraints = [
-                    "CREATE CONSTRAINT buyer_id IF NOT EXISTS FOR (b:Buyer) REQUIRE b.id IS UNIQUE",
-                    "CREATE CONSTRAINT item_id IF NOT EXISTS FOR (i:Item) REQUIRE i.id IS UNIQUE",
-                    "CREATE CONSTRAINT award_id IF NOT EXISTS FOR (a:Award) REQUIRE a.id IS UNIQUE",
-                    "CREATE CONSTRAINT contract_id IF NOT EXISTS FOR (c:Contract) REQUIRE c.id IS UNIQUE",
-                    "CREATE CONSTRAINT procurement_ocid IF NOT EXISTS FOR (p:Procurement) REQUIRE p.ocid IS UNIQUE"
-                ]
-                for constraint in constraints:
+            with self.metrics.stage('constraints'), self.driver.session() as session:
+                for constraint in CONSTRAINTS:
                     try:
                         session.run(constraint)
                     except Exception as e:
                         print(f"Nota al crear constraint: {e}")
 
-            print("\n3. Cargando compradores con información extendida...")
-            with self.driver.session() as session:
-                session.run("""
-                    UNWIND $records AS record
-                    WITH record
-                    WHERE record.compiledRelease.buyer IS NOT NULL AND record.compiledRelease.buyer.id IS NOT NULL
-                    MERGE (b:Buyer {id: record.compiledRelease.buyer.id})
-                    ON CREATE SET
-                        b.name = record.compiledRelease.buyer.name,
-                        b.ruc = COALESCE(record.compiledRelease.parties[0].additionalIdentifiers[0].id, "N/A"),
-                        b.address = COALESCE(record.compiledRelease.parties[0].address.streetAddress, "No Address"),
-                        b.contactPoint = COALESCE(record.compiledRelease.parties[0].contactPoint.name, "No Contact"),
-                        b.email = COALESCE(record.compiledRelease.parties[0].contactPoint.email, "No Email"),
-                        b.telephone = COALESCE(record.compiledRelease.parties[0].contactPoint.telephone, "No Phone")
-                """, records=data['records'])
-
-            print("4. Cargando contrataciones...")
-            with self.driver.session() as session:
-                session.run("""
-                UNWIND $records AS record
-                WITH record
-                WHERE record.compiledRelease.tender IS NOT NULL 
-                      AND record.compiledRelease.ocid IS NOT NULL
-                MERGE (p:Procurement {ocid: record.compiledRelease.ocid})
-                ON CREATE SET
-                    p.id = record.compiledRelease.tender.id,
-                    p.title = COALESCE(record.compiledRelease.tender.title, "No Title"),
-                    p.description = COALESCE(record.compiledRelease.tender.description, "No Description"),
-                    p.publishedDate = datetime(record.compiledRelease.publishedDate),
-                    p.procurementMethod = COALESCE(record.compiledRelease.tender.procurementMethod, "N/A"),
-                    p.procurementMethodDetails = COALESCE(record.compiledRelease.tender.procurementMethodDetails, "N/A"),
-                    p.mainCategory = COALESCE(record.compiledRelease.tender.mainProcurementCategory, "No Category")
-                """, records=data['records'])
-
-            print("5. Cargando ítems...")
-            # Primero, recopilamos todos los ítems únicos
-            unique_items = {}
-            for record in data['records']:
-                items = record.get('compiledRelease', {}).get('tender', {}).get('items', [])
-                for item in items:
-                    if item.get('id') and item.get('id') not in unique_items:
-                        unique_items[item['id']] = {
-                            'id': item['id'],
-                            'description': item.get('description', "No Description"),
-                            'status': item.get('status', "No Status"),
-                            'quantity': item.get('quantity', 0)
-                        }
-
-            with self.driver.session() as session:
-                for item in unique_items.values():
-                    session.run("""
-                    MERGE (i:Item {id: $id})
-                    ON CREATE SET
-                        i.description = $description,
-                        i.status = $status,
-                        i.quantity = $quantity
-                    """, item)
-
-            print("6. Cargando adjudicaciones...")
-            with self.driver.session() as session:
-                session.run("""
-                UNWIND $records AS record
-                UNWIND COALESCE(record.compiledRelease.awards, []) AS award
-                WITH award
-                WHERE award.id IS NOT NULL
-                MERGE (a:Award {id: award.id})
-                ON CREATE SET
-                    a.title = COALESCE(award.title, "No Title"),
-                    a.value = COALESCE(award.value.amount, 0),
-                    a.currency = COALESCE(award.value.currency, "N/A"),
-                    a.date = COALESCE(award.date, null)
-                """, records=data['records'])
-
-            # Modificación en la carga de contratos para asegurar la relación con Award
-            print("7. Cargando contratos...")
-            with self.driver.session() as session:
-                session.run("""
-                            UNWIND $records AS record
-                            UNWIND COALESCE(record.compiledRelease.contracts, []) AS contract
-                            WITH contract
-                            WHERE contract.id IS NOT NULL 
-                              AND contract.awardID IS NOT NULL
-                              // Aseguramos que existe el Award antes de crear el Contract
-                              AND EXISTS {
-                                MATCH (a:Award {id: contract.awardID})
-                                RETURN a
-                              }
-                            MERGE (c:Contract {id: contract.id})
-                            ON CREATE SET
-                                c.title = COALESCE(contract.title, "No Title"),
-                                c.description = COALESCE(contract.description, "No Description"),
-                                c.value = COALESCE(contract.value.amount, 0),
-                                c.currency = COALESCE(contract.value.currency, "N/A"),
-                                c.awardID = contract.awardID,
-                                c.status = COALESCE(contract.status, "No Status")
-                            """, records=data['records'])  # Cambiado cleaned_data por data
-
-            print("8. Cargando proveedores con información extendida...")
-            with self.driver.session() as session:
-                session.run("""
-                    UNWIND $records AS record
-                    UNWIND COALESCE(record.compiledRelease.awards, []) AS award
-                    UNWIND COALESCE(award.suppliers, []) AS supplier
-                    WITH supplier, award, record
-                    WHERE supplier.id IS NOT NULL
-                    MERGE (s:Supplier {id: supplier.id})
-                    ON CREATE SET
-                        s.name = COALESCE(supplier.name, "No Name"),
-                        s.ruc = COALESCE(supplier.identifier.id, "No RUC"),
-                        s.legalName = COALESCE(supplier.identifier.legalName, "No Legal Name"),
-                        s.address = COALESCE(supplier.address.streetAddress, "No Address")
-                """, records=data['records'])
-
-            print("9. Creando relaciones...")
-            with self.driver.session() as session:
-                # Relaciones Buyer-Procurement
-                session.run("""
-                                UNWIND $records AS record
-                                WITH record
-                                WHERE record.compiledRelease.buyer IS NOT NULL
-                                MATCH (b:Buyer {id: record.compiledRelease.buyer.id})
-                                MATCH (p:Procurement {ocid: record.compiledRelease.ocid})
-                                MERGE (b)-[:PUBLISHED]->(p)
-                                """, records=data['records'])
-
-                # Relaciones Procurement-Item
-                session.run("""
-                            UNWIND $records AS record
-                            UNWIND COALESCE(record.compiledRelease.tender.items, []) AS item
-                            WITH record, item
-                            WHERE item.id IS NOT NULL
-                            MATCH (p:Procurement {ocid: record.compiledRelease.ocid})
-                            MATCH (i:Item {id: item.id})
-                            MERGE (p)-[:INCLUDES]->(i)
-                            """, records=data['records'])
-
-                # Relaciones Award-Supplier
-                session.run("""
-                            UNWIND $records AS record
-                            UNWIND COALESCE(record.compiledRelease.awards, []) AS award
-                            UNWIND COALESCE(award.suppliers, []) AS supplier
-                            WITH award, supplier
-                            WHERE award.id IS NOT NULL AND supplier.id IS NOT NULL
-                            MATCH (a:Award {id: award.id})
-                            MATCH (s:Supplier {id: supplier.id})
-                            MERGE (a)-[:AWARDED_TO]->(s)
-                            """, records=data['records'])
-
-                # Relaciones Procurement-Award
-                session.run("""
-                            UNWIND $records AS record
-                            UNWIND COALESCE(record.compiledRelease.awards, []) AS award
-                            WITH record, award
-                            WHERE award.id IS NOT NULL
-                            MATCH (p:Procurement {ocid: record.compiledRelease.ocid})
-                            MATCH (a:Award {id: award.id})
-                            MERGE (p)-[:HAS_AWARD]->(a)
-                            """, records=data['records'])
-
-                # Relaciones Award-Contract
-                session.run("""
-                            UNWIND $records AS record
-                            UNWIND COALESCE(record.compiledRelease.contracts, []) AS contract
-                            WITH contract
-                            WHERE contract.id IS NOT NULL AND contract.awardID IS NOT NULL
-                            MATCH (a:Award {id: contract.awardID})
-                            MATCH (c:Contract {id: contract.id})
-                            MERGE (a)-[:HAS_CONTRACT]->(c)
-                            """, records=data['records'])
-
-                print("\nCreando relaciones adicionales para análisis de patrones...")
-
-                # 1. Relaciones temporales entre contrataciones del mismo comprador (ajustado)
-                session.run("""
-                                MATCH (p1:Procurement)-[:PUBLISHED]-(b:Buyer)-[:PUBLISHED]-(p2:Procurement)
-                                WHERE p1.publishedDate <= p2.publishedDate
-                                AND p1 <> p2
-                                AND datetime(p1.publishedDate) IS NOT NULL 
-                                AND datetime(p2.publishedDate) IS NOT NULL
-                                AND duration.inDays(datetime(p1.publishedDate), datetime(p2.publishedDate)).days <= 30
-                                MERGE (p1)-[r:RELATED_TIME]->(p2)
-                                SET r.daysBetween = duration.inDays(datetime(p1.publishedDate), datetime(p2.publishedDate)).days,
-                                    r.sameCategory = p1.mainCategory = p2.mainCategory
-                                """)
-
-                # 2. Análisis detallado de proveedores frecuentes
-                session.run("""
-                                MATCH (s:Supplier)<-[:AWARDED_TO]-(a:Award)
-                                WITH s, count(a) as awards_count, collect(a) as awards,
-                                     sum(a.value) as total_value,
-                                     collect(DISTINCT a.currency) as currencies
-                                WHERE awards_count >= 3
-                                SET s.highFrequencySupplier = true,
-                                    s.totalAwards = awards_count,
-                                    s.totalValue = total_value,
-                                    s.averageAwardValue = total_value / awards_count,
-                                    s.currencies = currencies,
-                                    s.riskLevel = CASE 
-                                        WHEN awards_count >= 10 THEN 'ALTO'
-                                        WHEN awards_count >= 5 THEN 'MEDIO'
-                                        ELSE 'BAJO'
-                                    END
-                                """)
-
-                # 3. Identificar adjudicaciones rápidas con más detalle
-                session.run("""
-                                MATCH (p:Procurement)-[:HAS_AWARD]->(a:Award)
-                                WHERE a.date IS NOT NULL 
-                                AND p.publishedDate IS NOT NULL
-                                AND datetime(a.date) IS NOT NULL
-                                AND datetime(p.publishedDate) IS NOT NULL
-                                WITH p, a, duration.inDays(datetime(p.publishedDate), datetime(a.date)).days as days
-                                WHERE days <= 3
-                                SET p.quickAward = true,
-                                    p.awardDays = days,
-                                    p.awardSpeed = CASE 
-                                        WHEN days = 0 THEN 'MISMO_DIA'
-                                        WHEN days = 1 THEN 'UN_DIA'
-                                        ELSE 'DOS_A_TRES_DIAS'
-                                    END,
-                                    p.riskLevel = CASE 
-                                        WHEN days = 0 THEN 'ALTO'
-                                        WHEN days = 1 THEN 'MEDIO'
-                                        ELSE 'BAJO'
-                                    END
-                                """)
-
-                # 4. Análisis detallado de montos inusuales por categoría
-                session.run("""
-                                MATCH (p:Procurement)-[:HAS_AWARD]->(a:Award)
-                                WITH p.mainCategory as category, 
-                                     avg(a.value) as avgValue, 
-                                     stDev(a.value) as stdValue,
-                                     collect(a) as awards,
-                                     count(a) as total_awards
-                                MATCH (p2:Procurement)-[:HAS_AWARD]->(a2:Award)
-                                WHERE p2.mainCategory = category
-                                AND a2.value > (avgValue + 2 * stdValue)
-                                SET a2.unusualAmount = true,
-                                    a2.categoryAvg = avgValue,
-                                    a2.categoryStdDev = stdValue,
-                                    a2.deviation = (a2.value - avgValue) / stdValue,
-                                    a2.percentileRank = toFloat(size([a IN awards WHERE a.value <= a2.value])) / total_awards * 100,
-                                    a2.riskLevel = CASE 
-                                        WHEN a2.value > (avgValue + 3 * stdValue) THEN 'ALTO'
-                                        ELSE 'MEDIO'
-                                    END
-                                """)
-
-                # 5. Análisis detallado de patrones regionales
-                session.run("""
-                                MATCH (s1:Supplier)<-[:AWARDED_TO]-(:Award)<-[:HAS_AWARD]-(p:Procurement)
-                                MATCH (s2:Supplier)<-[:AWARDED_TO]-(:Award)<-[:HAS_AWARD]-(p)
-                                WHERE s1.region = s2.region 
-                                AND s1 <> s2
-                                AND s1.id < s2.id
-                                WITH s1, s2, p.region as buyer_region, count(DISTINCT p) as shared_procurements
-                                MERGE (s1)-[r:REGIONAL_COOPERATION]->(s2)
-                                SET r.sharedProcurements = shared_procurements,
-                                    r.buyerRegion = buyer_region,
-                                    r.sameRegionAsBuyer = buyer_region = s1.region,
-                                    r.riskLevel = CASE 
-                                        WHEN shared_procurements >= 5 THEN 'ALTO'
-                                        WHEN shared_procurements >= 3 THEN 'MEDIO'
-                                        ELSE 'BAJO'
-                                    END
-                                """)
-
-                # 6. Análisis de fraccionamiento (nuevo)
-                session.run("""
-                                MATCH (b:Buyer)-[:PUBLISHED]->(p:Procurement)-[:HAS_AWARD]->(a:Award)
-                                WITH b, p.mainCategory as category,
-                                     date(p.publishedDate) as baseDate,
-                                     sum(a.value) as total_value,
-                                     count(p) as proc_count
-                                WHERE proc_count >= 3
-                                SET b.potentialSplitting = true,
-                                    b.splittingCategory = category,
-                                    b.splittingDate = baseDate,
-                                    b.splittingValue = total_value,
-                                    b.splittingCount = proc_count,
-                                    b.riskLevel = CASE 
-                                        WHEN proc_count >= 5 THEN 'ALTO'
-                                        WHEN proc_count >= 3 THEN 'MEDIO'
-                                        ELSE 'BAJO'
-                                    END
-                                """)
-
-                # Modificar el análisis de concentración regional
-                print("\nAnálisis de concentración regional...")
-                session.run("""
-                        MATCH (s:Supplier)<-[:AWARDED_TO]-(a:Award)
-                        WHERE s.region <> 'No Region'  // Excluir explícitamente "No Region"
-                        WITH s.region as region, 
-                             count(DISTINCT s) as supplier_count,
-                             sum(a.value) as total_value,
-                             collect(DISTINCT s) as suppliers
-                        WHERE region IS NOT NULL
-                        WITH region, supplier_count, total_value, 
-                             CASE 
-                                 WHEN supplier_count <= 3 THEN 'ALTA'
-                                 WHEN supplier_count <= 5 THEN 'MEDIA'
-                                 ELSE 'BAJA'
-                             END as concentration
-                        ORDER BY total_value DESC
-                        LIMIT 5
-                        RETURN region, concentration, supplier_count, total_value
-                    """)
-
-                # Modificar la consulta de estadísticas regionales
-                region_stats = session.run("""
-                        MATCH (s:Supplier)<-[:AWARDED_TO]-(a:Award)
-                        WHERE s.region <> 'No Region'  // Excluir explícitamente "No Region"
-                        WITH s.region as region,
-                             count(DISTINCT s) as supplier_count,
-                             sum(a.value) as total_value
-                        WHERE region IS NOT NULL
-                        WITH region, supplier_count, total_value
-                        ORDER BY total_value DESC
-                        LIMIT 5
-                        RETURN 
-                            region,
-                            supplier_count,
-                            total_value,
-                            CASE 
-                                WHEN supplier_count <= 3 THEN 'ALTA'
-                                WHEN supplier_count <= 5 THEN 'MEDIA'
-                                ELSE 'BAJA'
-                            END as concentration
-                    """).data()
-
-                print("\nTop 5 regiones por concentración de contratos:")
-                for stat in region_stats:
-                    print(f"Región: {stat['region']}")
-                    print(f"- Concentración: {stat['concentration']}")
-                    print(f"- Proveedores: {stat['supplier_count']}")
-                    print(f"- Valor total: S/. {stat['total_value']:,.2f}")
-                    print("---")
-
-                # Análisis de variación temporal de montos
-                session.run("""
-                            MATCH (p:Procurement)-[:HAS_AWARD]->(a:Award)
-                            WHERE p.publishedDate IS NOT NULL
-                            WITH p, date(p.publishedDate) as award_date, avg(a.value) as avg_daily_value, count(a) as daily_awards
-                            SET p.avgDailyValue = avg_daily_value,
-                                p.dailyAwards = daily_awards,
-                                p.unusualDailyActivity = CASE
-                                    WHEN daily_awards >= 10 THEN 'ALTO'
-                                    WHEN daily_awards >= 5 THEN 'MEDIO'
-                                    ELSE 'NORMAL'
-                                END
-                            """)
-
-                temporal_stats = session.run("""
-                            MATCH (p:Procurement)
-                            WHERE p.unusualDailyActivity = 'ALTO'
-                            RETURN count(p) as high_activity_days,
-                                   avg(p.dailyAwards) as avg_awards_per_day,
-                                   max(p.dailyAwards) as max_awards_per_day
-                            """).single()
-
-                print("\nEstadísticas de actividad diaria:")
-                print(f"- Días con actividad inusual: {temporal_stats['high_activity_days']}")
-                print(
-                    f"- Promedio de adjudicaciones en días de alta actividad: {temporal_stats['avg_awards_per_day']:.2f}")
-                print(f"- Máximo de adjudicaciones en un día: {temporal_stats['max_awards_per_day']}")
-
-                print("Relaciones adicionales creadas exitosamente")
-
-                # Estadísticas detalladas (mejorada)
-                stats = session.run("""
-                                MATCH (p:Procurement)
-                                WHERE p.quickAward = true AND p.awardSpeed IS NOT NULL
-                                WITH 
-                                    count(p) as quick_awards,
-                                    count(CASE WHEN p.awardSpeed = 'MISMO_DIA' THEN p END) as same_day,
-                                    count(CASE WHEN p.awardSpeed = 'UN_DIA' THEN p END) as one_day,
-                                    count(CASE WHEN p.awardSpeed = 'DOS_A_TRES_DIAS' THEN p END) as two_to_three_days
-                                RETURN 
-                                    quick_awards, 
-                                    same_day, 
-                                    one_day,
-                                    two_to_three_days,
-                                    round(100.0 * same_day / quick_awards, 2) as same_day_percentage,
-                                    round(100.0 * one_day / quick_awards, 2) as one_day_percentage
-                                """).single()
-
-                print("\nEstadísticas detalladas de adjudicaciones rápidas:")
-                print(f"- Total adjudicaciones rápidas: {stats['quick_awards']}")
-                print(f"- Mismo día: {stats['same_day']} ({stats['same_day_percentage']}%)")
-                print(f"- Un día: {stats['one_day']} ({stats['one_day_percentage']}%)")
-                print(f"- 2-3 días: {stats['two_to_three_days']}")
-
-                # Análisis de proveedores de alto riesgo
-                high_risk = session.run("""
-                                MATCH (s:Supplier)
-                                WHERE s.riskLevel = 'ALTO'
-                                RETURN count(s) as count, avg(s.totalValue) as avg_value
-                                """).single()
-
-                print(f"- Proveedores de alto riesgo: {high_risk['count']}")
-                print(f"- Valor promedio de contratos de alto riesgo: {high_risk['avg_value']:,.2f}")
+            # Los registros se cargan por lotes para no tener el dataset completo en memoria:
+            # aquí se lee el staging, el pool decodifica y proyecta y los escritores cargan
+            changed_ocids = set()
+            scope = DeltaScope() if delta else None
+            chunk_numbers = count(1)
+
+            def batches():
+                for entries in cleaned_data.payloads(chunk_size):
+                    if delta:
+                        with self.metrics.stage('select_changed', rows_in=len(entries)) as stage:
+                            entries = self._select_changed(entries, scope)
+                            stage.rows_out = len(entries)
+                        if not entries:
+                            continue
+                    yield [payload for _, _, payload in entries]
+
+            def observe(chunk):
+                print(f"\nLote {next(chunk_numbers)}: {len(chunk.ocids)} registros")
+                changed_ocids.update(chunk.ocids)
+                self.integrity.merge(chunk.integrity)
+                cleaned_data.contracts_without_award += chunk.contracts_without_award
+
+            pipeline = TransformPipeline(self._load_chunk, pool=pool, writers=self.writers,
+                                         queue_size=self.queue_size, max_pending=2 * self.transform_processes,
+                                         metrics=self.metrics, now=self.integrity.now)
+            pipeline.run(batches(), observe)
+
+            if cleaned_data.contracts_without_award > 0:
+                print(f"- ¡Advertencia! {cleaned_data.contracts_without_award} contratos sin award detectados")
+
+            if delta:
+                print(f"\nOCIDs nuevos o modificados: {len(changed_ocids)}")
+                if not changed_ocids:
+                    print("No hay cambios; se omite el análisis de patrones.")
+                    return changed_ocids
+                with self.metrics.stage('delta_scope', rows_in=len(changed_ocids)):
+                    for ocids in chunked(changed_ocids, self.batch_size):
+                        scope.add(self._read_scope(ocids), before=False)
+                print(f"- Análisis limitado a {len(scope.buyers)} compradores y {len(scope.suppliers)} proveedores")
+
+            print("\nCreando relaciones adicionales para análisis de patrones...")
+            report = self.run_analyses(scope)
+
+            print("\nTop 5 regiones por concentración de contratos:")
+            for stat in report['region_stats']:
+                print(f"Región: {stat['region']}")
+                print(f"- Concentración: {stat['concentration']}")
+                print(f"- Proveedores: {stat['supplier_count']}")
+                print(f"- Valor total: S/. {stat['total_value']:,.2f}")
+                print("---")
+
+            temporal_stats = report['daily_stats']
+            print("\nEstadísticas de actividad diaria:")
+            print(f"- Días con actividad inusual: {temporal_stats['high_activity_days']}")
+            print(
+                f"- Promedio de adjudicaciones en días de alta actividad: {temporal_stats['avg_awards_per_day']:.2f}")
+            print(f"- Máximo de adjudicaciones en un día: {temporal_stats['max_awards_per_day']}")
+
+            print("Relaciones adicionales creadas exitosamente")
+
+            stats = report['quick_award_stats']
+            print("\nEstadísticas detalladas de adjudicaciones rápidas:")
+            print(f"- Total adjudicaciones rápidas: {stats['quick_awards']}")
+            print(f"- Mismo día: {stats['same_day']} ({stats['same_day_percentage']}%)")
+            print(f"- Un día: {stats['one_day']} ({stats['one_day_percentage']}%)")
+            print(f"- 2-3 días: {stats['two_to_three_days']}")
+
+            high_risk = report['high_risk_suppliers']
+            print(f"- Proveedores de alto riesgo: {high_risk['count']}")
+            print(f"- Valor promedio de contratos de alto riesgo: {high_risk['avg_value']:,.2f}")
 
             print("\n¡Datos cargados exitosamente!")
-            self.verify_data_load()
-            self.verify_data_integrity()
+            with self.metrics.stage('verify_load'):
+                counts, risks = self.verify_data_load()
+            with self.metrics.stage('verify_integrity'):
+                integrity = self.verify_data_integrity()
+            if self.report_path:
+                self.write_verification_report(cleaned_data, changed_ocids, delta, counts, risks, integrity)
+            with self.metrics.stage('generation'):
+                self.bump_generation(delta)
+            return changed_ocids
 
 
         except Exception as e:
             print(f"Error durante la carga de datos: {e}")
             raise e
+        finally:
+            cleaned_data.close()
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            self.report_metrics()
+
+    def bump_generation(self, delta):
+        """Marca la base con un sello nuevo para que la API de lectura invalide su caché"""
+        stamp = uuid.uuid4().hex
+        with self.driver.session() as session:
+            session.execute_write(lambda tx: tx.run(
+                LOAD_GENERATION_QUERY, stamp=stamp, mode='delta' if delta else 'full',
+                loadedAt=datetime.now(timezone.utc).isoformat()).consume())
+        print(f"Generación de carga: {stamp}")
+        return stamp
+
+    def _write_rows(self, query, rows, counter_key=None):
+        """Escribe filas en lotes de `batch_size`, cada lote en una transacción administrada
+        (el driver reintenta los errores transitorios); suma sus contadores en `counter_key`,
+        por defecto la etapa que se está midiendo"""
+        counter_key = counter_key or self.metrics.current_name('analysis')
+        with self.driver.session() as session:
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                summary = session.execute_write(lambda tx: tx.run(query, rows=batch).consume())
+                self.counters.add(counter_key, summary.counters)
+                self.metrics.count_out(len(batch))
+
+    def _select_changed(self, entries, scope):
+        """Filtra las entradas (ocid, contentHash, payload) del staging cuyo contentHash
+        difiere del guardado en su Procurement y elimina adjudicaciones, contratos y
+        relaciones viejas de las que cambiaron, anotando antes en `scope` lo que se borra"""
+        ocids = [ocid for ocid, _, _ in entries]
+        with self.driver.session() as session:
+            stored = {
+                row['ocid']: row['contentHash']
+                for row in session.execute_read(lambda tx: tx.run(EXISTING_HASHES_QUERY, ocids=ocids).data())
+            }
+        changed = [entry for entry in entries if stored.get(entry[0]) != entry[1]]
+        modified = [ocid for ocid, _, _ in changed if ocid in stored]
+        print(f"- Sin cambios: {len(entries) - len(changed)}, nuevos: {len(changed) - len(modified)}, "
+              f"modificados: {len(modified)}")
+        if modified:
+            scope.add(self._read_scope(modified), before=True)
+            # Corre junto a los escritores de lotes anteriores y toca todas las etiquetas
+            with self.label_locks.hold(NODE_LABELS.values()):
+                self._write_rows(REMOVE_STALE_QUERY, modified, 'remove_stale')
+        return changed
+
+    def _load_node_stage(self, kind, rows):
+        print(f"{NODE_MESSAGES[kind]} ({len(rows)} filas)")
+        with self.metrics.stage(kind, rows_in=len(rows)):
+            self._write_rows(self.node_queries[kind], rows, kind)
+
+    def _write_partitioned(self, query, rows, source_key, target_key, counter_key=None):
+        """Escribe relaciones en rondas de particiones disjuntas ejecutadas en paralelo"""
+        counter_key = counter_key or self.metrics.current_name('analysis')
+        write_rows = self.metrics.propagate(self._write_rows)
+        rounds = mix_and_batch(rows, source_key, target_key, self.partitions)
+        with ThreadPoolExecutor(max_workers=self.partitions) as executor:
+            for partitions in rounds:
+                futures = [executor.submit(write_rows, query, part, counter_key) for part in partitions]
+                for future in futures:
+                    future.result()
+
+    def _load_edge_stage(self, kind, rows):
+        print(f"9. Creando relaciones {kind} ({len(rows)} filas)...")
+        source_key, target_key, _ = EDGE_ENDPOINTS[kind]
+        with self.metrics.stage(kind, rows_in=len(rows)):
+            self._write_partitioned(EDGE_QUERIES[kind], rows, source_key, target_key, kind)
+
+    def run_analyses(self, scope=None):
+        """Ejecuta los análisis de riesgo y las estadísticas finales, cada uno en su sesión.
+
+        Cada análisis declara qué datos lee y escribe (el orden de la lista fija quién va
+        primero si hay conflicto) y qué etiquetas bloquea al escribir; los que no chocan
+        corren a la vez. Devuelve los resultados de las consultas de estadísticas.
+        """
+        report = {}
+
+        def analysis(method):
+            def run():
+                with self.driver.session() as session:
+                    method(session, scope)
+            return run
+
+        def statistic(name, query, single=True):
+            def run():
+                with self.driver.session() as session:
+                    result = session.run(query)
+                    report[name] = result.single() if single else result.data()
+            return run
+
+        stages = infer_dependencies([
+            # 1. Relaciones temporales entre contrataciones del mismo comprador
+            Stage('related_time', analysis(self.create_related_time), locks=['Procurement'],
+                  reads=['PUBLISHED', 'Procurement.publishedDate', 'Procurement.mainCategory'],
+                  writes=['RELATED_TIME']),
+            # 2. Análisis detallado de proveedores frecuentes
+            Stage('high_frequency', analysis(self.flag_high_frequency_suppliers), locks=['Supplier'],
+                  reads=['AWARDED_TO', 'Award.value', 'Award.currency'],
+                  writes=['Supplier.highFrequencySupplier', 'Supplier.riskLevel']),
+            # 3. Identificar adjudicaciones rápidas con más detalle
+            Stage('quick_awards', analysis(self.flag_quick_awards), locks=['Procurement'],
+                  reads=['HAS_AWARD', 'Award.date', 'Procurement.publishedDate'],
+                  writes=['Procurement.quickAward', 'Procurement.riskLevel']),
+            # 4. Análisis detallado de montos inusuales por categoría
+            Stage('unusual_amounts', analysis(self.score_unusual_amounts), locks=['Award', 'CategoryStats'],
+                  reads=['HAS_AWARD', 'Award.value', 'Award.currency', 'Procurement.mainCategory'],
+                  writes=['Award.unusualAmount', 'CategoryStats']),
+            # 5. Análisis detallado de patrones regionales
+            Stage('regional_cooperation', analysis(self.create_regional_cooperation), locks=['Supplier'],
+                  reads=['HAS_AWARD', 'AWARDED_TO', 'Supplier.region'], writes=['REGIONAL_COOPERATION']),
+            # 6. Análisis de fraccionamiento (nuevo)
+            Stage('splitting', analysis(self.detect_splitting), locks=['Buyer', 'SplittingAlert'],
+                  reads=['PUBLISHED', 'HAS_AWARD', 'AWARDED_TO', 'Award.value', 'Procurement.publishedDate',
+                         'Procurement.mainCategory'],
+                  writes=['SplittingAlert', 'Buyer.potentialSplitting']),
+            # Análisis de variación temporal de montos
+            Stage('daily_activity', analysis(self.compute_daily_activity), locks=['Procurement'],
+                  reads=['HAS_AWARD', 'Award.value', 'Procurement.publishedDate'],
+                  writes=['Procurement.unusualDailyActivity']),
+            # 7. Proveedores que son la misma empresa (mismo RUC o nombre casi igual)
+            Stage('entity_resolution', analysis(self.resolve_supplier_entities),
+                  locks=['Supplier', 'SupplierEntity'],
+                  reads=['Supplier.name', 'Supplier.ruc', 'AWARDED_TO', 'Award.value'],
+                  writes=['SAME_AS', 'SupplierEntity']),
+            # Contadores y resumen del dashboard, para que la API no recorra el grafo
+            Stage('dashboard_counters', analysis(self.refresh_counters), locks=['Buyer', 'Supplier'],
+                  reads=['PUBLISHED', 'HAS_AWARD', 'AWARDED_TO', 'Award.value', 'Procurement.quickAward'],
+                  writes=['BUYS_FROM', 'Buyer.procurementCount', 'Supplier.awardCount',
+                          'Supplier.quickAwardPercent']),
+            Stage('dashboard_summary', analysis(self.write_dashboard_summary), locks=['DashboardSummary'],
+                  reads=['BUYS_FROM', 'Buyer.procurementCount', 'Supplier.awardCount'],
+                  writes=['DashboardSummary']),
+            # Estadísticas: solo leen, después de los análisis que producen sus datos
+            Stage('region_stats', statistic('region_stats', REGION_STATS_QUERY, single=False),
+                  reads=['AWARDED_TO', 'Award.value', 'Supplier.region']),
+            Stage('daily_stats', statistic('daily_stats', DAILY_STATS_QUERY),
+                  reads=['Procurement.unusualDailyActivity']),
+            Stage('quick_award_stats', statistic('quick_award_stats', QUICK_AWARD_STATS_QUERY),
+                  reads=['Procurement.quickAward']),
+            Stage('high_risk_suppliers', statistic('high_risk_suppliers', HIGH_RISK_SUPPLIERS_QUERY),
+                  reads=['Supplier.riskLevel', 'Supplier.highFrequencySupplier']),
+        ])
+        # Las etapas que puntúan en Python son las que vale la pena perfilar
+        for stage in stages:
+            stage.run = self.metrics.timed(stage.name, stage.run, python=stage.name in self.PYTHON_ANALYSES)
+
+        started = time.perf_counter()
+        durations = run_stages(stages, self.workers)
+        elapsed = time.perf_counter() - started
+        path_seconds, path = critical_path(stages)
+        print(f"\nAnálisis: {elapsed:.2f}s en paralelo, {sum(durations.values()):.2f}s en serie; "
+              f"ruta crítica {path_seconds:.2f}s ({' -> '.join(path)})")
+        return report
+
+    def _read_scope(self, ocids):
+        with self.driver.session() as session:
+            return session.execute_read(lambda tx: tx.run(SCOPE_QUERY, ocids=list(ocids)).data())
+
+    def _rescore(self, session, scope, reset_query, ids, full_query, scoped_query):
+        """Ejecuta un análisis global o, en modo delta, solo sobre `ids` tras limpiar sus marcas"""
+        if scope is None:
+            session.run(full_query)
+            return
+        ids = list(ids)
+        self._write_rows(reset_query, ids)
+        self._write_rows(scoped_query, ids)
+
+    def create_related_time(self, session, scope=None):
+        """RELATED_TIME por barrido de ventana ordenada en Python, escrito en lotes.
+
+        En modo delta solo se barren los compradores afectados y se escriben los pares que
+        incluyen una contratación del delta (las relaciones viejas ya se borraron)."""
+        if scope is None:
+            result = session.run(RELATED_TIME_SOURCE_QUERY)
+        else:
+            result = session.run(RELATED_TIME_SCOPED_SOURCE_QUERY, buyerIds=list(scope.buyers))
+        procurements = (
+            (row['buyerId'], row['ocid'], row['epochMillis'], row['category'])
+            for row in self.metrics.counted(result)
+        )
+        created = 0
+        edges = related_time_edges(procurements, window_days=self.related_window_days)
+        if scope is not None:
+            edges = (edge for edge in edges if edge['source'] in scope.ocids or edge['target'] in scope.ocids)
+        for rows in chunked(edges, self.batch_size * self.partitions):
+            self._write_partitioned(RELATED_TIME_WRITE_QUERY, rows, 'source', 'target', 'related_time')
+            created += len(rows)
+        print(f"- Relaciones RELATED_TIME (ventana de {self.related_window_days} días): {created}")
+
+    def flag_high_frequency_suppliers(self, session, scope=None):
+        self._rescore(session, scope, HIGH_FREQUENCY_RESET_QUERY, scope.suppliers if scope else (),
+                      HIGH_FREQUENCY_QUERY, HIGH_FREQUENCY_SCOPED_QUERY)
+
+    def flag_quick_awards(self, session, scope=None):
+        self._rescore(session, scope, QUICK_AWARD_RESET_QUERY, scope.ocids if scope else (),
+                      QUICK_AWARD_QUERY, QUICK_AWARD_SCOPED_QUERY)
+
+    def compute_daily_activity(self, session, scope=None):
+        self._rescore(session, scope, DAILY_ACTIVITY_RESET_QUERY, scope.ocids if scope else (),
+                      DAILY_ACTIVITY_QUERY, DAILY_ACTIVITY_SCOPED_QUERY)
+
+    def score_unusual_amounts(self, session, scope=None):
+        """Montos inusuales por categoría calculados con NumPy sobre una sola lectura de
+        los valores, escritos en lotes; guarda además los agregados de cada grupo"""
+        if scope is not None:
+            self._rescore_unusual_amounts(session, scope)
+            return
+
+        award_ids, values, categories, currencies = [], [], [], []
+        for row in self.metrics.counted(session.run(AWARD_AMOUNTS_QUERY)):
+            award_ids.append(row['id'])
+            values.append(row['value'])
+            categories.append(row['category'])
+            currencies.append(row['currency'])
+
+        scored = score_unusual_amounts(award_ids, values, categories,
+                                       currencies=currencies if self.outlier_by_currency else None,
+                                       method=self.outlier_method)
+        rows = [{'id': award_id, 'props': props} for award_id, props in scored.items()]
+        self._write_rows(UNUSUAL_AMOUNT_WRITE_QUERY, rows)
+        print(f"- Adjudicaciones con montos inusuales ({self.outlier_method}): {len(rows)} de {len(values)}")
+
+        stats = {}
+        for value, category, currency in zip(values, categories, currencies):
+            currency = currency if self.outlier_by_currency else None
+            key = group_key(category, currency)
+            row = stats.setdefault(key, {'key': key, 'category': category, 'currency': currency,
+                                         'count': 0, 'sum': 0.0, 'sumSquares': 0.0})
+            row['count'] += 1
+            row['sum'] += value
+            row['sumSquares'] += value * value
+        self._write_rows(CATEGORY_STATS_SET_QUERY, list(stats.values()))
+
+    def _rescore_unusual_amounts(self, session, scope):
+        """Modo delta: ajusta los agregados de los grupos tocados y vuelve a marcar solo esos
+        grupos. Con 'stddev' basta leer los montos sobre el nuevo umbral (índice por
+        categoría y monto); la mediana y la MAD necesitan el grupo completo.
+
+        Los agregados deben haberse creado con la misma agrupación (--outlier-by-currency).
+        """
+        deltas = list(scope.category_deltas(self.outlier_by_currency).values())
+        groups = session.execute_write(lambda tx: tx.run(CATEGORY_STATS_UPDATE_QUERY, rows=deltas).data())
+
+        flagged = 0
+        for group in groups:
+            params = {'category': group['category'], 'currency': group['currency']}
+            if group['count'] <= 0:
+                scored = {}
+            elif self.outlier_method == 'stddev':
+                mean, stdev = stats_from_sums(group['count'], group['sum'], group['sumSquares'])
+                candidates = session.run(CATEGORY_AWARDS_QUERY, threshold=mean + 2 * stdev, **params).data()
+                scored = score_tail([row['id'] for row in candidates], [row['value'] for row in candidates],
+                                    group['count'], group['sum'], group['sumSquares'])
+            else:
+                candidates = session.run(CATEGORY_AWARDS_QUERY, threshold=-math.inf, **params).data()
+                scored = score_unusual_amounts([row['id'] for row in candidates],
+                                               [row['value'] for row in candidates],
+                                               [group['key']] * len(candidates), method='mad')
+
+            session.execute_write(
+                lambda tx: tx.run(UNUSUAL_AMOUNT_CLEAR_QUERY, keep=list(scored), **params).consume())
+            self._write_rows(UNUSUAL_AMOUNT_WRITE_QUERY,
+                             [{'id': award_id, 'props': props} for award_id, props in scored.items()])
+            flagged += len(scored)
+        print(f"- Adjudicaciones con montos inusuales en {len(groups)} grupos afectados: {flagged}")
+
+    def create_regional_cooperation(self, session, scope=None):
+        """REGIONAL_COOPERATION entre proveedores con contrataciones en común, contadas con
+        un producto de matrices dispersas. En modo delta solo se recuentan los pares de los
+        proveedores afectados, sobre las contrataciones en que participan."""
+        if scope is None:
+            result = session.run(SUPPLIER_PAIRS_SOURCE_QUERY)
+        else:
+            self._write_rows(REGIONAL_COOPERATION_RESET_QUERY, list(scope.suppliers))
+            result = session.run(SUPPLIER_PAIRS_SCOPED_SOURCE_QUERY, supplierIds=list(scope.suppliers))
+        pairs, regions = [], {}
+        for row in self.metrics.counted(result):
+            pairs.append((row['ocid'], row['supplierId']))
+            regions[row['supplierId']] = row['region']
+
+        created = 0
+        edges = supplier_pairs(pairs, regions=regions, min_shared=self.cooperation_min_shared,
+                               same_region=self.cooperation_same_region)
+        if scope is not None:
+            edges = (edge for edge in edges
+                     if edge['source'] in scope.suppliers or edge['target'] in scope.suppliers)
+        for rows in chunked(edges, self.batch_size * self.partitions):
+            self._write_partitioned(REGIONAL_COOPERATION_WRITE_QUERY, rows, 'source', 'target',
+                                    'regional_cooperation')
+            created += len(rows)
+        print(f"- Relaciones REGIONAL_COOPERATION ({self.cooperation_min_shared}+ contrataciones en común): "
+              f"{created}")
+
+    def detect_splitting(self, session, scope=None):
+        """Alertas de fraccionamiento por ventanas móviles (splitting.py); el comprador
+        conserva potentialSplitting de su alerta más grande. En modo delta se recalculan
+        solo las series de los compradores afectados."""
+        if scope is None:
+            result = session.run(SPLITTING_SOURCE_QUERY)
+        else:
+            self._write_rows(SPLITTING_RESET_QUERY, list(scope.buyers))
+            result = session.run(SPLITTING_SCOPED_SOURCE_QUERY, buyerIds=list(scope.buyers))
+        by_supplier = self.splitting_options.get('by_supplier', False)
+        awards = []
+        for row in self.metrics.counted(result):
+            for supplier_id in (row['supplierIds'] or [None]) if by_supplier else [None]:
+                awards.append((row['buyerId'], row['category'], supplier_id, row['epochMillis'],
+                               row['value'], row['awardId']))
+
+        alerts = splitting_alerts(awards, **self.splitting_options)
+        self._write_rows(SPLITTING_ALERT_WRITE_QUERY, alerts)
+        flags = [{'id': buyer_id, 'props': props} for buyer_id, props in buyer_flags(alerts).items()]
+        self._write_rows(BUYER_SPLITTING_WRITE_QUERY, flags)
+        print(f"- Alertas de fraccionamiento: {len(alerts)} en {len(flags)} compradores")
+
+    def resolve_supplier_entities(self, session, scope=None):
+        """SupplierEntity por grupo de proveedores que son la misma empresa (entity_resolution.py)
+        y SAME_AS de cada proveedor a la suya, con las adjudicaciones sumadas por entidad.
+
+        La agrupación es siempre global, porque un proveedor nuevo puede unir grupos viejos;
+        en modo delta solo se escriben los enlaces que cambiaron o que tocan proveedores
+        afectados, y se borran las entidades que quedaron sin proveedores."""
+        suppliers, current = [], {}
+        for row in self.metrics.counted(session.run(SUPPLIER_RESOLUTION_SOURCE_QUERY)):
+            suppliers.append((row['id'], row['name'], row['ruc']))
+            current[row['id']] = row['entityId']
+        links, entities = resolve_suppliers(suppliers, threshold=self.entity_threshold,
+                                            max_block=self.entity_max_block)
+        merged = sum(1 for link in links if link['reason'] != 'self')
+        stale = []
+        if scope is not None:
+            links = [link for link in links
+                     if current[link['supplierId']] != link['entityId'] or link['supplierId'] in scope.suppliers]
+            touched = {link['entityId'] for link in links}
+            stale = list({current[link['supplierId']] for link in links} - touched - {None})
+            entities = [entity for entity in entities if entity['id'] in touched]
+        self._write_rows(SUPPLIER_ENTITY_WRITE_QUERY, entities)
+        self._write_rows(SAME_AS_WRITE_QUERY, links)
+        self._write_rows(SUPPLIER_ENTITY_CLEANUP_QUERY, stale)
+        self._write_rows(SUPPLIER_ENTITY_STATS_QUERY, [entity['id'] for entity in entities])
+        print(f"- Entidades de proveedores: {len(entities)} escritas; {merged} proveedores unidos a otro id")
+
+    def refresh_counters(self, session, scope=None):
+        """Contadores por comprador y proveedor y pares BUYS_FROM (adjudicaciones y monto por
+        comprador y proveedor). En modo delta solo se recalculan los afectados."""
+        if scope is None:
+            buyers = [row['id'] for row in session.run(BUYER_IDS_QUERY)]
+            suppliers = [row['id'] for row in session.run(SUPPLIER_IDS_QUERY)]
+        else:
+            buyers, suppliers = list(scope.buyers), list(scope.suppliers)
+            self._write_rows(BUYER_COUNTERS_RESET_QUERY, buyers)
+        self._write_rows(BUYER_COUNTERS_QUERY, buyers)
+        self._write_rows(SUPPLIER_COUNTERS_QUERY, suppliers)
+        print(f"- Contadores actualizados: {len(buyers)} compradores, {len(suppliers)} proveedores")
+
+    def write_dashboard_summary(self, session, scope=None):
+        """Nodo DashboardSummary con totales y listas top, leído por la API de lectura; se
+        arma desde los contadores indexados, así que cuesta lo mismo en carga completa y delta"""
+        summary = session.execute_write(
+            lambda tx: tx.run(DASHBOARD_SUMMARY_QUERY, topK=self.summary_top_k).consume())
+        self.counters.add('dashboard_summary', summary.counters)
+
+    def _load_chunk(self, chunk):
+        """Pasos 3 a 9: nodos y relaciones básicas de un lote ya transformado
+        (transform_pipeline.TransformedChunk); corre en los hilos escritores del pipeline.
+
+        Las etiquetas de nodos independientes se cargan a la vez en sesiones separadas;
+        cada relación espera a sus nodos y corre junto a otras que no bloqueen sus etiquetas.
+        Los bloqueos se comparten entre escritores (self.label_locks), así que etapas de
+        lotes distintos tampoco se solapan en una etiqueta.
+        """
+        rows = chunk.batches
+        stages = [
+            Stage(kind, partial(self._load_node_stage, kind, rows[kind]),
+                  locks=[NODE_LABELS[kind]], after=NODE_DEPENDENCIES.get(kind, ()))
+            for kind in EntityRows.NODE_KINDS
+        ]
+        for kind in EntityRows.EDGE_KINDS:
+            endpoint_stages = EDGE_ENDPOINTS[kind][2]
+            stages.append(Stage(kind, partial(self._load_edge_stage, kind, rows[kind]),
+                                locks=[NODE_LABELS[stage] for stage in endpoint_stages], after=endpoint_stages))
+
+        durations = run_stages(stages, self.workers, self.label_locks)
+        slowest = max(durations, key=durations.get)
+        print(f"Lote cargado; etapa más lenta: {slowest} ({durations[slowest]:.2f}s)")
+
+    def report_metrics(self):
+        """Muestra las etapas más lentas y exporta las métricas (JSON, Prometheus, perfiles)"""
+        print("\nEtapas más lentas:")
+        for metrics in self.metrics.slowest():
+            rate = metrics.rows_per_second()
+            rate = f", {rate:,.0f} filas/s" if rate is not None else ""
+            print(f"- {metrics.name}: {metrics.seconds:.2f}s en {metrics.calls} llamadas{rate}")
+        self.metrics.write(self.metrics_path, self.prometheus_path,
+                           self.profile_dir if self.profile == 'cprofile' else None, self.counters.as_dict())
+        queues = self.metrics.as_dict()['queues']
+        if queues:
+            print("Colas del pipeline (profundidad media / máxima / capacidad):")
+            for queue in queues:
+                print(f"- {queue['queue']}: {queue['meanDepth']} / {queue['maxDepth']} / {queue['capacity']}"
+                      f" ({queue['fullSamples']} muestras con la cola llena)")
+        for path in (self.metrics_path, self.prometheus_path):
+            if path:
+                print(f"Métricas guardadas en '{path}'")
 
     def verify_data_load(self):
+        """Conteos por etiqueta y relación en una sola consulta (count store) y conteo de
+        patrones de riesgo en otra"""
         with self.driver.session() as session:
-            print("\nVerificación de datos cargados:")
-            # Conteo de nodos
-            buyers = session.run("MATCH (b:Buyer) RETURN count(b) AS count").single()["count"]
-            procurements = session.run("MATCH (p:Procurement) RETURN count(p) AS count").single()["count"]
-            items = session.run("MATCH (i:Item) RETURN count(i) AS count").single()["count"]
-            awards = session.run("MATCH (a:Award) RETURN count(a) AS count").single()["count"]
-            contracts = session.run("MATCH (c:Contract) RETURN count(c) AS count").single()["count"]
-            suppliers = session.run("MATCH (s:Supplier) RETURN count(s) AS count").single()["count"]
-
-            print(f"- Buyers: {buyers}")
-            print(f"- Procurements: {procurements}")
-            print(f"- Items: {items}")
-            print(f"- Awards: {awards}")
-            print(f"- Contracts: {contracts}")
-            print(f"- Suppliers: {suppliers}")
-
-            # Conteo de relaciones básicas
-            buyer_proc = session.run("MATCH ()-[r:PUBLISHED]->() RETURN count(r) AS count").single()["count"]
-            proc_items = session.run("MATCH ()-[r:INCLUDES]->() RETURN count(r) AS count").single()["count"]
-            award_suppliers = session.run("MATCH ()-[r:AWARDED_TO]->() RETURN count(r) AS count").single()["count"]
-            proc_awards = session.run("MATCH ()-[r:HAS_AWARD]->() RETURN count(r) AS count").single()["count"]
-            award_contracts = session.run("MATCH ()-[r:HAS_CONTRACT]->() RETURN count(r) AS count").single()["count"]
-
-            print(f"- Relaciones Buyer-Procurement: {buyer_proc}")
-            print(f"- Relaciones Procurement-Item: {proc_items}")
-            print(f"- Relaciones Award-Supplier: {award_suppliers}")
-            print(f"- Relaciones Procurement-Award: {proc_awards}")
-            print(f"- Relaciones Award-Contract: {award_contracts}")
-
-            # Conteo de patrones de riesgo
-            related_time = session.run("MATCH ()-[r:RELATED_TIME]->() RETURN count(r) AS count").single()["count"]
-            high_freq_suppliers = \
-            session.run("MATCH (s:Supplier) WHERE s.highFrequencySupplier = true RETURN count(s) AS count").single()[
-                "count"]
-            quick_awards = \
-            session.run("MATCH (p:Procurement) WHERE p.quickAward = true RETURN count(p) AS count").single()["count"]
-            unusual_amounts = \
-            session.run("MATCH (a:Award) WHERE a.unusualAmount = true RETURN count(a) AS count").single()["count"]
-            regional_coop = session.run("MATCH ()-[r:REGIONAL_COOPERATION]->() RETURN count(r) AS count").single()[
-                "count"]
-
-            print("\nPatrones de riesgo detectados:")
-            print(f"- Contrataciones relacionadas temporalmente: {related_time}")
-            print(f"- Proveedores de alta frecuencia: {high_freq_suppliers}")
-            print(f"- Adjudicaciones rápidas: {quick_awards}")
-            print(f"- Montos inusuales: {unusual_amounts}")
-            print(f"- Cooperaciones regionales: {regional_coop}")
+            counts = session.execute_read(lambda tx: tx.run(COUNTS_QUERY).single().data())
+            risks = session.execute_read(lambda tx: tx.run(RISK_COUNTS_QUERY).single().data())
+
+        print("\nVerificación de datos cargados:")
+        print(f"- Buyers: {counts['Buyer']}")
+        print(f"- Procurements: {counts['Procurement']}")
+        print(f"- Items: {counts['Item']}")
+        print(f"- Awards: {counts['Award']}")
+        print(f"- Contracts: {counts['Contract']}")
+        print(f"- Suppliers: {counts['Supplier']}")
+        print(f"- Supplier entities: {counts['SupplierEntity']}")
+
+        print(f"- Relaciones Buyer-Procurement: {counts['PUBLISHED']}")
+        print(f"- Relaciones Procurement-Item: {counts['INCLUDES']}")
+        print(f"- Relaciones Award-Supplier: {counts['AWARDED_TO']}")
+        print(f"- Relaciones Procurement-Award: {counts['HAS_AWARD']}")
+        print(f"- Relaciones Award-Contract: {counts['HAS_CONTRACT']}")
+        print(f"- Pares Buyer-Supplier (BUYS_FROM): {counts['BUYS_FROM']}")
+        print(f"- Relaciones Supplier-SupplierEntity (SAME_AS): {counts['SAME_AS']}")
+
+        print("\nPatrones de riesgo detectados:")
+        print(f"- Contrataciones relacionadas temporalmente: {counts['RELATED_TIME']}")
+        print(f"- Proveedores de alta frecuencia: {risks['highFrequencySuppliers']}")
+        print(f"- Empresas de alta frecuencia (SupplierEntity): {risks['highFrequencyEntities']}")
+        print(f"- Adjudicaciones rápidas: {risks['quickAwards']}")
+        print(f"- Montos inusuales: {risks['unusualAmounts']}")
+        print(f"- Cooperaciones regionales: {counts['REGIONAL_COOPERATION']}")
+        print(f"- Alertas de fraccionamiento: {counts['SplittingAlert']}")
+        return counts, risks
 
     def verify_data_integrity(self):
+        """Chequeos de integridad calculados al proyectar cada lote (IntegrityCheck); la
+        unicidad de OCID la garantizan el staging y el constraint"""
+        integrity = self.integrity.report()
         print("\nVerificando integridad de los datos:")
-        with self.driver.session() as session:
-            print("\n1. Verificando IDs y duplicados...")
-            result = session.run("""
-            MATCH (p:Procurement)
-            WITH p.ocid as ocid, COUNT(*) as count
-            WHERE count > 1
-            RETURN ocid, count as duplicate_count
-            """)
-            for record in result:
-                print(f"¡Advertencia! OCID {record['ocid']} está duplicado {record['duplicate_count']} veces")
-
-            print("\n2. Verificando relaciones...")
-            orphan_procs = session.run("""
-            MATCH (p:Procurement)
-            WHERE NOT (()-[:PUBLISHED]->(p))
-            RETURN COUNT(p) as count
-            """).single()['count']
-            print(f"- Procurements sin Buyer: {orphan_procs}")
-
-            orphan_items = session.run("""
-            MATCH (i:Item)
-            WHERE NOT (()-[:INCLUDES]->(i))
-            RETURN COUNT(i) as count
-            """).single()['count']
-            print(f"- Items sin Procurement: {orphan_items}")
-
-            orphan_awards = session.run("""
-            MATCH (a:Award)
-            WHERE NOT (()-[:HAS_AWARD]->(a))
-            RETURN COUNT(a) as count
-            """).single()['count']
-            print(f"- Awards sin Procurement: {orphan_awards}")
-
-            orphan_contracts = session.run("""
-            MATCH (c:Contract)
-            WHERE NOT (()-[:HAS_CONTRACT]->(c))
-            RETURN COUNT(c) as count
-            """).single()['count']
-            print(f"- Contracts sin Award: {orphan_contracts}")
-
-            print("\n3. Verificando campos obligatorios...")
-            missing_fields = session.run("""
-            MATCH (p:Procurement)
-            WHERE p.title IS NULL OR p.publishedDate IS NULL
-            OR p.procurementMethod IS NULL OR p.mainCategory IS NULL
-            RETURN COUNT(p) as count
-            """).single()['count']
-            if missing_fields > 0:
-                print(f"¡Advertencia! {missing_fields} Procurements tienen campos obligatorios faltantes")
-
-            print("\n4. Verificando coherencia de fechas...")
-            invalid_dates = session.run("""
-            MATCH (p:Procurement)
-            WHERE p.publishedDate > datetime()
-            RETURN COUNT(p) as count
-            """).single()['count']
-            if invalid_dates > 0:
-                print(f"¡Advertencia! {invalid_dates} Procurements tienen fechas futuras")
-
-            print("\nVerificación de integridad completada.")
+        print(f"- Procurements sin Buyer: {integrity['procurements_without_buyer']}")
+        print(f"- Items sin Procurement: {integrity['items_without_procurement']}")
+        print(f"- Awards sin Procurement: {integrity['awards_without_procurement']}")
+        print(f"- Contracts sin Award (no cargados): {integrity['contracts_without_award']}")
+        if integrity['procurements_missing_fields'] > 0:
+            print(f"¡Advertencia! {integrity['procurements_missing_fields']} Procurements tienen campos "
+                  f"obligatorios faltantes")
+        if integrity['procurements_with_future_dates'] > 0:
+            print(f"¡Advertencia! {integrity['procurements_with_future_dates']} Procurements tienen fechas futuras")
+        print("\nVerificación de integridad completada.")
+        return integrity
+
+    def write_verification_report(self, cleaned_data, changed_ocids, delta, counts, risks, integrity):
+        report = {
+            'generatedAt': datetime.now(timezone.utc).isoformat(),
+            'mode': 'delta' if delta else 'full',
+            'staging': cleaned_data.stats(),
+            'writtenOcids': len(changed_ocids),
+            'counts': counts,
+            'riskCounts': risks,
+            # En modo delta solo cubren lo escrito en esta carga
+            'writeCounters': self.counters.as_dict(),
+            'integrity': integrity,
+        }
+        write_report(self.report_path, report)
+        print(f"Reporte de verificación guardado en '{self.report_path}'")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Carga registros OCDS en Neo4j")
+    parser.add_argument('input', nargs='?', default='contratos_completos.json',
+                        help="Archivo JSON con 'records' o directorio de shards NDJSON")
+    parser.add_argument('--archive', help="Directorio del archivo comprimido de registros indexado por OCID")
+    parser.add_argument('--ocids', nargs='+',
+                        help="Cargar solo estos OCID desde --archive en lugar de leer la entrada")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="Registros por lote de carga")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Filas por transacción de escritura")
+    parser.add_argument('--workers', type=int, default=4, help="Etapas de carga simultáneas")
+    parser.add_argument('--partitions', type=int, default=4,
+                        help="Particiones paralelas por tipo de relación")
+    parser.add_argument('--staging-dir', help="Directorio para el staging de deduplicación (por defecto temporal)")
+    parser.add_argument('--staging-cache-mb', type=int, default=64,
+                        help="Memoria máxima de caché del staging antes de usar disco")
+    parser.add_argument('--related-window-days', type=int, default=30,
+                        help="Días máximos entre contrataciones relacionadas (RELATED_TIME)")
+    parser.add_argument('--outlier-method', choices=['stddev', 'mad'], default='stddev',
+                        help="Criterio de montos inusuales: promedio y desviación, o mediana y MAD")
+    parser.add_argument('--outlier-by-currency', action='store_true',
+                        help="Comparar montos por categoría y moneda")
+    parser.add_argument('--cooperation-min-shared', type=int, default=2,
+                        help="Contrataciones en común mínimas para REGIONAL_COOPERATION")
+    parser.add_argument('--cooperation-any-region', action='store_true',
+                        help="Relacionar proveedores aunque no compartan región")
+    parser.add_argument('--splitting-window-days', type=int, default=7,
+                        help="Días de la ventana móvil de fraccionamiento")
+    parser.add_argument('--splitting-min-count', type=int, default=3,
+                        help="Adjudicaciones mínimas en la ventana para generar alerta")
+    parser.add_argument('--splitting-max-award', type=float,
+                        help="Considerar solo adjudicaciones por debajo de este monto")
+    parser.add_argument('--splitting-min-total', type=float,
+                        help="Suma mínima de la ventana para generar alerta")
+    parser.add_argument('--splitting-by-supplier', action='store_true',
+                        help="Agrupar también por proveedor")
+    parser.add_argument('--report', default='verificacion_carga.json',
+                        help="Archivo JSON del reporte de verificación (vacío para no escribirlo)")
+    parser.add_argument('--metrics', default='metricas_carga.json',
+                        help="Archivo JSON con tiempos, filas y memoria por etapa (vacío para no escribirlo)")
+    parser.add_argument('--metrics-prometheus', metavar='FILE',
+                        help="Escribir también las métricas en formato de texto de Prometheus")
+    parser.add_argument('--profile', choices=PROFILERS,
+                        help="Perfilar las etapas en Python con cProfile o medir su memoria con tracemalloc")
+    parser.add_argument('--profile-dir', default='perfiles',
+                        help="Directorio de los .prof de cProfile (uno por etapa)")
+    parser.add_argument('--summary-top-k', type=int, default=10,
+                        help="Elementos de cada lista top del resumen del dashboard")
+    parser.add_argument('--transform-processes', type=int,
+                        help="Procesos que decodifican y proyectan los lotes (por defecto, uno por núcleo)")
+    parser.add_argument('--writers', type=int, default=2,
+                        help="Hilos que escriben lotes transformados en Neo4j a la vez; comparten los "
+                             "bloqueos por etiqueta")
+    parser.add_argument('--queue-size', type=int, default=4,
+                        help="Lotes transformados que pueden esperar a un escritor")
+    parser.add_argument('--entity-threshold', type=float, default=0.85,
+                        help="Similitud mínima de nombres para unir proveedores sin RUC en una entidad")
+    parser.add_argument('--entity-max-block', type=int, default=200,
+                        help="Proveedores máximos por bloque de comparación (los bloques mayores se ignoran)")
+    parser.add_argument('--bulk-export', metavar='DIR',
+                        help="Escribir CSV para neo4j-admin import en DIR en lugar de cargar con Cypher")
+    parser.add_argument('--delta', action='store_true',
+                        help="Actualizar solo OCID nuevos o modificados sin limpiar la base")
+    args = parser.parse_args()
+
     print(f"Directorio actual: {os.getcwd()}")
 
     uri = "bolt://localhost:7687"
     username = "neo4j"
     password = ":kJ7k,G+87.W"
 
-    print("Cargando datos desde contratos_completos.json...")
-    try:
-        with open('contratos_completos.json', 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            print(f"Cantidad de registros en 'records': {len(data['records'])}")
-    except FileNotFoundError:
-        print("Error: No se encontró el archivo 'contratos_completos.json' en el directorio actual.")
+    if args.ocids:
+        if not args.archive:
+            print("Error: --ocids requiere --archive")
+            return
+        archive = RecordArchive(args.archive)
+        try:
+            releases = archive.get_many(args.ocids)
+        finally:
+            archive.close()
+        for ocid in args.ocids:
+            if ocid not in releases:
+                print(f"¡Advertencia! OCID {ocid} no está en el archivo")
+        data = {'records': [{'ocid': ocid, 'compiledRelease': release} for ocid, release in releases.items()]}
+        print(f"Cantidad de registros recuperados del archivo: {len(data['records'])}")
+        # Recargar unos pocos OCID nunca debe vaciar la base
+        args.delta = True
+        load_records(uri, username, password, data, args)
         return
-    except json.JSONDecodeError:
-        print("Error: El archivo 'contratos_completos.json' no contiene un JSON válido.")
+
+    print(f"Cargando datos desde {args.input}...")
+    source = RecordSource(args.input)
+    if not source.exists():
+        print(f"Error: No se encontró '{args.input}' en el directorio actual.")
         return
-    except Exception as e:
-        print(f"Error al leer el archivo: {e}")
+
+    if args.archive:
+        archive = RecordArchive(args.archive)
+        try:
+            archive.add_records(source)
+            print(f"Registros archivados en '{args.archive}': {len(archive)}")
+        except json.JSONDecodeError:
+            print(f"Error: '{args.input}' no contiene un JSON válido.")
+            return
+        finally:
+            archive.close()
+
+    if args.bulk_export:
+        export_to_csv(source, args)
         return
 
-    loader = Neo4jLoader(uri, username, password)
+    load_records(uri, username, password, source, args)
+
+
+def splitting_options(args):
+    return {
+        'window_days': args.splitting_window_days,
+        'min_count': args.splitting_min_count,
+        'max_award_value': args.splitting_max_award,
+        'min_total_value': args.splitting_min_total,
+        'by_supplier': args.splitting_by_supplier,
+    }
+
+
+def export_to_csv(source, args):
+    print("\nDeduplicando registros para exportación masiva...")
+    store = StagingStore(source, directory=args.staging_dir, cache_mb=args.staging_cache_mb)
+    try:
+        print(f"- Registros originales: {store.total}, después de limpieza: {len(store)}")
+        rows = project_rows(store)
+    finally:
+        store.close()
+
+    print(f"\nEscribiendo CSV en '{args.bulk_export}'...")
+    command = export_bulk(rows, args.bulk_export, related_window_days=args.related_window_days,
+                          outlier_method=args.outlier_method, outlier_by_currency=args.outlier_by_currency,
+                          cooperation_min_shared=args.cooperation_min_shared,
+                          cooperation_same_region=not args.cooperation_any_region,
+                          splitting_options=splitting_options(args), summary_top_k=args.summary_top_k,
+                          entity_threshold=args.entity_threshold, entity_max_block=args.entity_max_block)
+    print("\nImportar con la base detenida:")
+    print(f"  cd {args.bulk_export} && {command}")
+    print("Luego crear los constraints con post_import.cypher")
+
+
+def load_records(uri, username, password, data, args):
+    loader = Neo4jLoader(uri, username, password, batch_size=args.batch_size,
+                         workers=args.workers, partitions=args.partitions,
+                         staging_dir=args.staging_dir, staging_cache_mb=args.staging_cache_mb,
+                         related_window_days=args.related_window_days,
+                         outlier_method=args.outlier_method, outlier_by_currency=args.outlier_by_currency,
+                         cooperation_min_shared=args.cooperation_min_shared,
+                         cooperation_same_region=not args.cooperation_any_region,
+                         splitting_options=splitting_options(args), report_path=args.report,
+                         metrics_path=args.metrics, prometheus_path=args.metrics_prometheus,
+                         profile=args.profile, profile_dir=args.profile_dir, summary_top_k=args.summary_top_k,
+                         entity_threshold=args.entity_threshold, entity_max_block=args.entity_max_block,
+                         transform_processes=args.transform_processes, writers=args.writers,
+                         queue_size=args.queue_size)
     try:
-        loader.load_data(data)
+        loader.load_data(data, chunk_size=args.chunk_size, delta=args.delta)
+    except json.JSONDecodeError as e:
+        print(f"Error: la entrada no contiene un JSON válido: {e}")
     except Exception as e:
         print(f"Error durante la carga de datos: {e}")
     finally:
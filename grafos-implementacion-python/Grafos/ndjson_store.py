@@ -0,0 +1,121 @@
+import gzip
+import json
+import os
+import re
+
+SHARD_PATTERN = re.compile(r'^records-(\d{5})\.ndjson(\.gz)?$')
+CHECKPOINT_FILE = 'checkpoint.json'
+
+
+def shard_paths(directory):
+    """Shards del directorio ordenados por número"""
+    names = [name for name in os.listdir(directory) if SHARD_PATTERN.match(name)]
+    names.sort(key=lambda name: int(SHARD_PATTERN.match(name).group(1)))
+    return [os.path.join(directory, name) for name in names]
+
+
+def is_shard_dir(path):
+    return os.path.isdir(path) and bool(shard_paths(path))
+
+
+def iter_shard_lines(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                yield line
+
+
+def iter_shard_records(directory):
+    """Recorre los registros de todos los shards sin cargarlos completos en memoria"""
+    for path in shard_paths(directory):
+        for line in iter_shard_lines(path):
+            yield json.loads(line)
+
+
+class ShardWriter:
+    """Escribe registros como NDJSON en shards rotativos, opcionalmente comprimidos.
+
+    Cada página se escribe y se vacía a disco de inmediato; en modo comprimido
+    cada página es un miembro gzip independiente, así un corte deja el shard legible.
+    """
+
+    def __init__(self, directory, max_records_per_shard=50000, compress=False):
+        self.directory = directory
+        self.max_records_per_shard = max_records_per_shard
+        self.compress = compress
+        os.makedirs(directory, exist_ok=True)
+
+        # Al reanudar se continúa con un shard nuevo después del último existente
+        existing = shard_paths(directory)
+        self.shard_index = int(SHARD_PATTERN.match(os.path.basename(existing[-1])).group(1)) + 1 if existing else 0
+        self.records_in_shard = 0
+        self.total_records = 0
+        self._file = None
+
+    @property
+    def current_path(self):
+        suffix = '.ndjson.gz' if self.compress else '.ndjson'
+        return os.path.join(self.directory, f"records-{self.shard_index:05d}{suffix}")
+
+    def _rotate(self):
+        self.close()
+        self.shard_index += 1
+        self.records_in_shard = 0
+
+    def write_records(self, records):
+        pending = list(records)
+        while pending:
+            if self.records_in_shard >= self.max_records_per_shard:
+                self._rotate()
+            room = self.max_records_per_shard - self.records_in_shard
+            chunk, pending = pending[:room], pending[room:]
+            self._write_chunk(chunk)
+
+    def _write_chunk(self, records):
+        payload = ''.join(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+                          for record in records).encode('utf-8')
+        if self._file is None:
+            self._file = open(self.current_path, 'ab')
+        self._file.write(gzip.compress(payload) if self.compress else payload)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.records_in_shard += len(records)
+        self.total_records += len(records)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Checkpoint:
+    """Guarda el último cursor `next` de cada ventana para poder reanudar la descarga"""
+
+    def __init__(self, path):
+        self.path = path
+        self.windows = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                self.windows = json.load(file).get('windows', {})
+
+    @staticmethod
+    def key(window):
+        return f"{window[0]}|{window[1]}"
+
+    def is_done(self, window):
+        return self.windows.get(self.key(window), {}).get('done', False)
+
+    def next_url(self, window):
+        return self.windows.get(self.key(window), {}).get('next')
+
+    def update(self, window, next_link):
+        self.windows[self.key(window)] = {'next': next_link, 'done': not next_link}
+        self.save()
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({'windows': self.windows}, file)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,177 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BASE_URL = 'https://contratacionesabiertas.osce.gob.pe/api/v1/recordsAfter'
+SOURCE_ID = 'seace_v3'
+PAGE_SIZE = 100
+
+
+def split_date_range(start_date, end_date, window_days):
+    """Divide [start_date, end_date] en ventanas de `window_days` días (fechas ISO).
+
+    Las ventanas comparten el día de borde porque la API no documenta si
+    `endDate` es inclusivo; los OCID repetidos se eliminan al cargar.
+    """
+    start = date.fromisoformat(start_date)
+    end = date.fromisoformat(end_date)
+    if window_days <= 0:
+        raise ValueError("window_days debe ser mayor que cero")
+
+    windows = []
+    current = start
+    while current < end:
+        window_end = min(current + timedelta(days=window_days), end)
+        windows.append((current.isoformat(), window_end.isoformat()))
+        current = window_end
+    return windows or [(start.isoformat(), end.isoformat())]
+
+
+def build_session(pool_size, retries=5, backoff_factor=0.5):
+    """Sesión HTTP compartida con pool de conexiones y reintentos con backoff exponencial"""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class HarvestStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.records = 0
+        self.failed_windows = 0
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+
+    def add_page(self, record_count):
+        with self._lock:
+            self.pages += 1
+            self.records += record_count
+
+    def add_failure(self):
+        with self._lock:
+            self.failed_windows += 1
+
+    @property
+    def elapsed(self):
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    @property
+    def records_per_second(self):
+        elapsed = self.elapsed
+        return self.records / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.records} registros en {self.pages} páginas, "
+                f"{self.elapsed:.1f}s ({self.records_per_second:.1f} registros/s)")
+
+
+class OCDSHarvester:
+    """Recorre en paralelo las cadenas `links.next` de `recordsAfter` por ventana de fechas"""
+
+    def __init__(self, base_url=BASE_URL, source_id=SOURCE_ID, page_size=PAGE_SIZE,
+                 max_workers=8, retries=5, backoff_factor=0.5, timeout=60):
+        self.base_url = base_url
+        self.source_id = source_id
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = build_session(max_workers, retries=retries, backoff_factor=backoff_factor)
+        self._sink_lock = threading.Lock()
+
+    def close(self):
+        self.session.close()
+
+    def window_params(self, start_date, end_date):
+        return {
+            'size': self.page_size,
+            'sourceId': self.source_id,
+            'startDate': start_date,
+            'endDate': end_date,
+        }
+
+    def fetch_page(self, url, params=None):
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def harvest_window(self, window, on_page, stats, max_pages=None, checkpoint=None):
+        """Sigue la cadena `links.next` de una ventana; devuelve el número de páginas leídas"""
+        start_date, end_date = window
+        url = self.base_url
+        params = self.window_params(start_date, end_date)
+        if checkpoint is not None and checkpoint.next_url(window):
+            url, params = checkpoint.next_url(window), None
+        page_count = 0
+
+        while max_pages is None or page_count < max_pages:
+            data = self.fetch_page(url, params)
+            records = data.get('records', [])
+            # Una página vacía también cierra la ventana
+            next_link = data.get('links', {}).get('next') if records else None
+            stats.add_page(len(records))
+            page_count += 1
+
+            # El sink se serializa para que no tenga que ser thread-safe; el cursor
+            # se guarda después de que la página quedó escrita
+            with self._sink_lock:
+                on_page(window, records, next_link)
+                if checkpoint is not None:
+                    checkpoint.update(window, next_link)
+
+            if not next_link:
+                break
+            # `next` ya trae todos los parámetros de la consulta
+            url, params = next_link, None
+
+        return page_count
+
+    def harvest(self, start_date, end_date, on_page, window_days=7, max_pages_per_window=None,
+                checkpoint=None, progress_every=10):
+        """Descarga el rango completo repartiendo las ventanas en un pool de hilos acotado"""
+        windows = split_date_range(start_date, end_date, window_days)
+        if checkpoint is not None:
+            pending = [window for window in windows if not checkpoint.is_done(window)]
+            if len(pending) < len(windows):
+                print(f"Reanudando: {len(windows) - len(pending)} ventanas ya completadas")
+            windows = pending
+        stats = HarvestStats()
+        print(f"Descargando {len(windows)} ventanas de {window_days} días con {self.max_workers} hilos...")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.harvest_window, window, on_page, stats,
+                                max_pages_per_window, checkpoint): window
+                for window in windows
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                window = futures[future]
+                try:
+                    pages = future.result()
+                    print(f"- Ventana {window[0]} a {window[1]}: {pages} páginas")
+                except Exception as e:
+                    stats.add_failure()
+                    print(f"Error en la ventana {window[0]} a {window[1]}: {e}")
+                if done % progress_every == 0:
+                    print(f"Progreso: {done}/{len(windows)} ventanas, {stats.summary()}")
+
+        stats.finished_at = time.perf_counter()
+        print(f"Descarga finalizada: {stats.summary()}")
+        if stats.failed_windows:
+            print(f"¡Advertencia! {stats.failed_windows} ventanas terminaron con error")
+        return stats
@@ -0,0 +1,114 @@
+"""Detección vectorizada de montos inusuales por categoría (y opcionalmente por moneda).
+
+Los montos se procesan como arreglos NumPy ordenados por (grupo, monto): con una sola
+ordenación se obtienen promedio, desviación, mediana, MAD y percentiles exactos de
+cada grupo con `searchsorted`, sin comparar cada adjudicación contra todas las demás.
+"""
+import math
+
+import numpy as np
+
+# Factor que hace a la MAD comparable con la desviación estándar en datos normales
+MAD_SCALE = 1.4826
+
+
+def group_key(category, currency=None):
+    """Clave del grupo de comparación: la categoría, o categoría y moneda"""
+    return str(category) if currency is None else f"{category}|{currency}"
+
+
+def stats_from_sums(count, total, total_squares):
+    """Promedio y desviación estándar muestral a partir de conteo, suma y suma de cuadrados"""
+    mean = total / count
+    if count < 2:
+        return mean, 0.0
+    variance = (total_squares - total * total / count) / (count - 1)
+    return mean, math.sqrt(max(variance, 0.0))
+
+
+def score_unusual_amounts(award_ids, values, categories, currencies=None, method='stddev',
+                          threshold=2.0, high_threshold=3.0):
+    """Devuelve {award_id: propiedades} de las adjudicaciones inusuales de su grupo.
+
+    `method='stddev'` marca montos mayores que promedio + `threshold` desviaciones
+    (como la consulta Cypher original); `method='mad'` usa mediana + `threshold` MAD,
+    más robusto ante montos extremos. Si se pasan `currencies`, los grupos son
+    categoría y moneda.
+    """
+    if method not in ('stddev', 'mad'):
+        raise ValueError(f"Método desconocido: {method}")
+    if len(values) == 0:
+        return {}
+
+    values = np.asarray(values, dtype=np.float64)
+    keys = [group_key(category, currency)
+            for category, currency in zip(categories, currencies or [None] * len(categories))]
+    _, groups = np.unique(np.asarray(keys, dtype=object), return_inverse=True)
+
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    sorted_groups = groups[order]
+    bounds = np.flatnonzero(np.diff(sorted_groups)) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(sorted_values)]))
+
+    result = {}
+    for start, end in zip(starts, ends):
+        group_values = sorted_values[start:end]
+        count = end - start
+        mean = group_values.mean()
+        stdev = group_values.std(ddof=1) if count > 1 else 0.0
+        median = np.median(group_values)
+        mad = np.median(np.abs(group_values - median)) * MAD_SCALE
+
+        center, scale = (mean, stdev) if method == 'stddev' else (median, mad)
+        # Los valores están ordenados: los inusuales son un sufijo del grupo
+        first = np.searchsorted(group_values, center + threshold * scale, side='right')
+        if first == count or scale == 0:
+            continue
+        flagged = group_values[first:]
+        percentile = np.searchsorted(group_values, flagged, side='right') / count * 100
+        deviation = (flagged - center) / scale
+
+        for position, value, rank, dev in zip(order[start + first:end], flagged, percentile, deviation):
+            result[award_ids[position]] = {
+                'unusualAmount': True,
+                'categoryAvg': float(mean),
+                'categoryStdDev': float(stdev),
+                'categoryMedian': float(median),
+                'categoryMAD': float(mad),
+                'deviation': float(dev),
+                'percentileRank': float(rank),
+                'riskLevel': 'ALTO' if value > center + high_threshold * scale else 'MEDIO',
+            }
+    return result
+
+
+def score_tail(award_ids, values, count, total, total_squares, threshold=2.0, high_threshold=3.0):
+    """Como score_unusual_amounts con `method='stddev'` para un solo grupo, pero a partir de
+    sus agregados acumulados: `values` solo necesita incluir los montos sobre el umbral.
+
+    Como todo monto mayor que uno marcado también está sobre el umbral, el percentil se
+    obtiene de la propia cola: (count - mayores) / count.
+    """
+    mean, stdev = stats_from_sums(count, total, total_squares)
+    if count == 0 or stdev == 0:
+        return {}
+    limit = mean + threshold * stdev
+    tail = sorted((value, award_id) for award_id, value in zip(award_ids, values) if value > limit)
+    tail_values = np.array([value for value, _ in tail], dtype=np.float64)
+    greater = len(tail) - np.searchsorted(tail_values, tail_values, side='right')
+
+    return {
+        award_id: {
+            'unusualAmount': True,
+            'categoryAvg': mean,
+            'categoryStdDev': stdev,
+            'categoryMedian': None,
+            'categoryMAD': None,
+            'deviation': (value - mean) / stdev,
+            'percentileRank': float((count - above) / count * 100),
+            'riskLevel': 'ALTO' if value > mean + high_threshold * stdev else 'MEDIO',
+        }
+        for (value, award_id), above in zip(tail, greater)
+    }
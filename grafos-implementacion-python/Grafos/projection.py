@@ -0,0 +1,382 @@
+import gc
+import sys
+from datetime import datetime, timedelta, timezone
+
+from supplier_search import normalize_name
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+_TIMEZONES = {}
+
+
+def _first(values):
+    return values[0] if values else {}
+
+
+def _coalesce(value, default):
+    return value if value is not None else default
+
+
+def _intern(value):
+    """Una sola copia de cada id o valor de enumeración repetido entre registros"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def encode_datetime(value):
+    """ISO 8601 -> (microsegundos desde epoch, zona horaria); (None, None) si falta o no se
+    puede leer. La zona es None cuando el texto no la trae (Neo4j la toma como UTC)"""
+    if not value:
+        return None, None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None, None
+    offset = parsed.utcoffset()
+    if offset is None:
+        moment = parsed.replace(tzinfo=timezone.utc)
+        tz = None
+    else:
+        moment = parsed
+        tz = _TIMEZONES.get(offset)
+        if tz is None:
+            tz = _TIMEZONES.setdefault(offset, timezone(offset))
+    return (moment - EPOCH) // MICROSECOND, tz
+
+
+def decode_datetime(micros, tz):
+    """Inverso de encode_datetime: texto ISO 8601 con la zona original"""
+    if micros is None:
+        return None
+    moment = EPOCH + micros * MICROSECOND
+    return moment.replace(tzinfo=None).isoformat() if tz is None else moment.astimezone(tz).isoformat()
+
+
+def to_datetime(micros, tz):
+    """datetime con zona que el driver envía como DateTime: lo mismo que datetime(texto)
+    en Cypher, que toma UTC cuando el texto no trae zona"""
+    if micros is None:
+        return None
+    moment = EPOCH + micros * MICROSECOND
+    return moment if tz is None else moment.astimezone(tz)
+
+
+class Row:
+    """Fila con __slots__ que se lee como un dict (row['campo'], {**row}); las fechas se
+    guardan como microsegundos desde epoch y se devuelven en ISO 8601 al leerlas"""
+
+    __slots__ = ()
+    FIELDS = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def keys(self):
+        return self.FIELDS
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def load_dict(self):
+        """Fila para las consultas de carga; las fechas van como datetime"""
+        return self.as_dict()
+
+
+class BuyerRow(Row):
+    __slots__ = FIELDS = ('id', 'name', 'ruc', 'address', 'contactPoint', 'email', 'telephone', 'region')
+
+    def __init__(self, id, name, ruc, address, contactPoint, email, telephone, region):
+        self.id = id
+        self.name = name
+        self.ruc = ruc
+        self.address = address
+        self.contactPoint = contactPoint
+        self.email = email
+        self.telephone = telephone
+        self.region = region
+
+
+class ProcurementRow(Row):
+    __slots__ = ('ocid', 'id', 'title', 'description', 'publishedMicros', 'publishedTz', 'procurementMethod',
+                 'procurementMethodDetails', 'mainCategory', 'contentHash')
+    FIELDS = ('ocid', 'id', 'title', 'description', 'publishedDate', 'procurementMethod',
+              'procurementMethodDetails', 'mainCategory', 'contentHash')
+
+    def __init__(self, ocid, id, title, description, publishedDate, procurementMethod, procurementMethodDetails,
+                 mainCategory, contentHash):
+        self.ocid = ocid
+        self.id = id
+        self.title = title
+        self.description = description
+        self.publishedMicros, self.publishedTz = encode_datetime(publishedDate)
+        self.procurementMethod = procurementMethod
+        self.procurementMethodDetails = procurementMethodDetails
+        self.mainCategory = mainCategory
+        self.contentHash = contentHash
+
+    @property
+    def publishedDate(self):
+        return decode_datetime(self.publishedMicros, self.publishedTz)
+
+    def load_dict(self):
+        row = self.as_dict()
+        row['publishedDate'] = to_datetime(self.publishedMicros, self.publishedTz)
+        return row
+
+    @property
+    def published_millis(self):
+        return None if self.publishedMicros is None else self.publishedMicros // 1000
+
+
+class ItemRow(Row):
+    __slots__ = FIELDS = ('id', 'description', 'status', 'quantity')
+
+    def __init__(self, id, description, status, quantity):
+        self.id = id
+        self.description = description
+        self.status = status
+        self.quantity = quantity
+
+
+class AwardRow(Row):
+    __slots__ = ('id', 'title', 'value', 'currency', 'dateMicros', 'dateTz', 'category')
+    FIELDS = ('id', 'title', 'value', 'currency', 'date', 'category')
+
+    def __init__(self, id, title, value, currency, date, category):
+        self.id = id
+        self.title = title
+        self.value = value
+        self.currency = currency
+        self.dateMicros, self.dateTz = encode_datetime(date)
+        self.category = category
+
+    @property
+    def date(self):
+        return decode_datetime(self.dateMicros, self.dateTz)
+
+    @property
+    def date_millis(self):
+        return None if self.dateMicros is None else self.dateMicros // 1000
+
+
+class ContractRow(Row):
+    __slots__ = FIELDS = ('id', 'title', 'description', 'value', 'currency', 'awardID', 'status')
+
+    def __init__(self, id, title, description, value, currency, awardID, status):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.value = value
+        self.currency = currency
+        self.awardID = awardID
+        self.status = status
+
+
+class SupplierRow(Row):
+    __slots__ = FIELDS = ('id', 'name', 'ruc', 'legalName', 'address', 'region', 'searchName')
+
+    def __init__(self, id, name, ruc, legalName, address, region, searchName):
+        self.id = id
+        self.name = name
+        self.ruc = ruc
+        self.legalName = legalName
+        self.address = address
+        self.region = region
+        self.searchName = searchName
+
+
+class EdgeRow(tuple):
+    """Relación como tupla de ids (es también su propia clave); edge['ocid'] por nombre"""
+
+    __slots__ = ()
+    FIELDS = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                key = self.FIELDS.index(key)
+            except ValueError:
+                raise KeyError(key) from None
+        return super().__getitem__(key)
+
+    def as_dict(self):
+        return dict(zip(self.FIELDS, self))
+
+    load_dict = as_dict
+
+
+def _edge_type(name, fields):
+    return type(name, (EdgeRow,), {'__slots__': (), 'FIELDS': fields})
+
+
+PublishedEdge = _edge_type('PublishedEdge', ('buyerId', 'ocid'))
+IncludesEdge = _edge_type('IncludesEdge', ('ocid', 'itemId'))
+HasAwardEdge = _edge_type('HasAwardEdge', ('ocid', 'awardId'))
+AwardedToEdge = _edge_type('AwardedToEdge', ('awardId', 'supplierId'))
+HasContractEdge = _edge_type('HasContractEdge', ('awardId', 'contractId'))
+
+
+class EntityRows:
+    """Filas compactas por entidad y por tipo de relación, listas para `UNWIND $rows`.
+
+    Los nodos son objetos con __slots__ y las relaciones tuplas de ids. Los valores que se
+    repiten entre registros (compradores, proveedores, monedas, categorías, regiones) se
+    internan para que existan una sola vez en memoria; los ids únicos de ítems,
+    adjudicaciones y contratos no. rows() los convierte a dicts solo al escribirlos.
+    """
+
+    NODE_KINDS = ('buyers', 'procurements', 'items', 'awards', 'contracts', 'suppliers')
+    EDGE_KINDS = ('published', 'includes', 'awarded_to', 'has_award', 'has_contract')
+
+    def __init__(self):
+        for kind in self.NODE_KINDS:
+            setattr(self, kind, {})
+        for kind in self.EDGE_KINDS:
+            setattr(self, kind, {})
+
+    def rows(self, kind):
+        return [row.as_dict() for row in getattr(self, kind).values()]
+
+    def load_rows(self, kind):
+        """Como rows(), pero con los valores ya convertidos para `UNWIND $rows` (fechas)"""
+        return [row.load_dict() for row in getattr(self, kind).values()]
+
+    def counts(self):
+        return {kind: len(getattr(self, kind)) for kind in self.NODE_KINDS + self.EDGE_KINDS}
+
+    def add_record(self, record):
+        release = record.get('compiledRelease', {})
+        ocid = release.get('ocid')
+        buyer = release.get('buyer') or {}
+        buyer_id = _intern(buyer.get('id'))
+        tender = release.get('tender')
+        parties = {party.get('id'): party for party in release.get('parties') or []}
+
+        # Los nodos se quedan con la primera aparición de cada clave, como ON CREATE SET
+        if buyer_id is not None and buyer_id not in self.buyers:
+            party = _first(release.get('parties'))
+            contact = party.get('contactPoint') or {}
+            self.buyers[buyer_id] = BuyerRow(
+                id=buyer_id,
+                name=_intern(buyer.get('name')),
+                ruc=_intern(_coalesce(_first(party.get('additionalIdentifiers')).get('id'), "N/A")),
+                address=_coalesce((party.get('address') or {}).get('streetAddress'), "No Address"),
+                contactPoint=_coalesce(contact.get('name'), "No Contact"),
+                email=_coalesce(contact.get('email'), "No Email"),
+                telephone=_coalesce(contact.get('telephone'), "No Phone"),
+                region=_intern(_coalesce((party.get('address') or {}).get('region'), "No Region")),
+            )
+
+        has_procurement = tender is not None and ocid is not None
+        if has_procurement and ocid not in self.procurements:
+            self.procurements[ocid] = ProcurementRow(
+                ocid=ocid,
+                id=tender.get('id'),
+                title=_coalesce(tender.get('title'), "No Title"),
+                description=_coalesce(tender.get('description'), "No Description"),
+                publishedDate=release.get('publishedDate'),
+                procurementMethod=_intern(_coalesce(tender.get('procurementMethod'), "N/A")),
+                procurementMethodDetails=_intern(_coalesce(tender.get('procurementMethodDetails'), "N/A")),
+                mainCategory=_intern(_coalesce(tender.get('mainProcurementCategory'), "No Category")),
+                contentHash=record.get('contentHash'),
+            )
+        if has_procurement and buyer_id is not None:
+            edge = PublishedEdge((buyer_id, ocid))
+            self.published[edge] = edge
+
+        for item in (tender or {}).get('items') or []:
+            item_id = item.get('id')
+            if not item_id:
+                continue
+            if item_id not in self.items:
+                self.items[item_id] = ItemRow(
+                    id=item_id,
+                    description=item.get('description', "No Description"),
+                    status=_intern(item.get('status', "No Status")),
+                    quantity=item.get('quantity', 0),
+                )
+            if has_procurement:
+                edge = IncludesEdge((ocid, item_id))
+                self.includes[edge] = edge
+
+        for award in release.get('awards') or []:
+            award_id = award.get('id')
+            if award_id is None:
+                continue
+            value = award.get('value') or {}
+            if award_id not in self.awards:
+                self.awards[award_id] = AwardRow(
+                    id=award_id,
+                    title=_coalesce(award.get('title'), "No Title"),
+                    value=_coalesce(value.get('amount'), 0),
+                    currency=_intern(_coalesce(value.get('currency'), "N/A")),
+                    date=award.get('date'),
+                    # Categoría de su contratación, para los agregados por categoría
+                    category=self.procurements[ocid].mainCategory if has_procurement else None,
+                )
+            if has_procurement:
+                edge = HasAwardEdge((ocid, award_id))
+                self.has_award[edge] = edge
+
+            for supplier in award.get('suppliers') or []:
+                supplier_id = _intern(supplier.get('id'))
+                if supplier_id is None:
+                    continue
+                if supplier_id not in self.suppliers:
+                    identifier = supplier.get('identifier') or {}
+                    # Las adjudicaciones suelen traer solo id y nombre; la región está en parties
+                    address = (parties.get(supplier_id) or {}).get('address') or supplier.get('address') or {}
+                    name = _coalesce(supplier.get('name'), "No Name")
+                    self.suppliers[supplier_id] = SupplierRow(
+                        id=supplier_id,
+                        name=name,
+                        ruc=_intern(_coalesce(identifier.get('id'), "No RUC")),
+                        legalName=_coalesce(identifier.get('legalName'), "No Legal Name"),
+                        address=_coalesce((supplier.get('address') or {}).get('streetAddress'), "No Address"),
+                        region=_intern(_coalesce(address.get('region'), "No Region")),
+                        searchName=normalize_name(name),
+                    )
+                edge = AwardedToEdge((award_id, supplier_id))
+                self.awarded_to[edge] = edge
+
+        for contract in release.get('contracts') or []:
+            contract_id = contract.get('id')
+            award_id = contract.get('awardID')
+            if contract_id is None or award_id is None:
+                continue
+            value = contract.get('value') or {}
+            if contract_id not in self.contracts:
+                self.contracts[contract_id] = ContractRow(
+                    id=contract_id,
+                    title=_coalesce(contract.get('title'), "No Title"),
+                    description=_coalesce(contract.get('description'), "No Description"),
+                    value=_coalesce(value.get('amount'), 0),
+                    currency=_intern(_coalesce(value.get('currency'), "N/A")),
+                    awardID=award_id,
+                    status=_intern(_coalesce(contract.get('status'), "No Status")),
+                )
+            edge = HasContractEdge((award_id, contract_id))
+            self.has_contract[edge] = edge
+
+
+def project_rows(records):
+    """Aplana los registros una sola vez en filas por entidad y relación.
+
+    Las filas no forman ciclos, así que el recolector de ciclos se pausa mientras se
+    crean: sus pasadas recorrerían una y otra vez los objetos ya creados.
+    """
+    rows = EntityRows()
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        for record in records:
+            rows.add_record(record)
+    finally:
+        if collecting:
+            gc.enable()
+    return rows
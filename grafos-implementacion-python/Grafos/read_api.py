@@ -0,0 +1,107 @@
+"""API de lectura para el dashboard (FastAPI + driver asíncrono de Neo4j).
+
+Reemplaza las consultas que los componentes React corrían directamente contra Neo4j:
+un solo driver con pool para todos los pedidos, páginas con `skip`/`limit`, respuestas
+JSON en streaming y caché LRU invalidada por la generación que marca cada carga.
+
+Uso: NEO4J_PASSWORD=... uvicorn read_api:app --port 8000
+Variables: NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_DATABASE, READ_API_ORIGINS,
+           READ_API_CACHE_ENTRIES, READ_API_CACHE_MB, READ_API_GENERATION_POLL
+"""
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Query
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+
+from read_service import MAX_LIMIT, ReadService
+from supplier_search import SEARCH_INDEX, search_query
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+if load_dotenv is not None:
+    load_dotenv()
+
+
+def service_from_env():
+    return ReadService(os.getenv('NEO4J_URI', 'bolt://localhost:7687'), os.getenv('NEO4J_USER', 'neo4j'),
+                       os.getenv('NEO4J_PASSWORD', ''), database=os.getenv('NEO4J_DATABASE') or None,
+                       cache_entries=int(os.getenv('READ_API_CACHE_ENTRIES', '256')),
+                       cache_mb=float(os.getenv('READ_API_CACHE_MB', '64')),
+                       generation_poll=float(os.getenv('READ_API_GENERATION_POLL', '5')))
+
+
+def create_app(service=None):
+    service = service or service_from_env()
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await service.start()
+        try:
+            yield
+        finally:
+            await service.close()
+
+    app = FastAPI(title="API de lectura OCDS", lifespan=lifespan)
+    origins = os.getenv('READ_API_ORIGINS', 'http://localhost:5173')
+    app.add_middleware(CORSMiddleware, allow_origins=origins.split(','), allow_methods=['GET'],
+                       expose_headers=['X-Cache', 'X-Load-Generation'])
+
+    async def respond(name, params=None, skip=0, limit=None):
+        page = service.page(name, params, skip, limit)
+        headers = {'X-Cache': 'hit' if page.cached else 'miss', 'X-Load-Generation': page.stamp or ''}
+        if page.cached:
+            return Response(page.body, media_type='application/json', headers=headers)
+        # Un error al consultar sale de aquí como 500, antes de enviar el encabezado del 200
+        await page.open()
+        return StreamingResponse(page.chunks(), media_type='application/json', headers=headers,
+                                 background=BackgroundTask(page.close))
+
+    skip_query = Query(0, ge=0)
+    limit_query = Query(None, ge=1, le=MAX_LIMIT)
+
+    @app.get('/api/generation')
+    async def generation():
+        return {'generation': service.generation, 'cache': service.cache.stats()}
+
+    @app.get('/api/summary')
+    async def summary():
+        return await respond('summary')
+
+    @app.get('/api/buyers/top')
+    async def top_buyers(skip: int = skip_query, limit: int = limit_query):
+        return await respond('top_buyers', skip=skip, limit=limit)
+
+    @app.get('/api/buyers/suppliers')
+    async def buyer_suppliers(name: str, skip: int = skip_query, limit: int = limit_query):
+        return await respond('buyer_suppliers', {'buyerName': name}, skip, limit)
+
+    @app.get('/api/suppliers/top')
+    async def top_suppliers(skip: int = skip_query, limit: int = limit_query):
+        return await respond('top_suppliers', skip=skip, limit=limit)
+
+    @app.get('/api/suppliers/search')
+    async def supplier_search(q: str = '', skip: int = skip_query, limit: int = limit_query):
+        query = search_query(q)
+        if query is None:
+            return await respond('supplier_browse', skip=skip, limit=limit)
+        return await respond('supplier_search', {'index': SEARCH_INDEX, 'query': query}, skip, limit)
+
+    @app.get('/api/suppliers/contracts')
+    async def supplier_contracts(name: str, skip: int = skip_query, limit: int = limit_query):
+        return await respond('supplier_contracts', {'supplierName': name}, skip, limit)
+
+    @app.get('/api/repetitive-contracts')
+    async def repetitive_contracts(min_awards: int = Query(3, ge=0), skip: int = skip_query,
+                                   limit: int = limit_query):
+        return await respond('repetitive_contracts', {'minAwards': min_awards}, skip, limit)
+
+    return app
+
+
+app = create_app()
@@ -0,0 +1,113 @@
+"""Consultas de lectura del dashboard (las que antes corrían desde el navegador).
+
+Todas las paginadas terminan en `SKIP $skip LIMIT $limit` con un orden total, para que
+las páginas no se solapen; los nombres de columna son los que ya usan los componentes.
+"""
+
+# Sello de la última carga (lo escribe Neo4jLoader.bump_generation)
+LOAD_GENERATION_READ_QUERY = """
+    OPTIONAL MATCH (g:LoadGeneration {id: 'current'})
+    RETURN g.stamp AS stamp, g.mode AS mode, toString(g.loadedAt) AS loadedAt
+"""
+
+# Dashboard.jsx completo desde el nodo que arma la carga (DASHBOARD_SUMMARY_QUERY)
+SUMMARY_QUERY = """
+    MATCH (d:DashboardSummary {id: 'current'})
+    RETURN
+        {buyers: d.buyers, suppliers: d.suppliers, procurements: d.procurements, awards: d.awards}
+            AS generalStats,
+        [i IN range(0, size(d.topBuyerNames) - 1) | {name: d.topBuyerNames[i], total: d.topBuyerTotals[i]}]
+            AS topBuyers,
+        [i IN range(0, size(d.topSupplierNames) - 1) |
+            {name: d.topSupplierNames[i], awards: d.topSupplierAwards[i]}] AS topSuppliers,
+        d.frequentSuppliers AS frequentSuppliers,
+        [i IN range(0, size(d.repetitiveBuyers) - 1) |
+            {entidad: d.repetitiveBuyers[i], proveedor: d.repetitiveSuppliers[i],
+             adjudicaciones: d.repetitiveAwards[i]}] AS repetitiveContracts,
+        toString(d.updatedAt) AS updatedAt
+"""
+
+# Páginas más allá del resumen, desde los contadores indexados de la carga
+TOP_BUYERS_QUERY = """
+    MATCH (b:Buyer) WHERE b.procurementCount > 0
+    RETURN b.name AS name, b.procurementCount AS total
+    ORDER BY total DESC, name
+    SKIP $skip LIMIT $limit
+"""
+
+TOP_SUPPLIERS_QUERY = """
+    MATCH (s:Supplier) WHERE s.awardCount > 0
+    RETURN s.name AS name, s.awardCount AS awards
+    ORDER BY awards DESC, name
+    SKIP $skip LIMIT $limit
+"""
+
+# Dashboard.jsx: mismo comprador y proveedor con más de $minAwards adjudicaciones
+REPETITIVE_CONTRACTS_QUERY = """
+    MATCH (b:Buyer)-[r:BUYS_FROM]->(s:Supplier) WHERE r.awards > $minAwards
+    RETURN b.name AS entidad, s.name AS proveedor, r.awards AS adjudicaciones
+    ORDER BY adjudicaciones DESC, entidad, proveedor
+    SKIP $skip LIMIT $limit
+"""
+
+# SupplierSearchPage.jsx: índice full-text (supplier_search.py) ordenado por relevancia, con
+# las estadísticas que la carga precalcula en cada proveedor
+SUPPLIER_STATS_RETURN = """
+    RETURN
+        s.name AS NombreProveedor,
+        s.ruc AS RUC,
+        coalesce(s.awardCount, 0) AS TotalAdjudicaciones,
+        coalesce(s.buyerCount, 0) AS CompradoresUnicos,
+        coalesce(s.quickAwardPercent, 0.0) AS PorcentajeAdjudicacionesRapidas,
+        coalesce(s.avgAwardValue, 0.0) AS ValorPromedioContrato"""
+
+SUPPLIER_SEARCH_QUERY = """
+    CALL db.index.fulltext.queryNodes($index, $query, {skip: $skip, limit: $limit})
+    YIELD node AS s, score
+""" + SUPPLIER_STATS_RETURN + """,
+        score
+"""
+
+# Búsqueda vacía: todos los proveedores, los de más adjudicaciones primero
+SUPPLIER_BROWSE_QUERY = """
+    MATCH (s:Supplier) WHERE s.awardCount IS NOT NULL
+""" + SUPPLIER_STATS_RETURN + """
+    ORDER BY TotalAdjudicaciones DESC, NombreProveedor, RUC
+    SKIP $skip LIMIT $limit
+"""
+
+# RepetitiveContractsChart.jsx: contratos de un proveedor, del más reciente al más antiguo
+SUPPLIER_CONTRACTS_QUERY = """
+    MATCH (b:Buyer)-[:PUBLISHED]->(p:Procurement)-[:HAS_AWARD]->(a:Award)-[:AWARDED_TO]->(s:Supplier)
+    WHERE s.name = $supplierName
+    RETURN
+        b.name AS entidad,
+        p.ocid AS ocid,
+        COALESCE(p.description, 'Sin descripción') AS description,
+        toFloat(a.value) AS amount,
+        a.currency AS currency,
+        toString(p.publishedDate) AS date
+    ORDER BY p.publishedDate DESC, ocid, a.id
+    SKIP $skip LIMIT $limit
+"""
+
+# BuyerDetailsChart.jsx: proveedores de un comprador
+BUYER_SUPPLIERS_QUERY = """
+    MATCH (b:Buyer)-[r:BUYS_FROM]->(s:Supplier)
+    WHERE b.name = $buyerName
+    RETURN s.name AS proveedor, r.awards AS adjudicaciones, r.totalValue AS montoTotal
+    ORDER BY adjudicaciones DESC, proveedor
+    SKIP $skip LIMIT $limit
+"""
+
+# Nombre del endpoint -> (consulta, límite por defecto); límite None = consulta no paginada
+READ_QUERIES = {
+    'summary': (SUMMARY_QUERY, None),
+    'top_buyers': (TOP_BUYERS_QUERY, 5),
+    'top_suppliers': (TOP_SUPPLIERS_QUERY, 5),
+    'repetitive_contracts': (REPETITIVE_CONTRACTS_QUERY, 10),
+    'supplier_search': (SUPPLIER_SEARCH_QUERY, 20),
+    'supplier_browse': (SUPPLIER_BROWSE_QUERY, 20),
+    'supplier_contracts': (SUPPLIER_CONTRACTS_QUERY, 50),
+    'buyer_suppliers': (BUYER_SUPPLIERS_QUERY, 10),
+}
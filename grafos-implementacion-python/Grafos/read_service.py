@@ -0,0 +1,225 @@
+"""Lecturas del dashboard sobre un único driver asíncrono, con caché LRU de respuestas.
+
+Las respuestas se guardan ya serializadas y se indexan por el sello de la última carga
+(nodo LoadGeneration): mientras el sello no cambie, repetir una página no consulta la
+base. Una tarea de fondo relee el sello cada `generation_poll` segundos y, cuando la
+carga lo renueva, vacía la caché.
+"""
+import asyncio
+import json
+from collections import OrderedDict
+from contextlib import AsyncExitStack
+
+from neo4j import READ_ACCESS, AsyncGraphDatabase
+
+from read_queries import LOAD_GENERATION_READ_QUERY, READ_QUERIES
+
+MAX_LIMIT = 500
+
+
+def _json_default(value):
+    # Fechas de Neo4j (neo4j.time.DateTime, Date, ...) como ISO 8601
+    if hasattr(value, 'iso_format'):
+        return value.iso_format()
+    return str(value)
+
+
+def dumps(value):
+    return json.dumps(value, ensure_ascii=False, default=_json_default).encode('utf-8')
+
+
+class ResponseCache:
+    """LRU de cuerpos JSON por (sello, clave), acotado en entradas y en bytes; se usa solo
+    desde el bucle de eventos, así que no necesita candados"""
+
+    def __init__(self, max_entries=256, max_mb=64):
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.stamp = None
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, stamp, key):
+        body = self._entries.get((stamp, key))
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((stamp, key))
+        self.hits += 1
+        return body
+
+    def put(self, stamp, key, body):
+        # Una respuesta leída con el sello anterior ya no vale
+        if stamp != self.stamp or len(body) > self.max_bytes:
+            return
+        previous = self._entries.pop((stamp, key), None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._entries[(stamp, key)] = body
+        self.size += len(body)
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def reset(self, stamp):
+        """Descarta todo si `stamp` es distinto del vigente; devuelve True si cambió"""
+        if stamp == self.stamp:
+            return False
+        self.stamp = stamp
+        self._entries.clear()
+        self.size = 0
+        return True
+
+    def stats(self):
+        return {'stamp': self.stamp, 'entries': len(self._entries), 'bytes': self.size,
+                'hits': self.hits, 'misses': self.misses}
+
+
+class Page:
+    """Respuesta de un endpoint: el cuerpo cacheado o el flujo desde Neo4j.
+
+    `open` corre la consulta y lee el primer registro antes de que se envíe el 200, así un
+    error de Cypher o de conexión llega al cliente como 5xx y no como un JSON cortado.
+    """
+
+    def __init__(self, service, name, params, skip, limit, key, body=None):
+        self.service = service
+        self.name = name
+        self.params = params
+        self.skip = skip
+        self.limit = limit
+        self.key = key
+        self.stamp = service.cache.stamp
+        self.body = body
+        self._stack = None
+        self._result = None
+        self._first = []
+
+    @property
+    def cached(self):
+        return self.body is not None
+
+    async def open(self):
+        """Abre la sesión, corre la consulta y trae el primer registro; no hace nada si la
+        página está en caché"""
+        if self.body is not None or self._stack is not None:
+            return self
+        query = READ_QUERIES[self.name][0]
+        parameters = dict(self.params, skip=self.skip, limit=self.limit)
+        stack = AsyncExitStack()
+        try:
+            session = await stack.enter_async_context(self.service.session())
+            self._result = await session.run(query, parameters)
+            self._first = await self._result.fetch(1)
+        except BaseException:
+            await stack.aclose()
+            raise
+        self._stack = stack
+        return self
+
+    async def close(self):
+        """Cierra la sesión de `open`; se puede llamar más de una vez"""
+        if self._stack is not None:
+            stack, self._stack = self._stack, None
+            await stack.aclose()
+
+    async def chunks(self):
+        """Fragmentos del JSON `{generation, skip, limit, items, count}`; si se recorre
+        completo se guarda en la caché"""
+        if self.body is not None:
+            yield self.body
+            return
+        await self.open()
+        try:
+            parts = [dumps({'generation': self.stamp, 'skip': self.skip, 'limit': self.limit})[:-1]
+                     + b', "items": [']
+            yield parts[0]
+            count = 0
+            for record in self._first:
+                part = dumps(record.data())
+                count += 1
+                parts.append(part)
+                yield part
+            async for record in self._result:
+                part = (b', ' if count else b'') + dumps(record.data())
+                count += 1
+                parts.append(part)
+                yield part
+        finally:
+            await self.close()
+        parts.append(b'], "count": ' + str(count).encode() + b'}')
+        yield parts[-1]
+        self.service.cache.put(self.stamp, self.key, b''.join(parts))
+
+
+class ReadService:
+    """Un driver con su pool de conexiones para toda la API; `start` y `close` lo abren
+    y cierran junto con la tarea que vigila el sello de carga"""
+
+    def __init__(self, uri, username, password, database=None, max_pool_size=50, fetch_size=500,
+                 cache_entries=256, cache_mb=64, generation_poll=5.0):
+        self.uri = uri
+        self.auth = (username, password)
+        self.database = database
+        self.max_pool_size = max_pool_size
+        self.fetch_size = fetch_size
+        self.generation_poll = generation_poll
+        self.cache = ResponseCache(cache_entries, cache_mb)
+        self.generation = {}
+        self.driver = None
+        self._poller = None
+
+    async def start(self):
+        self.driver = AsyncGraphDatabase.driver(self.uri, auth=self.auth, max_connection_pool_size=self.max_pool_size)
+        await self.driver.verify_connectivity()
+        await self.refresh_generation()
+        self._poller = asyncio.create_task(self._poll_generation())
+
+    async def close(self):
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+        if self.driver is not None:
+            await self.driver.close()
+
+    def session(self):
+        return self.driver.session(database=self.database, default_access_mode=READ_ACCESS,
+                                   fetch_size=self.fetch_size)
+
+    async def refresh_generation(self):
+        """Relee el sello de la última carga y vacía la caché si cambió"""
+        async with self.session() as session:
+            result = await session.run(LOAD_GENERATION_READ_QUERY)
+            record = await result.single()
+        self.generation = record.data() if record is not None else {}
+        if self.cache.reset(self.generation.get('stamp')):
+            print(f"Nueva generación de carga: {self.generation.get('stamp')}")
+        return self.generation
+
+    async def _poll_generation(self):
+        while True:
+            await asyncio.sleep(self.generation_poll)
+            try:
+                await self.refresh_generation()
+            except Exception as e:
+                # Si Neo4j no responde se mantiene la caché y se reintenta en la próxima vuelta
+                print(f"No se pudo leer la generación de carga: {e}")
+
+    def page(self, name, params=None, skip=0, limit=None):
+        """Página de `name` (clave de READ_QUERIES); `limit` se acota a MAX_LIMIT"""
+        if name not in READ_QUERIES:
+            raise KeyError(f"Consulta desconocida: {name}")
+        params = params or {}
+        default_limit = READ_QUERIES[name][1]
+        if default_limit is None:
+            skip, limit = 0, None
+        else:
+            skip = max(0, skip)
+            limit = min(max(1, limit or default_limit), MAX_LIMIT)
+        key = (name, tuple(sorted(params.items())), skip, limit)
+        return Page(self, name, params, skip, limit, key, self.cache.get(self.cache.stamp, key))
@@ -0,0 +1,156 @@
+import json
+import mmap
+import os
+import sqlite3
+import zlib
+from collections import OrderedDict
+
+INDEX_FILE = 'index.sqlite'
+
+
+class RecordArchive:
+    """Archivo local de `compiledRelease` en bloques comprimidos con índice OCID en disco.
+
+    Cada shard es una secuencia de bloques zlib con hasta `block_records` documentos
+    NDJSON. El índice SQLite guarda OCID -> (shard, offset, largo, posición en el bloque)
+    del release más reciente; los bloques se leen con mmap y se cachean descomprimidos.
+    """
+
+    def __init__(self, directory, block_records=256, max_shard_bytes=256 * 1024 * 1024,
+                 compression_level=6, cache_blocks=64):
+        self.directory = directory
+        self.block_records = block_records
+        self.max_shard_bytes = max_shard_bytes
+        self.compression_level = compression_level
+        self.cache_blocks = cache_blocks
+        os.makedirs(directory, exist_ok=True)
+
+        # El extractor escribe desde los hilos de descarga (serializados por su lock)
+        self.index = sqlite3.connect(os.path.join(directory, INDEX_FILE), check_same_thread=False)
+        self.index.execute("""
+            CREATE TABLE IF NOT EXISTS records (
+                ocid TEXT PRIMARY KEY,
+                shard INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                published_date TEXT
+            )
+        """)
+        row = self.index.execute("SELECT MAX(shard) FROM records").fetchone()
+        self.shard = row[0] if row[0] is not None else 0
+
+        self._pending = []
+        self._maps = {}
+        self._block_cache = OrderedDict()
+
+    def shard_path(self, shard):
+        return os.path.join(self.directory, f"archive-{shard:05d}.bin")
+
+    def __len__(self):
+        return self.index.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def __contains__(self, ocid):
+        return self.index.execute("SELECT 1 FROM records WHERE ocid = ?", (ocid,)).fetchone() is not None
+
+    # --- Escritura ---
+
+    def add_records(self, records):
+        """Agrega registros OCDS (con `compiledRelease`); el índice conserva el más reciente por OCID"""
+        for record in records:
+            release = record.get('compiledRelease', {})
+            if release.get('ocid'):
+                self._pending.append(release)
+                if len(self._pending) >= self.block_records:
+                    self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        releases, self._pending = self._pending, []
+        payload = ''.join(json.dumps(release, ensure_ascii=False, separators=(',', ':')) + '\n'
+                          for release in releases).encode('utf-8')
+        block = zlib.compress(payload, self.compression_level)
+
+        path = self.shard_path(self.shard)
+        if os.path.exists(path) and os.path.getsize(path) + len(block) > self.max_shard_bytes:
+            self.shard += 1
+            path = self.shard_path(self.shard)
+        with open(path, 'ab') as file:
+            offset = file.tell()
+            file.write(block)
+
+        rows = [(release['ocid'], self.shard, offset, len(block), position, release.get('publishedDate') or '')
+                for position, release in enumerate(releases)]
+        # Un release más antiguo nunca reemplaza al indexado
+        self.index.executemany("""
+            INSERT INTO records (ocid, shard, offset, length, position, published_date)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(ocid) DO UPDATE SET
+                shard = excluded.shard, offset = excluded.offset, length = excluded.length,
+                position = excluded.position, published_date = excluded.published_date
+            WHERE excluded.published_date >= records.published_date
+        """, rows)
+        self.index.commit()
+
+    def close(self):
+        self.flush()
+        for mapped, file in self._maps.values():
+            mapped.close()
+            file.close()
+        self._maps.clear()
+        self.index.close()
+
+    # --- Lectura ---
+
+    def _map(self, shard, end):
+        entry = self._maps.get(shard)
+        # El shard pudo crecer después de mapearlo
+        if entry is None or len(entry[0]) < end:
+            if entry is not None:
+                entry[0].close()
+                entry[1].close()
+            file = open(self.shard_path(shard), 'rb')
+            entry = (mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ), file)
+            self._maps[shard] = entry
+        return entry[0]
+
+    def _read_block(self, shard, offset, length):
+        key = (shard, offset)
+        lines = self._block_cache.get(key)
+        if lines is not None:
+            self._block_cache.move_to_end(key)
+            return lines
+        mapped = self._map(shard, offset + length)
+        lines = zlib.decompress(mapped[offset:offset + length]).decode('utf-8').splitlines()
+        self._block_cache[key] = lines
+        if len(self._block_cache) > self.cache_blocks:
+            self._block_cache.popitem(last=False)
+        return lines
+
+    def get(self, ocid):
+        """Devuelve el `compiledRelease` de un OCID o None"""
+        self.flush()
+        row = self.index.execute(
+            "SELECT shard, offset, length, position FROM records WHERE ocid = ?", (ocid,)).fetchone()
+        if row is None:
+            return None
+        shard, offset, length, position = row
+        return json.loads(self._read_block(shard, offset, length)[position])
+
+    def get_many(self, ocids):
+        """Devuelve {ocid: compiledRelease} descomprimiendo cada bloque una sola vez"""
+        self.flush()
+        ocids = list(dict.fromkeys(ocids))
+        locations = []
+        for start in range(0, len(ocids), 500):
+            chunk = ocids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            locations.extend(self.index.execute(
+                f"SELECT ocid, shard, offset, length, position FROM records WHERE ocid IN ({placeholders})",
+                chunk).fetchall())
+
+        found = {}
+        for ocid, shard, offset, length, position in sorted(locations, key=lambda row: (row[1], row[2])):
+            found[ocid] = json.loads(self._read_block(shard, offset, length)[position])
+        return found
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+
+from ndjson_store import is_shard_dir, iter_shard_lines, iter_shard_records, shard_paths
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+class _JSONStreamReader:
+    """Lee valores JSON de un archivo por bloques, sin cargar el archivo completo"""
+
+    def __init__(self, file, chunk_size):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Se descarta lo ya consumido para que el buffer no crezca con el archivo
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Siguiente carácter no blanco (sin consumirlo)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise json.JSONDecodeError("Fin de archivo inesperado", self.buffer, self.pos)
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Se esperaba '{char}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Valor incompleto: leer más y reintentar
+                if not self._fill():
+                    raise
+                continue
+            # Un número al final del buffer podría seguir en el siguiente bloque
+            if end == len(self.buffer) and not self.eof and isinstance(value, (int, float)):
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_records(path, chunk_size=1 << 20):
+    """Recorre `records[*]` de un archivo `{"records": [...]}` de forma incremental"""
+    with open(path, 'r', encoding='utf-8') as file:
+        reader = _JSONStreamReader(file, chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            key = reader.value()
+            reader.expect(':')
+            if key == 'records':
+                reader.expect('[')
+                if reader.peek() == ']':
+                    reader.pos += 1
+                else:
+                    while True:
+                        yield reader.value()
+                        if reader.peek() == ',':
+                            reader.pos += 1
+                            continue
+                        reader.expect(']')
+                        break
+            else:
+                reader.value()
+            if reader.peek() == ',':
+                reader.pos += 1
+                continue
+            reader.expect('}')
+            return
+
+
+class RecordSource:
+    """Fuente re-iterable de registros OCDS: archivo JSON legado o directorio de shards NDJSON"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def is_sharded(self):
+        return is_shard_dir(self.path)
+
+    def __iter__(self):
+        if self.is_sharded():
+            return iter_shard_records(self.path)
+        return iter_json_records(self.path)
+
+    def raw_batches(self, size):
+        """Lotes de líneas NDJSON sin decodificar (solo para directorios de shards), para
+        que el parseo corra en otro proceso"""
+        lines = (line for path in shard_paths(self.path) for line in iter_shard_lines(path))
+        return chunked(lines, size)
+
+
+def content_hash(release):
+    """Huella estable del contenido de un `compiledRelease` (independiente del orden de claves)"""
+    canonical = json.dumps(release, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def _pick(source, keys):
+    return {key: source[key] for key in keys if source.get(key) is not None}
+
+
+def project_record(record):
+    """Conserva solo los campos de `compiledRelease` que usa `Neo4jLoader.load_data`"""
+    release = record.get('compiledRelease', {})
+    projected = _pick(release, ('ocid', 'id', 'date', 'publishedDate', 'buyer'))
+
+    parties = release.get('parties') or []
+    if parties:
+        projected['parties'] = [
+            {
+                **_pick(party, ('id', 'roles', 'address', 'contactPoint')),
+                'additionalIdentifiers': (party.get('additionalIdentifiers') or [])[:1],
+            }
+            for party in parties
+        ]
+
+    tender = release.get('tender')
+    if tender is not None:
+        projected['tender'] = _pick(tender, ('id', 'title', 'description', 'procurementMethod',
+                                             'procurementMethodDetails', 'mainProcurementCategory'))
+        projected['tender']['items'] = [
+            _pick(item, ('id', 'description', 'status', 'quantity')) for item in tender.get('items') or []
+        ]
+
+    if release.get('awards'):
+        projected['awards'] = [
+            {
+                **_pick(award, ('id', 'title', 'date', 'value')),
+                'suppliers': [_pick(supplier, ('id', 'name', 'identifier', 'address'))
+                              for supplier in award.get('suppliers') or []],
+            }
+            for award in release['awards']
+        ]
+
+    if release.get('contracts'):
+        projected['contracts'] = [
+            _pick(contract, ('id', 'awardID', 'title', 'description', 'value', 'status'))
+            for contract in release['contracts']
+        ]
+
+    return {'compiledRelease': projected, 'contentHash': content_hash(release)}
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
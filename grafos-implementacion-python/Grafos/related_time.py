@@ -0,0 +1,42 @@
+"""Relaciones RELATED_TIME entre contrataciones de un mismo comprador por barrido de ventana.
+
+En vez de comparar cada par de contrataciones del comprador (cuadrático), se ordenan
+sus fechas una vez y para cada contratación se busca con bisect el final de su ventana:
+O(n log n + relaciones) por comprador.
+"""
+from bisect import bisect_left
+from collections import defaultdict
+
+DAY_MS = 86400 * 1000
+
+
+def related_time_edges(procurements, window_days=30):
+    """Genera dicts {source, target, days, sameCategory} para cada par de contrataciones
+    del mismo comprador publicadas con `window_days` días completos o menos de diferencia.
+
+    `procurements` son tuplas (buyer_id, ocid, epoch_millis, category). Como la consulta
+    original (p1.publishedDate <= p2.publishedDate), las fechas iguales se relacionan en
+    ambos sentidos.
+    """
+    per_buyer = defaultdict(list)
+    for buyer_id, ocid, epoch_millis, category in procurements:
+        if epoch_millis is not None:
+            per_buyer[buyer_id].append((epoch_millis, ocid, category))
+
+    # duration.inDays(...).days <= window  <=>  diferencia < (window + 1) días
+    window_ms = (window_days + 1) * DAY_MS
+    for entries in per_buyer.values():
+        entries.sort()
+        times = [entry[0] for entry in entries]
+        for i, (start, source, source_category) in enumerate(entries):
+            end = bisect_left(times, start + window_ms, lo=i + 1)
+            for j in range(i + 1, end):
+                moment, target, target_category = entries[j]
+                if source == target:
+                    continue
+                same_category = (None if source_category is None or target_category is None
+                                 else source_category == target_category)
+                days = (moment - start) // DAY_MS
+                yield {'source': source, 'target': target, 'days': days, 'sameCategory': same_category}
+                if moment == start:
+                    yield {'source': target, 'target': source, 'days': 0, 'sameCategory': same_category}
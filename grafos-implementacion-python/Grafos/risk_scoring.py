@@ -0,0 +1,150 @@
+"""Cálculo en Python de las propiedades de riesgo que `load_data` asigna con Cypher.
+
+Trabaja sobre las filas de projection.EntityRows y devuelve, por etiqueta, un dict
+{clave: {propiedad: valor}} con las mismas reglas que las consultas de análisis.
+"""
+from collections import defaultdict
+
+from outliers import score_unusual_amounts
+from splitting import buyer_flags, splitting_alerts
+
+
+DAY_MICROS = 86400 * 10 ** 6
+
+
+def days_between(start_micros, end_micros):
+    """Equivalente a duration.inDays(start, end).days: días completos, truncados hacia cero"""
+    return int((end_micros - start_micros) / DAY_MICROS)
+
+
+def high_frequency_suppliers(rows, min_awards=3):
+    awards = rows.awards
+    per_supplier = defaultdict(list)
+    for edge in rows.awarded_to.values():
+        if edge['awardId'] in awards and edge['supplierId'] in rows.suppliers:
+            per_supplier[edge['supplierId']].append(awards[edge['awardId']])
+
+    result = {}
+    for supplier_id, supplier_awards in per_supplier.items():
+        awards_count = len(supplier_awards)
+        if awards_count < min_awards:
+            continue
+        total_value = sum(award['value'] for award in supplier_awards)
+        result[supplier_id] = {
+            'highFrequencySupplier': True,
+            'totalAwards': awards_count,
+            'totalValue': total_value,
+            'averageAwardValue': total_value / awards_count,
+            'currencies': sorted({award['currency'] for award in supplier_awards}),
+            'riskLevel': 'ALTO' if awards_count >= 10 else 'MEDIO' if awards_count >= 5 else 'BAJO',
+        }
+    return result
+
+
+def _award_pairs(rows):
+    """(procurement, award) por cada relación HAS_AWARD con ambos extremos presentes"""
+    for edge in rows.has_award.values():
+        procurement = rows.procurements.get(edge['ocid'])
+        award = rows.awards.get(edge['awardId'])
+        if procurement is not None and award is not None:
+            yield procurement, award
+
+
+def quick_awards(rows, max_days=3):
+    """Contrataciones adjudicadas a `max_days` días o menos; con varias adjudicaciones se
+    toma la más rápida"""
+    fastest = {}
+    for procurement, award in _award_pairs(rows):
+        # Fechas ya convertidas a microsegundos desde epoch en projection
+        if procurement.publishedMicros is None or award.dateMicros is None:
+            continue
+        days = days_between(procurement.publishedMicros, award.dateMicros)
+        if days <= max_days and (procurement['ocid'] not in fastest or days < fastest[procurement['ocid']]):
+            fastest[procurement['ocid']] = days
+
+    return {
+        ocid: {
+            'quickAward': True,
+            'awardDays': days,
+            'awardSpeed': 'MISMO_DIA' if days == 0 else 'UN_DIA' if days == 1 else 'DOS_A_TRES_DIAS',
+            'riskLevel': 'ALTO' if days == 0 else 'MEDIO' if days == 1 else 'BAJO',
+        }
+        for ocid, days in fastest.items()
+    }
+
+
+def unusual_amounts(rows, method='stddev', by_currency=False):
+    """Adjudicaciones por encima de promedio + 2 desviaciones (o mediana + 2 MAD) dentro de
+    su categoría; ver outliers.score_unusual_amounts"""
+    pairs = list(_award_pairs(rows))
+    return score_unusual_amounts(
+        [award['id'] for _, award in pairs],
+        [award['value'] for _, award in pairs],
+        [procurement['mainCategory'] for procurement, _ in pairs],
+        currencies=[award['currency'] for _, award in pairs] if by_currency else None,
+        method=method,
+    )
+
+
+def splitting_series(rows, by_supplier=False):
+    """Tuplas (buyer_id, category, supplier_id, epoch_millis, value, award_id) para
+    splitting.splitting_alerts"""
+    award_rows = defaultdict(list)
+    for procurement, award in _award_pairs(rows):
+        award_rows[procurement['ocid']].append(award)
+    suppliers = defaultdict(list)
+    if by_supplier:
+        for edge in rows.awarded_to.values():
+            if edge['supplierId'] in rows.suppliers:
+                suppliers[edge['awardId']].append(edge['supplierId'])
+
+    for edge in rows.published.values():
+        procurement = rows.procurements.get(edge['ocid'])
+        epoch_millis = procurement.published_millis if procurement else None
+        if epoch_millis is None or edge['buyerId'] not in rows.buyers:
+            continue
+        for award in award_rows.get(edge['ocid'], []):
+            for supplier_id in suppliers.get(award['id']) or [None]:
+                yield (edge['buyerId'], procurement['mainCategory'], supplier_id, epoch_millis,
+                       award['value'], award['id'])
+
+
+def potential_splitting(rows, **options):
+    """Alertas de fraccionamiento por ventana móvil y marca potentialSplitting del comprador"""
+    alerts = splitting_alerts(splitting_series(rows, options.get('by_supplier', False)), **options)
+    return alerts, buyer_flags(alerts)
+
+
+def daily_activity(rows):
+    per_procurement = defaultdict(list)
+    for procurement, award in _award_pairs(rows):
+        if procurement.publishedMicros is not None:
+            per_procurement[procurement['ocid']].append(award['value'])
+
+    return {
+        ocid: {
+            'avgDailyValue': sum(values) / len(values),
+            'dailyAwards': len(values),
+            'unusualDailyActivity': 'ALTO' if len(values) >= 10 else 'MEDIO' if len(values) >= 5 else 'NORMAL',
+        }
+        for ocid, values in per_procurement.items()
+    }
+
+
+def score_all(rows, outlier_method='stddev', outlier_by_currency=False, splitting_options=None):
+    """Propiedades de riesgo por etiqueta: {'Supplier': {id: props}, 'Procurement': ..., ...};
+    'SplittingAlert' trae las alertas completas por id"""
+    procurement_props = defaultdict(dict)
+    for ocid, props in daily_activity(rows).items():
+        procurement_props[ocid].update(props)
+    for ocid, props in quick_awards(rows).items():
+        procurement_props[ocid].update(props)
+
+    alerts, buyers = potential_splitting(rows, **(splitting_options or {}))
+    return {
+        'Supplier': high_frequency_suppliers(rows),
+        'Procurement': dict(procurement_props),
+        'Award': unusual_amounts(rows, method=outlier_method, by_currency=outlier_by_currency),
+        'Buyer': buyers,
+        'SplittingAlert': {alert['id']: alert for alert in alerts},
+    }
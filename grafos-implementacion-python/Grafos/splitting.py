@@ -0,0 +1,97 @@
+"""Detección de fraccionamiento con ventanas móviles por comprador y categoría.
+
+Cada serie (comprador × categoría, opcionalmente × proveedor) se ordena por fecha y se
+recorre con dos punteros manteniendo conteo y suma de la ventana: cada adjudicación
+entra y sale una sola vez, O(n log n) por el orden y lineal en el barrido.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone
+
+DAY_MS = 86400 * 1000
+
+
+def _iso(epoch_millis):
+    return datetime.fromtimestamp(epoch_millis / 1000, tz=timezone.utc).isoformat()
+
+
+def splitting_alerts(awards, window_days=7, min_count=3, max_award_value=None, min_total_value=None,
+                     by_supplier=False):
+    """Devuelve una alerta por cada ventana de `window_days` días con `min_count` o más
+    adjudicaciones de la misma serie.
+
+    `awards` son tuplas (buyer_id, category, supplier_id, epoch_millis, value, award_id).
+    Con `max_award_value` solo cuentan adjudicaciones por debajo de ese monto (p. ej. el
+    tope de un procedimiento simplificado) y con `min_total_value` la ventana debe sumar al
+    menos ese monto. Las alertas de una serie no se solapan: cada una es la ventana más
+    larga que empieza después de la anterior.
+    """
+    series = defaultdict(list)
+    for buyer_id, category, supplier_id, epoch_millis, value, award_id in awards:
+        if epoch_millis is None or value is None:
+            continue
+        if max_award_value is not None and value >= max_award_value:
+            continue
+        key = (buyer_id, category, supplier_id if by_supplier else None)
+        series[key].append((epoch_millis, value, award_id))
+
+    window_ms = window_days * DAY_MS
+    alerts = []
+    for (buyer_id, category, supplier_id), entries in series.items():
+        entries.sort()
+        last_end = -1
+
+        def emit(start, end, total):
+            nonlocal last_end
+            count = end - start + 1
+            if start <= last_end or count < min_count:
+                return
+            if min_total_value is not None and total < min_total_value:
+                return
+            last_end = end
+            window = entries[start:end + 1]
+            alerts.append({
+                'id': f"{buyer_id}|{category}|{supplier_id or ''}|{window[0][0]}",
+                'buyerId': buyer_id,
+                'category': category,
+                'supplierId': supplier_id,
+                'windowStart': _iso(window[0][0]),
+                'windowEnd': _iso(window[-1][0]),
+                'windowDays': window_days,
+                'awardCount': count,
+                'totalValue': total,
+                'maxAwardValue': max(entry[1] for entry in window),
+                'awardIds': [entry[2] for entry in window],
+                'riskLevel': 'ALTO' if count >= 5 else 'MEDIO',
+            })
+
+        start, total = 0, 0.0
+        for end, (moment, value, _) in enumerate(entries):
+            # Antes de soltar el primer elemento, [start, end - 1] es la ventana más larga que lo contiene
+            while moment - entries[start][0] >= window_ms:
+                emit(start, end - 1, total)
+                total -= entries[start][1]
+                start += 1
+            total += value
+        if entries:
+            emit(start, len(entries) - 1, total)
+    return alerts
+
+
+def buyer_flags(alerts):
+    """Propiedades potentialSplitting del comprador a partir de su alerta con más adjudicaciones"""
+    strongest = {}
+    for alert in alerts:
+        current = strongest.get(alert['buyerId'])
+        if current is None or alert['awardCount'] > current['awardCount']:
+            strongest[alert['buyerId']] = alert
+    return {
+        buyer_id: {
+            'potentialSplitting': True,
+            'splittingCategory': alert['category'],
+            'splittingDate': alert['windowStart'][:10],
+            'splittingValue': alert['totalValue'],
+            'splittingCount': alert['awardCount'],
+            'riskLevel': alert['riskLevel'],
+        }
+        for buyer_id, alert in strongest.items()
+    }
@@ -0,0 +1,159 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import zlib
+from collections import deque
+
+from record_stream import chunked, project_record
+
+
+def stage_record(record):
+    """Fila (ocid, publishedDate, contentHash, payload comprimido) de un registro, o None
+    si no tiene OCID"""
+    ocid = record.get('compiledRelease', {}).get('ocid')
+    if not ocid:
+        return None
+    projected = project_record(record)
+    payload = zlib.compress(json.dumps(projected, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    return ocid, record['compiledRelease'].get('publishedDate') or '', projected['contentHash'], payload
+
+
+def stage_lines(lines):
+    """Decodifica y prepara un lote de líneas NDJSON; corre en los procesos del pool.
+    Devuelve (filas, líneas leídas)"""
+    rows = [stage_record(json.loads(line)) for line in lines]
+    return [row for row in rows if row is not None], len(lines)
+
+
+def decode_payload(payload):
+    return json.loads(zlib.decompress(payload))
+
+
+class StagingStore:
+    """Área de staging en SQLite que deduplica por OCID en una sola pasada.
+
+    Cada registro se proyecta, se comprime y se inserta con un upsert que solo
+    reemplaza la fila si el `publishedDate` es más reciente. SQLite mantiene en
+    memoria a lo sumo `cache_mb` de páginas y el resto queda en disco, así que la
+    memoria no depende del número de releases.
+
+    Con `pool` (un ProcessPoolExecutor) y una fuente de shards NDJSON, el parseo y la
+    proyección de cada lote corren en los procesos del pool y aquí solo se hacen los
+    upserts; a lo sumo `max_pending` lotes esperan a la vez.
+    """
+
+    def __init__(self, source, directory=None, cache_mb=64, batch_size=1000, pool=None, max_pending=8):
+        self._owns_directory = directory is None
+        self.directory = tempfile.mkdtemp(prefix='staging-') if directory is None else directory
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, 'staging.sqlite')
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+        self.db = sqlite3.connect(self.path)
+        self.db.execute(f"PRAGMA cache_size = -{cache_mb * 1024}")
+        self.db.execute("PRAGMA journal_mode = OFF")
+        self.db.execute("PRAGMA synchronous = OFF")
+        self.db.execute("""
+            CREATE TABLE releases (
+                ocid TEXT PRIMARY KEY,
+                published_date TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                versions INTEGER NOT NULL DEFAULT 1,
+                payload BLOB NOT NULL
+            )
+        """)
+
+        self.total = 0
+        self.duplicates_removed = 0
+        self.duplicated_ocids = 0
+        self.contracts_without_award = 0
+        raw_batches = getattr(source, 'raw_batches', None)
+        if pool is not None and raw_batches is not None and source.is_sharded():
+            self._load_parallel(raw_batches(batch_size), pool, max_pending)
+        else:
+            self._load(source, batch_size)
+        self._count()
+
+    def _upsert(self, rows):
+        # Ante fechas iguales se mantiene el primero, como el sort estable original
+        self.db.executemany("""
+            INSERT INTO releases (ocid, published_date, content_hash, payload) VALUES (?, ?, ?, ?)
+            ON CONFLICT(ocid) DO UPDATE SET
+                versions = versions + 1,
+                published_date = CASE WHEN excluded.published_date > published_date
+                                      THEN excluded.published_date ELSE published_date END,
+                content_hash = CASE WHEN excluded.published_date > published_date
+                                    THEN excluded.content_hash ELSE content_hash END,
+                payload = CASE WHEN excluded.published_date > published_date
+                               THEN excluded.payload ELSE payload END
+        """, rows)
+        self.db.commit()
+
+    def _load(self, source, batch_size):
+        for batch in chunked(source, batch_size):
+            self.total += len(batch)
+            self._upsert([row for row in map(stage_record, batch) if row is not None])
+
+    def _load_parallel(self, batches, pool, max_pending):
+        # Los lotes se insertan en el orden de lectura para conservar el desempate por posición
+        pending = deque()
+        for lines in batches:
+            pending.append(pool.submit(stage_lines, lines))
+            if len(pending) >= max_pending:
+                self._finish(pending.popleft())
+        while pending:
+            self._finish(pending.popleft())
+
+    def _finish(self, future):
+        rows, total = future.result()
+        self.total += total
+        self._upsert(rows)
+
+    def _count(self):
+        unique, versions, duplicated = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(versions), 0), COALESCE(SUM(versions > 1), 0) FROM releases").fetchone()
+        self._unique = unique
+        self.duplicates_removed = versions - unique
+        self.duplicated_ocids = duplicated
+
+    def stats(self):
+        return {
+            'total': self.total,
+            'unique': self._unique,
+            'duplicates_removed': self.duplicates_removed,
+            'duplicated_ocids': self.duplicated_ocids,
+            'contracts_without_award': self.contracts_without_award,
+        }
+
+    def __len__(self):
+        return self._unique
+
+    def payloads(self, batch_size):
+        """Lotes de (ocid, contentHash, payload comprimido) en el orden de __iter__, para
+        decodificarlos fuera de este proceso con decode_payload"""
+        cursor = self.db.execute("SELECT ocid, content_hash, payload FROM releases ORDER BY rowid")
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return
+            yield batch
+
+    def __iter__(self):
+        """Registros deduplicados en el orden de primera aparición de cada OCID"""
+        contracts_without_award = 0
+        for (payload,) in self.db.execute("SELECT payload FROM releases ORDER BY rowid"):
+            record = decode_payload(payload)
+            contracts_without_award += sum(
+                1 for contract in record['compiledRelease'].get('contracts', []) if not contract.get('awardID'))
+            yield record
+        self.contracts_without_award = contracts_without_award
+
+    def close(self):
+        self.db.close()
+        if self._owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        elif os.path.exists(self.path):
+            os.remove(self.path)
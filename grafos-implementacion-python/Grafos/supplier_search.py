@@ -0,0 +1,40 @@
+"""Búsqueda de proveedores sobre el índice full-text que crea la carga.
+
+La carga guarda en cada Supplier su nombre normalizado (searchName) y el índice
+SEARCH_INDEX cubre searchName y ruc; la API arma con `search_query` una consulta de
+Lucene por prefijo y con tolerancia a errores de tipeo, ordenada por relevancia.
+"""
+import re
+import unicodedata
+
+SEARCH_INDEX = 'supplier_search'
+SEARCH_INDEX_QUERY = (
+    f"CREATE FULLTEXT INDEX {SEARCH_INDEX} IF NOT EXISTS FOR (s:Supplier) ON EACH [s.searchName, s.ruc] "
+    "OPTIONS {indexConfig: {`fulltext.analyzer`: 'standard-no-stop-words'}}"
+)
+# Palabras más cortas solo se buscan por prefijo (la distancia de edición las vuelve ambiguas)
+FUZZY_MIN_LENGTH = 4
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_name(name):
+    """Minúsculas sin tildes ni puntuación: 'Constructora Ñandú S.A.C.' -> 'constructora nandu sac'"""
+    if not name:
+        return ''
+    text = unicodedata.normalize('NFKD', name)
+    text = ''.join(char for char in text if not unicodedata.combining(char)).lower()
+    # Las siglas con puntos (S.A.C., E.I.R.L.) quedan como una sola palabra
+    return ' '.join(_NON_ALNUM.sub(' ', text.replace('.', '')).split())
+
+
+def search_query(term):
+    """Consulta de Lucene para `term`: todas las palabras deben aparecer, completas, como
+    prefijo o a un error de distancia; None si no queda ninguna palabra"""
+    clauses = []
+    for word in normalize_name(term).split():
+        options = [f"{word}^3", f"{word}*"]
+        if len(word) >= FUZZY_MIN_LENGTH and not word.isdigit():
+            options.append(f"{word}~1")
+        clauses.append(f"({' OR '.join(options)})")
+    return ' AND '.join(clauses) or None
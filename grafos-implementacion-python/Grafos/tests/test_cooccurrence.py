@@ -0,0 +1,82 @@
+"""Pruebas del conteo de contrataciones compartidas con Aᵀ·A (cooccurrence.supplier_pairs)."""
+import os
+import random
+import sys
+import unittest
+from collections import Counter
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cooccurrence import supplier_pairs
+
+
+def brute_force(pairs):
+    """Contrataciones compartidas por cada par (a, b) con a < b, comparando conjuntos"""
+    suppliers_by_ocid = {}
+    for ocid, supplier_id in pairs:
+        suppliers_by_ocid.setdefault(ocid, set()).add(supplier_id)
+    counts = Counter()
+    for suppliers in suppliers_by_ocid.values():
+        counts.update(combinations(sorted(suppliers), 2))
+    return counts
+
+
+def incidence():
+    rng = random.Random(3)
+    pairs = [(f"ocds-{rng.randrange(40)}", f"S{rng.randrange(12):02d}") for _ in range(200)]
+    # Varias adjudicaciones del mismo proveedor en una contratación cuentan una vez
+    pairs += [('ocds-0', 'S00'), ('ocds-0', 'S00'), ('ocds-0', 'S01')]
+    regions = {f"S{index:02d}": ('LIMA' if index % 3 == 0 else 'CUSCO' if index % 3 == 1 else None)
+               for index in range(12)}
+    return pairs, regions
+
+
+class SupplierPairsTest(unittest.TestCase):
+
+    def test_counts_match_brute_force(self):
+        pairs, regions = incidence()
+        expected = brute_force(pairs)
+        for min_shared in (1, 2, 4):
+            with self.subTest(min_shared=min_shared):
+                edges = list(supplier_pairs(pairs, regions=regions, min_shared=min_shared, same_region=False))
+                found = {(edge['source'], edge['target']): edge['sharedProcurements'] for edge in edges}
+                self.assertEqual(found, {pair: count for pair, count in expected.items() if count >= min_shared})
+                self.assertEqual(len(found), len(edges))
+
+    def test_no_self_pairs_or_reversed_duplicates(self):
+        pairs, regions = incidence()
+        edges = list(supplier_pairs(pairs, regions=regions, min_shared=1, same_region=False))
+        self.assertTrue(edges)
+        self.assertTrue(all(edge['source'] < edge['target'] for edge in edges))
+        unordered = Counter(frozenset((edge['source'], edge['target'])) for edge in edges)
+        self.assertTrue(all(count == 1 for count in unordered.values()))
+
+    def test_same_region_filter(self):
+        pairs, regions = incidence()
+        expected = brute_force(pairs)
+        edges = list(supplier_pairs(pairs, regions=regions, min_shared=2, same_region=True))
+        found = {(edge['source'], edge['target']) for edge in edges}
+        self.assertEqual(found, {(a, b) for (a, b), count in expected.items()
+                                 if count >= 2 and regions[a] is not None and regions[a] == regions[b]})
+        self.assertTrue(all(edge['region'] == regions[edge['source']] for edge in edges))
+
+        mixed = list(supplier_pairs(pairs, regions=regions, min_shared=2, same_region=False))
+        for edge in mixed:
+            source_region, target_region = regions[edge['source']], regions[edge['target']]
+            self.assertEqual(edge['region'],
+                             source_region if source_region is not None and source_region == target_region else None)
+
+    def test_risk_levels_and_empty_input(self):
+        pairs = [(f"ocds-{index}", supplier) for index in range(5) for supplier in ('A', 'B')]
+        pairs += [(f"ocds-{index}", 'C') for index in range(3)]
+        edges = {(edge['source'], edge['target']): edge for edge in
+                 supplier_pairs(pairs, regions={'A': 'LIMA', 'B': 'LIMA', 'C': 'LIMA'}, min_shared=1)}
+        self.assertEqual(edges[('A', 'B')]['riskLevel'], 'ALTO')
+        self.assertEqual(edges[('A', 'C')]['riskLevel'], 'MEDIO')
+        self.assertEqual(list(supplier_pairs([(f"ocds-{index}", 'A') for index in range(2)], min_shared=1)), [])
+        self.assertEqual(list(supplier_pairs([])), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Pruebas de la resolución de entidades de proveedores (entity_resolution.resolve_suppliers)."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entity_resolution import normalize_ruc, resolve_suppliers
+
+
+def entity_of(links):
+    return {link['supplierId']: link['entityId'] for link in links}
+
+
+class ResolveSuppliersTest(unittest.TestCase):
+
+    def test_ruc_comes_from_the_field_or_the_id(self):
+        self.assertEqual(normalize_ruc(None, 'PE-RUC-20123456789'), '20123456789')
+        self.assertEqual(normalize_ruc('RUC 20123456789', 'X-1'), '20123456789')
+        self.assertIsNone(normalize_ruc('', 'X-1'))
+        self.assertIsNone(normalize_ruc('201234567890', None))
+
+    def test_variants_without_ruc_join_the_ruc_node(self):
+        # El id trae el RUC, así que solo las variantes sin RUC se comparan por nombre
+        suppliers = [
+            ('PE-RUC-20123456789', 'CONSTRUCTORA VASQUEZ S.A.C.', None),
+            ('X-1', 'CONSTRUCTORA VASQUES SAC', None),
+            ('X-2', 'Constructora Vásquez', ''),
+            ('X-3', 'KONSTRUCTORA BASQUES', None),
+            ('X-4', 'INVERSIONES PEREZ SRL', None),
+        ]
+        links, entities = resolve_suppliers(suppliers)
+        self.assertEqual(entity_of(links), {
+            'PE-RUC-20123456789': 'RUC-20123456789', 'X-1': 'RUC-20123456789', 'X-2': 'RUC-20123456789',
+            'X-3': 'RUC-20123456789', 'X-4': 'X-4',
+        })
+        reasons = {link['supplierId']: link['reason'] for link in links}
+        self.assertEqual(reasons['X-1'], 'name')
+        self.assertEqual(reasons['X-4'], 'self')
+        entity = next(entity for entity in entities if entity['id'] == 'RUC-20123456789')
+        self.assertEqual((entity['ruc'], entity['memberCount']), ('20123456789', 4))
+
+    def test_typo_is_scored_with_tfidf_trigrams(self):
+        # La errata cambia la clave fonética: solo el coseno de trigramas supera el umbral
+        suppliers = [
+            ('PE-RUC-20555555555', 'DISTRIBUIDORA SANTA ROSA DEL NORTE SAC', None),
+            ('X-1', 'DISTRIBUIDORA SANTA ROSA DEL NORTF', None),
+            ('X-2', 'INVERSIONES PEREZ SRL', None),
+        ]
+        links, _ = resolve_suppliers(suppliers)
+        self.assertEqual(entity_of(links), {
+            'PE-RUC-20555555555': 'RUC-20555555555', 'X-1': 'RUC-20555555555', 'X-2': 'X-2',
+        })
+        score = next(link['score'] for link in links if link['supplierId'] == 'X-1')
+        self.assertTrue(0.85 <= score < 0.9)
+        # Con un umbral más alto la errata queda como entidad propia
+        self.assertEqual(entity_of(resolve_suppliers(suppliers, threshold=0.9)[0])['X-1'], 'X-1')
+
+    def test_same_ruc_under_different_ids_always_joins(self):
+        suppliers = [('PE-RUC-20123456789', 'ACME SAC', None), ('X-1', 'OTRO NOMBRE', '20123456789')]
+        links, entities = resolve_suppliers(suppliers)
+        self.assertEqual(set(entity_of(links).values()), {'RUC-20123456789'})
+        self.assertEqual({link['reason'] for link in links}, {'ruc'})
+        self.assertEqual(len(entities), 1)
+
+    def test_only_pairs_sharing_a_block_are_compared(self):
+        # Con umbral 0 todo par evaluado se une: los nombres sin bloque común no se evalúan
+        suppliers = [('X-1', 'ALFA SERVICIOS', None), ('X-2', 'OMEGA SERVICIOS', None), ('X-3', 'ZETA', None)]
+        self.assertEqual(entity_of(resolve_suppliers(suppliers, threshold=0.0)[0]),
+                         {'X-1': 'X-1', 'X-2': 'X-1', 'X-3': 'X-3'})
+        # Una palabra que aparece en más de max_block nombres no forma bloque
+        self.assertEqual(entity_of(resolve_suppliers(suppliers, threshold=0.0, max_block=1)[0]),
+                         {'X-1': 'X-1', 'X-2': 'X-2', 'X-3': 'X-3'})
+
+    def test_two_rucs_are_never_merged_by_name(self):
+        suppliers = [
+            ('PE-RUC-20111111111', 'CONSTRUCTORA VASQUEZ SAC', None),
+            ('PE-RUC-20222222222', 'CONSTRUCTORA VASQUEZ SAC', None),
+            # Sin RUC y parecido a ambos: encadena los dos RUC en una sola componente
+            ('X-1', 'CONSTRUCTORA VASQUES', None),
+        ]
+        links, entities = resolve_suppliers(suppliers)
+        self.assertEqual(entity_of(links), {
+            'PE-RUC-20111111111': 'RUC-20111111111', 'PE-RUC-20222222222': 'RUC-20222222222', 'X-1': 'X-1',
+        })
+        self.assertEqual(sorted(entity['memberCount'] for entity in entities), [1, 1, 1])
+        self.assertEqual({link['reason'] for link in links}, {'self'})
+
+    def test_empty_input(self):
+        self.assertEqual(resolve_suppliers([]), ([], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
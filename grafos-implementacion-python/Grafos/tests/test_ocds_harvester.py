@@ -0,0 +1,163 @@
+"""Pruebas de OCDSHarvester contra un servidor local que imita `recordsAfter` con páginas
+fijas: ventanas, cadenas `links.next`, reintentos ante 429/500 y reanudación con Checkpoint.
+
+Uso: python -m unittest discover -s tests   (desde Grafos/)
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ndjson_store import Checkpoint
+from ocds_harvester import OCDSHarvester
+
+PAGES_PER_WINDOW = 3
+
+
+def canned_records(start_date, page, size):
+    return [{'ocid': f"ocds-{start_date}-{page}-{index}", 'compiledRelease': {}} for index in range(size)]
+
+
+class StandInServer:
+    """recordsAfter en un hilo: PAGES_PER_WINDOW páginas de `size` registros por ventana.
+    `failures[(startDate, página)]` son los códigos de error que se responden antes de la
+    página real; `requests` guarda (startDate, página, código) de cada pedido."""
+
+    def __init__(self):
+        self.failures = {}
+        self.requests = []
+        self._lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                start_date, page, size = query['startDate'], int(query.get('page', 1)), int(query['size'])
+                with stand_in._lock:
+                    pending = stand_in.failures.get((start_date, page)) or []
+                    status = pending.pop(0) if pending else 200
+                    stand_in.requests.append((start_date, page, status))
+                if status != 200:
+                    self.send_response(status)
+                    self.send_header('Retry-After', '0')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                data = {'records': canned_records(start_date, page, size), 'links': {}}
+                if page < PAGES_PER_WINDOW:
+                    data['links']['next'] = stand_in.url + '?' + urlencode(dict(query, page=page + 1))
+                body = json.dumps(data).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/v1/recordsAfter"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def pages_requested(self, start_date):
+        return [page for start, page, status in self.requests if start == start_date and status == 200]
+
+
+class Sink:
+    """on_page que junta los registros; con `fail_on` levanta un error en esa página
+    (startDate, número de página) la primera vez, como una interrupción a mitad de ventana"""
+
+    def __init__(self, fail_on=None):
+        self.records = []
+        self.fail_on = fail_on
+
+    def __call__(self, window, records, next_link):
+        page = int(records[0]['ocid'].split('-')[-2]) if records else None
+        if self.fail_on == (window[0], page):
+            self.fail_on = None
+            raise RuntimeError("interrupción simulada")
+        self.records.extend(records)
+
+
+class OCDSHarvesterTest(unittest.TestCase):
+    START, END = '2024-01-01', '2024-01-15'
+    WINDOWS = [('2024-01-01', '2024-01-08'), ('2024-01-08', '2024-01-15')]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def harvester(self, server):
+        harvester = OCDSHarvester(base_url=server.url, page_size=2, max_workers=2, retries=3,
+                                  backoff_factor=0, timeout=5)
+        self.addCleanup(harvester.close)
+        return harvester
+
+    def expected_ocids(self):
+        return {record['ocid'] for start_date, _ in self.WINDOWS for page in range(1, PAGES_PER_WINDOW + 1)
+                for record in canned_records(start_date, page, 2)}
+
+    def test_follows_next_links_in_every_window(self):
+        with StandInServer() as server:
+            sink = Sink()
+            stats = self.harvester(server).harvest(self.START, self.END, sink, window_days=7)
+
+        self.assertEqual({record['ocid'] for record in sink.records}, self.expected_ocids())
+        self.assertEqual(len(sink.records), len(self.expected_ocids()))
+        self.assertEqual((stats.pages, stats.records, stats.failed_windows), (6, 12, 0))
+        for start_date, _ in self.WINDOWS:
+            self.assertEqual(sorted(server.pages_requested(start_date)), [1, 2, 3])
+
+    def test_retries_rate_limit_and_server_errors(self):
+        with StandInServer() as server:
+            server.failures[('2024-01-01', 2)] = [429, 500]
+            sink = Sink()
+            stats = self.harvester(server).harvest(self.START, self.END, sink, window_days=7)
+
+        self.assertEqual(stats.failed_windows, 0)
+        self.assertEqual({record['ocid'] for record in sink.records}, self.expected_ocids())
+        statuses = [status for start, page, status in server.requests if (start, page) == ('2024-01-01', 2)]
+        self.assertEqual(statuses, [429, 500, 200])
+
+    def test_resumes_from_checkpoint_after_interruption(self):
+        path = os.path.join(self.directory.name, 'checkpoint.json')
+        with StandInServer() as server:
+            sink = Sink(fail_on=('2024-01-08', 2))
+            stats = self.harvester(server).harvest(self.START, self.END, sink, window_days=7,
+                                                   checkpoint=Checkpoint(path))
+            self.assertEqual(stats.failed_windows, 1)
+
+            # El cursor de la ventana interrumpida apunta a la página que no llegó a escribirse
+            checkpoint = Checkpoint(path)
+            self.assertTrue(checkpoint.is_done(self.WINDOWS[0]))
+            self.assertFalse(checkpoint.is_done(self.WINDOWS[1]))
+            self.assertEqual(parse_qs(urlparse(checkpoint.next_url(self.WINDOWS[1])).query)['page'], ['2'])
+
+            server.requests.clear()
+            stats = self.harvester(server).harvest(self.START, self.END, sink, window_days=7,
+                                                   checkpoint=checkpoint)
+
+        self.assertEqual(stats.failed_windows, 0)
+        self.assertEqual(server.pages_requested('2024-01-01'), [])
+        self.assertEqual(server.pages_requested('2024-01-08'), [2, 3])
+        self.assertEqual(sorted(record['ocid'] for record in sink.records), sorted(self.expected_ocids()))
+        self.assertTrue(all(Checkpoint(path).is_done(window) for window in self.WINDOWS))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""Pruebas de montos inusuales: el cálculo completo (score_unusual_amounts) y el
+incremental de modo delta a partir de los agregados (score_tail) deben coincidir."""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from outliers import score_tail, score_unusual_amounts, stats_from_sums
+
+
+def sample_groups():
+    rng = random.Random(7)
+    groups = {
+        'goods': [round(rng.uniform(1000, 5000), 2) for _ in range(40)] + [25000.0, 60000.0],
+        'services': [round(rng.gauss(20000, 3000), 2) for _ in range(30)] + [41000.0],
+        # Todos iguales: varianza y MAD cero, nada es inusual
+        'works': [7500.0] * 6,
+        'consultancy': [3000.0],
+    }
+    award_ids, values, categories = [], [], []
+    for category, amounts in groups.items():
+        for index, value in enumerate(amounts):
+            award_ids.append(f"{category}-{index}")
+            values.append(value)
+            categories.append(category)
+    return groups, award_ids, values, categories
+
+
+class ScoreUnusualAmountsTest(unittest.TestCase):
+
+    def test_tail_scoring_matches_full_scoring(self):
+        groups, award_ids, values, categories = sample_groups()
+        full = score_unusual_amounts(award_ids, values, categories, method='stddev')
+
+        incremental = {}
+        for category, amounts in groups.items():
+            ids = [f"{category}-{index}" for index in range(len(amounts))]
+            count, total = len(amounts), sum(amounts)
+            total_squares = sum(value * value for value in amounts)
+            mean, stdev = stats_from_sums(count, total, total_squares)
+            # Como en modo delta: solo se leen los montos sobre el umbral
+            candidates = [(award_id, value) for award_id, value in zip(ids, amounts) if value > mean + 2 * stdev]
+            incremental.update(score_tail([award_id for award_id, _ in candidates],
+                                          [value for _, value in candidates], count, total, total_squares))
+
+        self.assertEqual(set(full), set(incremental))
+        self.assertTrue(any(award_id.startswith('goods') for award_id in full))
+        self.assertFalse(any(award_id.startswith(('works', 'consultancy')) for award_id in full))
+        for award_id, props in full.items():
+            other = incremental[award_id]
+            self.assertEqual(props['riskLevel'], other['riskLevel'])
+            for field in ('categoryAvg', 'categoryStdDev', 'deviation', 'percentileRank'):
+                self.assertAlmostEqual(props[field], other[field], places=6)
+
+    def test_tail_scoring_ignores_values_below_threshold(self):
+        groups, _, _, _ = sample_groups()
+        amounts = groups['goods']
+        ids = [f"goods-{index}" for index in range(len(amounts))]
+        sums = (len(amounts), sum(amounts), sum(value * value for value in amounts))
+        self.assertEqual(score_tail(ids, amounts, *sums).keys(), score_tail(ids[-2:], amounts[-2:], *sums).keys())
+
+    def test_zero_variance_group_flags_nothing(self):
+        for method in ('stddev', 'mad'):
+            with self.subTest(method=method):
+                self.assertEqual(score_unusual_amounts(['a', 'b', 'c'], [10.0, 10.0, 10.0], ['x'] * 3,
+                                                       method=method), {})
+        self.assertEqual(score_tail(['a', 'b', 'c'], [10.0, 10.0, 10.0], 3, 30.0, 300.0), {})
+
+    def test_mad_per_group_matches_all_groups_at_once(self):
+        # Modo delta con 'mad' puntúa cada grupo afectado por separado
+        groups, award_ids, values, categories = sample_groups()
+        full = score_unusual_amounts(award_ids, values, categories, method='mad')
+        separate = {}
+        for category, amounts in groups.items():
+            ids = [f"{category}-{index}" for index in range(len(amounts))]
+            separate.update(score_unusual_amounts(ids, amounts, [category] * len(amounts), method='mad'))
+        self.assertEqual(full, separate)
+        self.assertIn('goods-41', full)
+        self.assertEqual(full['goods-41']['riskLevel'], 'ALTO')
+
+    def test_mad_is_robust_to_extreme_amounts(self):
+        values = [100.0, 101.0, 99.0, 100.5, 99.5, 100.0, 5000.0, 6000.0]
+        ids = [f"a{index}" for index in range(len(values))]
+        self.assertEqual(set(score_unusual_amounts(ids, values, ['x'] * len(values), method='mad')), {'a6', 'a7'})
+        # Los dos extremos inflan la desviación: con 'stddev' ninguno supera promedio + 2σ
+        self.assertEqual(score_unusual_amounts(ids, values, ['x'] * len(values), method='stddev'), {})
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            score_unusual_amounts(['a'], [1.0], ['x'], method='iqr')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Pruebas de projection.project_rows sobre el ejemplo del repositorio (json_ejemplo.json)."""
+import json
+import os
+import sys
+import unittest
+
+GRAFOS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GRAFOS_DIR)
+
+from projection import project_rows
+from record_stream import iter_json_records
+
+EXAMPLE = os.path.join(GRAFOS_DIR, 'json_ejemplo.json')
+
+
+def _coalesce(value, default):
+    return default if value is None else value
+
+
+def baseline_nodes(records):
+    """Nodos que creaba la carga original con `ON CREATE SET` (el primero de cada id gana),
+    calculados directamente sobre el JSON"""
+    buyers, procurements, awards, suppliers = {}, {}, {}, {}
+    for record in records:
+        release = record['compiledRelease']
+        party = (release.get('parties') or [{}])[0]
+        contact = party.get('contactPoint') or {}
+        buyer = release.get('buyer') or {}
+        if buyer.get('id') is not None and buyer['id'] not in buyers:
+            buyers[buyer['id']] = {
+                'name': buyer.get('name'),
+                'ruc': _coalesce((party.get('additionalIdentifiers') or [{}])[0].get('id'), "N/A"),
+                'address': _coalesce((party.get('address') or {}).get('streetAddress'), "No Address"),
+                'contactPoint': _coalesce(contact.get('name'), "No Contact"),
+                'email': _coalesce(contact.get('email'), "No Email"),
+                'telephone': _coalesce(contact.get('telephone'), "No Phone"),
+            }
+        tender = release.get('tender')
+        if tender is not None and release.get('ocid') is not None and release['ocid'] not in procurements:
+            procurements[release['ocid']] = {
+                'id': tender.get('id'),
+                'title': _coalesce(tender.get('title'), "No Title"),
+                'description': _coalesce(tender.get('description'), "No Description"),
+                'publishedDate': release.get('publishedDate'),
+                'procurementMethod': _coalesce(tender.get('procurementMethod'), "N/A"),
+                'procurementMethodDetails': _coalesce(tender.get('procurementMethodDetails'), "N/A"),
+                'mainCategory': _coalesce(tender.get('mainProcurementCategory'), "No Category"),
+            }
+        for award in release.get('awards') or []:
+            if award.get('id') is not None and award['id'] not in awards:
+                awards[award['id']] = {'title': _coalesce(award.get('title'), "No Title"),
+                                       'value': _coalesce((award.get('value') or {}).get('amount'), 0)}
+            for supplier in award.get('suppliers') or []:
+                if supplier.get('id') is not None and supplier['id'] not in suppliers:
+                    suppliers[supplier['id']] = {'name': _coalesce(supplier.get('name'), "No Name")}
+    return {'buyers': buyers, 'procurements': procurements, 'awards': awards, 'suppliers': suppliers}
+
+
+class ProjectExampleTest(unittest.TestCase):
+
+    def test_example_projects_like_the_original_load(self):
+        with open(EXAMPLE, 'r', encoding='utf-8') as file:
+            expected = baseline_nodes(json.load(file)['records'])
+        rows = project_rows(iter_json_records(EXAMPLE))
+
+        for kind, nodes in expected.items():
+            projected = getattr(rows, kind)
+            with self.subTest(kind=kind):
+                self.assertEqual(set(projected), set(nodes))
+                for key, fields in nodes.items():
+                    row = projected[key].as_dict()
+                    self.assertEqual({field: row[field] for field in fields}, fields)
+
+    def test_example_relationships(self):
+        rows = project_rows(iter_json_records(EXAMPLE))
+        self.assertEqual({(edge['buyerId'], edge['ocid']) for edge in rows.published.values()},
+                         {('PE-CONSUCODE-424', 'ocds-dgv273-seacev3-2024-424-65'),
+                          ('PE-CONSUCODE-1660', 'ocds-dgv273-seacev3-2024-1660-2')})
+        self.assertEqual({(edge['ocid'], edge['itemId']) for edge in rows.includes.values()},
+                         {('ocds-dgv273-seacev3-2024-424-65', '20861510'),
+                          ('ocds-dgv273-seacev3-2024-1660-2', '20832349')})
+        self.assertEqual(rows.counts()['awards'], 0)
+        self.assertEqual(rows.counts()['suppliers'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Pruebas del archivo de releases con índice OCID en disco (record_archive.RecordArchive)."""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from record_archive import RecordArchive
+
+
+def record(ocid, published, title):
+    return {'compiledRelease': {'ocid': ocid, 'publishedDate': published, 'tender': {'title': title}}}
+
+
+OLD, NEW = '2024-03-01T10:00:00-05:00', '2024-06-01T10:00:00-05:00'
+
+
+class RecordArchiveTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def reopened(self, records):
+        # Bloques de tres registros y shards chicos: las lecturas cruzan bloques y shards
+        archive = RecordArchive(self.directory, block_records=3, max_shard_bytes=100)
+        archive.add_records(records)
+        archive.close()
+        archive = RecordArchive(self.directory)
+        self.addCleanup(archive.close)
+        return archive
+
+    def test_get_and_get_many_after_reopening(self):
+        records = [record(f"ocds-{index}", OLD, f"T{index}") for index in range(10)]
+        archive = self.reopened(records)
+        self.assertEqual(len(archive), 10)
+        self.assertGreater(len([name for name in os.listdir(self.directory) if name.endswith('.bin')]), 1)
+
+        self.assertEqual(archive.get('ocds-4'), records[4]['compiledRelease'])
+        self.assertIsNone(archive.get('ocds-inexistente'))
+        self.assertNotIn('ocds-inexistente', archive)
+
+        wanted = ['ocds-9', 'ocds-0', 'ocds-5', 'ocds-0', 'ocds-inexistente']
+        found = archive.get_many(wanted)
+        self.assertEqual(set(found), {'ocds-0', 'ocds-5', 'ocds-9'})
+        for ocid in found:
+            self.assertEqual(found[ocid], records[int(ocid.split('-')[1])]['compiledRelease'])
+
+    def test_index_keeps_newest_release(self):
+        archive = self.reopened([record('ocds-1', OLD, 'viejo'), record('ocds-1', NEW, 'nuevo'),
+                                 record('ocds-2', NEW, 'nuevo'), record('ocds-2', OLD, 'viejo')])
+        self.assertEqual(len(archive), 2)
+        self.assertEqual(archive.get('ocds-1')['tender']['title'], 'nuevo')
+        self.assertEqual(archive.get('ocds-2')['tender']['title'], 'nuevo')
+
+    def test_records_added_after_reopening_append_to_the_archive(self):
+        self.reopened([record('ocds-1', OLD, 'T1')]).close()
+        archive = RecordArchive(self.directory)
+        self.addCleanup(archive.close)
+        archive.add_records([record('ocds-2', OLD, 'T2'), {'compiledRelease': {}}])
+        # get_many escribe lo pendiente antes de consultar el índice
+        self.assertEqual(set(archive.get_many(['ocds-1', 'ocds-2'])), {'ocds-1', 'ocds-2'})
+        self.assertEqual(len(archive), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
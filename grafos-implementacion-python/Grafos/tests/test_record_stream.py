@@ -0,0 +1,67 @@
+"""Pruebas del lector incremental de `{"records": [...]}` (record_stream.iter_json_records)."""
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from record_stream import _JSONStreamReader, iter_json_records
+
+RECORDS = [
+    {'compiledRelease': {'ocid': 'ocds-1', 'tender': {'title': 'Obra "Puente {norte}" [etapa 1]'}}},
+    {'compiledRelease': {'ocid': 'ocds-2', 'tender': {'title': 'Ruta \\ tramo }{ ]['}, 'value': 1234567.25}},
+    {'compiledRelease': {'ocid': 'ocds-3', 'parties': [{'id': 'PE-1', 'name': 'Compañía "ñandú"'}]}},
+]
+
+
+class IterJSONRecordsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, text):
+        path = os.path.join(self.directory.name, 'records.json')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        return path
+
+    def test_records_split_across_read_boundaries(self):
+        text = json.dumps({'version': '1.1', 'records': RECORDS, 'links': {'next': None}}, ensure_ascii=False)
+        path = self.write(text)
+        # Con bloques de 1 a 7 caracteres cada registro, clave y número queda partido en algún borde
+        for chunk_size in range(1, 8):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(iter_json_records(path, chunk_size=chunk_size)), RECORDS)
+
+    def test_escaped_quotes_and_braces_inside_strings(self):
+        path = self.write(json.dumps({'records': RECORDS}, indent=2))
+        records = list(iter_json_records(path, chunk_size=5))
+        self.assertEqual(records[0]['compiledRelease']['tender']['title'], 'Obra "Puente {norte}" [etapa 1]')
+        self.assertEqual(records[1]['compiledRelease']['tender']['title'], 'Ruta \\ tramo }{ ][')
+        self.assertEqual(records[2]['compiledRelease']['parties'][0]['name'], 'Compañía "ñandú"')
+
+    def test_empty_records_array(self):
+        for text in ('{"records": []}', '{ "records" : [ ] , "links": {} }', '{}'):
+            with self.subTest(text=text):
+                self.assertEqual(list(iter_json_records(self.write(text), chunk_size=3)), [])
+
+    def test_truncated_input_raises(self):
+        text = json.dumps({'records': RECORDS})
+        for cut in (len(text) - 1, len(text) - 2, text.index('ocds-2'), text.index('"records"') + 12):
+            with self.subTest(cut=cut):
+                path = self.write(text[:cut])
+                with self.assertRaises(json.JSONDecodeError):
+                    list(iter_json_records(path, chunk_size=4))
+
+    def test_number_at_buffer_end_is_not_cut(self):
+        reader = _JSONStreamReader(io.StringIO('[1234567, 8]'), chunk_size=4)
+        reader.expect('[')
+        self.assertEqual(reader.value(), 1234567)
+
+
+if __name__ == '__main__':
+    unittest.main()
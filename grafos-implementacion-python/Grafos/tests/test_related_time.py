@@ -0,0 +1,64 @@
+"""Pruebas del barrido de ventana de RELATED_TIME (related_time.related_time_edges)."""
+import os
+import sys
+import unittest
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from related_time import DAY_MS, related_time_edges
+
+T0 = 1_700_000_000_000
+
+
+def pairs(edges):
+    return Counter((edge['source'], edge['target']) for edge in edges)
+
+
+class RelatedTimeEdgesTest(unittest.TestCase):
+
+    def test_window_boundary(self):
+        procurements = [
+            ('B1', 'p0', T0, 'goods'),
+            ('B1', 'p30', T0 + 30 * DAY_MS, 'goods'),
+            # 30 días completos y un poco más: duration.inDays(...).days sigue siendo 30
+            ('B1', 'p30+', T0 + 31 * DAY_MS - 1, 'services'),
+            ('B1', 'p31', T0 + 31 * DAY_MS, 'goods'),
+        ]
+        edges = list(related_time_edges(procurements, window_days=30))
+        found = pairs(edges)
+
+        self.assertIn(('p0', 'p30'), found)
+        self.assertIn(('p0', 'p30+'), found)
+        self.assertNotIn(('p0', 'p31'), found)
+        self.assertNotIn(('p31', 'p0'), found)
+        self.assertEqual(set(found), {('p0', 'p30'), ('p0', 'p30+'), ('p30', 'p30+'), ('p30', 'p31'),
+                                      ('p30+', 'p31')})
+        self.assertTrue(all(count == 1 for count in found.values()))
+
+        by_pair = {(edge['source'], edge['target']): edge for edge in edges}
+        self.assertEqual(by_pair[('p0', 'p30')]['days'], 30)
+        self.assertEqual(by_pair[('p0', 'p30+')]['days'], 30)
+        self.assertTrue(by_pair[('p0', 'p30')]['sameCategory'])
+        self.assertFalse(by_pair[('p0', 'p30+')]['sameCategory'])
+
+    def test_same_moment_relates_both_ways_once(self):
+        procurements = [('B1', 'a', T0, None), ('B1', 'b', T0, 'goods'), ('B1', 'c', T0 + DAY_MS, 'goods')]
+        found = pairs(related_time_edges(procurements, window_days=0))
+        self.assertEqual(found, Counter({('a', 'b'): 1, ('b', 'a'): 1}))
+
+    def test_matches_pairwise_comparison(self):
+        procurements = [(f"B{index % 3}", f"p{index}", T0 + (index * 7919 % 97) * DAY_MS // 2, None)
+                        for index in range(60)]
+        expected = Counter()
+        for buyer, source, start, _ in procurements:
+            for other_buyer, target, moment, _ in procurements:
+                # p1.publishedDate <= p2.publishedDate y diferencia en días completos <= 30
+                if buyer == other_buyer and source != target and start <= moment \
+                        and (moment - start) // DAY_MS <= 30:
+                    expected[(source, target)] += 1
+        self.assertEqual(pairs(related_time_edges(procurements, window_days=30)), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
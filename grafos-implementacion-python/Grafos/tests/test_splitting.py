@@ -0,0 +1,63 @@
+"""Pruebas de las ventanas móviles de fraccionamiento (splitting.splitting_alerts)."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from splitting import DAY_MS, buyer_flags, splitting_alerts
+
+T0 = 1_700_000_000_000
+
+
+def awards_at(days, values=None, buyer='B1', category='goods', supplier='S1'):
+    values = values or [1000.0] * len(days)
+    return [(buyer, category, supplier, T0 + int(day * DAY_MS), value, f"a{index}")
+            for index, (day, value) in enumerate(zip(days, values))]
+
+
+class SplittingAlertsTest(unittest.TestCase):
+
+    def test_min_count(self):
+        awards = awards_at([0, 1, 2])
+        self.assertEqual(len(splitting_alerts(awards, window_days=7, min_count=3)), 1)
+        self.assertEqual(splitting_alerts(awards, window_days=7, min_count=4), [])
+        alert = splitting_alerts(awards, window_days=7, min_count=3)[0]
+        self.assertEqual((alert['awardCount'], alert['totalValue'], alert['awardIds']), (3, 3000.0, ['a0', 'a1', 'a2']))
+
+    def test_awards_exactly_window_days_apart_are_not_in_the_same_window(self):
+        self.assertEqual(splitting_alerts(awards_at([0, 3, 7]), window_days=7, min_count=3), [])
+        just_inside = splitting_alerts(awards_at([0, 3, 7 - 1 / 86400]), window_days=7, min_count=3)
+        self.assertEqual([alert['awardCount'] for alert in just_inside], [3])
+        # Con 0 y 7 en ventanas distintas quedan dos alertas sin solaparse
+        alerts = splitting_alerts(awards_at([0, 1, 2, 7, 8, 9]), window_days=7, min_count=3)
+        self.assertEqual([alert['awardIds'] for alert in alerts], [['a0', 'a1', 'a2'], ['a3', 'a4', 'a5']])
+
+    def test_max_award_value(self):
+        awards = awards_at([0, 1, 2, 3], [1000.0, 50000.0, 2000.0, 3000.0])
+        self.assertEqual(len(splitting_alerts(awards, min_count=4)), 1)
+        # El monto en el tope ya no cuenta: quedan tres adjudicaciones
+        self.assertEqual(splitting_alerts(awards, min_count=4, max_award_value=50000.0), [])
+        alerts = splitting_alerts(awards, min_count=3, max_award_value=50000.0)
+        self.assertEqual([alert['awardIds'] for alert in alerts], [['a0', 'a2', 'a3']])
+        self.assertEqual(alerts[0]['maxAwardValue'], 3000.0)
+
+    def test_min_total_value(self):
+        awards = awards_at([0, 1, 2], [1000.0, 2000.0, 3000.0])
+        self.assertEqual(len(splitting_alerts(awards, min_total_value=6000.0)), 1)
+        self.assertEqual(splitting_alerts(awards, min_total_value=6000.01), [])
+
+    def test_series_are_separate(self):
+        awards = (awards_at([0, 1], supplier='S1') + awards_at([2], supplier='S2')
+                  + awards_at([0, 1, 2], category='services', buyer='B2'))
+        alerts = splitting_alerts(awards, min_count=3)
+        self.assertEqual([(alert['buyerId'], alert['category']) for alert in alerts],
+                         [('B1', 'goods'), ('B2', 'services')])
+        self.assertEqual(len(splitting_alerts(awards, min_count=3, by_supplier=True)), 1)
+        flags = buyer_flags(alerts)
+        self.assertEqual(set(flags), {'B1', 'B2'})
+        self.assertEqual(flags['B1']['splittingCount'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
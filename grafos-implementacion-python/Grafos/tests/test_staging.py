@@ -0,0 +1,85 @@
+"""Pruebas de la deduplicación por OCID en el staging SQLite (staging.StagingStore)."""
+import os
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ndjson_store import ShardWriter
+from record_stream import RecordSource
+from staging import StagingStore, decode_payload
+
+
+def record(ocid, published, title):
+    release = {'ocid': ocid, 'tender': {'id': title, 'title': title}}
+    if published is not None:
+        release['publishedDate'] = published
+    return {'compiledRelease': release}
+
+
+OLD, NEW = '2024-03-01T10:00:00-05:00', '2024-06-01T10:00:00-05:00'
+
+
+class StagingStoreTest(unittest.TestCase):
+
+    def staged(self, records, batch_size=1000):
+        store = StagingStore(records, batch_size=batch_size)
+        self.addCleanup(store.close)
+        return store
+
+    def titles(self, store):
+        return {entry['compiledRelease']['ocid']: entry['compiledRelease']['tender']['title'] for entry in store}
+
+    def test_newest_published_date_wins_in_either_order(self):
+        for records in ([record('ocds-1', OLD, 'vieja'), record('ocds-1', NEW, 'nueva')],
+                        [record('ocds-1', NEW, 'nueva'), record('ocds-1', OLD, 'vieja')]):
+            with self.subTest(first=records[0]['compiledRelease']['tender']['title']):
+                # batch_size=1 pone cada versión en un upsert distinto
+                for batch_size in (1, 1000):
+                    store = self.staged(records, batch_size)
+                    self.assertEqual(self.titles(store), {'ocds-1': 'nueva'})
+                    self.assertEqual(store.stats(), {'total': 2, 'unique': 1, 'duplicates_removed': 1,
+                                                     'duplicated_ocids': 1, 'contracts_without_award': 0})
+
+    def test_ties_keep_the_first_record(self):
+        store = self.staged([record('ocds-1', NEW, 'primera'), record('ocds-1', NEW, 'segunda'),
+                             record('ocds-2', None, 'sin fecha 1'), record('ocds-2', None, 'sin fecha 2')])
+        self.assertEqual(self.titles(store), {'ocds-1': 'primera', 'ocds-2': 'sin fecha 1'})
+        self.assertEqual((store.duplicates_removed, store.duplicated_ocids), (2, 2))
+
+    def test_missing_date_loses_to_any_date(self):
+        for records in ([record('ocds-1', None, 'sin fecha'), record('ocds-1', OLD, 'con fecha')],
+                        [record('ocds-1', OLD, 'con fecha'), record('ocds-1', None, 'sin fecha')]):
+            with self.subTest(first=records[0]['compiledRelease']['tender']['title']):
+                self.assertEqual(self.titles(self.staged(records)), {'ocds-1': 'con fecha'})
+
+    def test_stats_and_first_appearance_order(self):
+        records = [record('ocds-1', OLD, 'a'), record('ocds-2', OLD, 'b'), record('ocds-1', NEW, 'a2'),
+                   record('ocds-3', OLD, 'c'), record('ocds-2', OLD, 'b2'), record('ocds-1', OLD, 'a3'),
+                   {'compiledRelease': {'tender': {'title': 'sin ocid'}}}]
+        store = self.staged(records)
+        self.assertEqual(store.stats(), {'total': 7, 'unique': 3, 'duplicates_removed': 3,
+                                         'duplicated_ocids': 2, 'contracts_without_award': 0})
+        self.assertEqual(list(self.titles(store).items()), [('ocds-1', 'a2'), ('ocds-2', 'b'), ('ocds-3', 'c')])
+        entries = [entry for batch in store.payloads(2) for entry in batch]
+        self.assertEqual([ocid for ocid, _, _ in entries], ['ocds-1', 'ocds-2', 'ocds-3'])
+        self.assertEqual(decode_payload(entries[0][2])['compiledRelease']['tender']['title'], 'a2')
+
+    def test_pool_path_matches_serial_path(self):
+        records = [record(f"ocds-{index % 7}", NEW if index % 3 == 0 else OLD, f"v{index}") for index in range(40)]
+        with tempfile.TemporaryDirectory() as directory:
+            writer = ShardWriter(directory, max_records_per_shard=9)
+            writer.write_records(records)
+            writer.close()
+            with ThreadPoolExecutor(2) as pool:
+                parallel = StagingStore(RecordSource(directory), batch_size=5, pool=pool, max_pending=2)
+            self.addCleanup(parallel.close)
+        serial = self.staged(records)
+        self.assertEqual(list(self.titles(parallel).items()), list(self.titles(serial).items()))
+        self.assertEqual(parallel.stats(), serial.stats())
+
+
+if __name__ == '__main__':
+    unittest.main()
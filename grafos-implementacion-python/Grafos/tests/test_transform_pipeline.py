@@ -0,0 +1,56 @@
+"""Pruebas del pipeline de transformación sin pool ni base (transform_pipeline.TransformPipeline)."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from staging import stage_record
+from transform_pipeline import TransformPipeline
+from verification import IntegrityCheck
+
+
+def release(ocid, awards=(), contracts=()):
+    return {'compiledRelease': {
+        'ocid': ocid,
+        'buyer': {'id': 'B1', 'name': 'ENTIDAD'},
+        'tender': {'id': ocid, 'title': 'T'},
+        'awards': [{'id': award_id} for award_id in awards],
+        'contracts': [{'id': contract_id, 'awardID': award_id} for contract_id, award_id in contracts],
+    }}
+
+
+# El contrato C1 del primer lote apunta al Award A2, que llega en el segundo
+CHUNKS = [
+    [release('ocds-1', awards=['A1'], contracts=[('C1', 'A2')])],
+    [release('ocds-3', awards=['A2'], contracts=[('C3', 'A2'), ('C-huerfano', 'A-inexistente')])],
+]
+
+
+class TransformPipelineTest(unittest.TestCase):
+
+    def test_contract_waits_for_award_from_a_later_chunk(self):
+        written = []
+        integrity = IntegrityCheck()
+        pipeline = TransformPipeline(written.append, writers=1)
+        batches = [[stage_record(record)[3] for record in records] for records in CHUNKS]
+        self.assertEqual(pipeline.run(batches, lambda chunk: integrity.merge(chunk.integrity)), 2)
+
+        contracts = [[row['id'] for row in chunk.batches['contracts']] for chunk in written]
+        edges = [[(row['awardId'], row['contractId']) for row in chunk.batches['has_contract']] for chunk in written]
+        # C1 se escribe con el lote que trae A2; C-huerfano no se carga
+        self.assertEqual(contracts, [[], ['C3', 'C1']])
+        self.assertEqual(edges, [[], [('A2', 'C3'), ('A2', 'C1')]])
+        self.assertEqual(integrity.report()['contracts_without_award'], 1)
+
+    def test_writer_error_stops_the_pipeline(self):
+        def write(chunk):
+            raise RuntimeError("base caída")
+
+        batches = [[stage_record(record)[3] for record in records] for records in CHUNKS]
+        with self.assertRaises(RuntimeError):
+            TransformPipeline(write, writers=2, queue_size=1).run(batches)
+
+
+if __name__ == '__main__':
+    unittest.main()
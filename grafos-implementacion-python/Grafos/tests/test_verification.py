@@ -0,0 +1,92 @@
+"""Pruebas de los chequeos de integridad por lote (verification.IntegrityCheck)."""
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import verification
+from projection import project_rows
+from verification import IntegrityCheck
+
+
+def release(ocid, awards=(), contracts=(), tender=True):
+    compiled = {
+        'ocid': ocid,
+        'publishedDate': '2024-05-01T10:00:00-05:00',
+        'buyer': {'id': 'B1', 'name': 'ENTIDAD'},
+        'awards': [{'id': award_id, 'suppliers': [{'id': 'S1', 'name': 'PROVEEDOR'}]} for award_id in awards],
+        'contracts': [{'id': contract_id, 'awardID': award_id} for contract_id, award_id in contracts],
+    }
+    if tender:
+        compiled['tender'] = {'id': ocid, 'title': 'T', 'procurementMethod': 'open', 'mainProcurementCategory': 'goods'}
+    return {'compiledRelease': compiled}
+
+
+# El contrato C1 del primer lote apunta al Award A2 de un registro que llega en el segundo
+CHUNKS = [
+    [release('ocds-1', awards=['A1'], contracts=[('C1', 'A2')]),
+     # Registro sin tender: su Award queda sin Procurement
+     release('ocds-2', awards=['A-huerfano'], tender=False)],
+    [release('ocds-3', awards=['A2'], contracts=[('C3', 'A2'), ('C-huerfano', 'A-inexistente')])],
+]
+
+
+class IntegrityCheckTest(unittest.TestCase):
+
+    def check_report(self, report):
+        self.assertEqual(report['procurements_checked'], 2)
+        self.assertEqual(report['awards_without_procurement'], 1)
+        self.assertEqual(report['awards_without_procurement_sample'], ['A-huerfano'])
+        self.assertEqual(report['contracts_without_award'], 1)
+        self.assertEqual(report['contracts_without_award_sample'], ['C-huerfano'])
+        self.assertEqual(report['items_without_procurement'], 0)
+
+    def test_award_in_later_chunk_observed_in_order(self):
+        integrity = IntegrityCheck()
+        for records in CHUNKS:
+            integrity.observe(project_rows(records))
+        self.check_report(integrity.report())
+
+    def test_award_in_later_chunk_merged_from_pool_checks(self):
+        # Como el pipeline: cada lote se chequea por separado y se suma en orden de lectura
+        integrity = IntegrityCheck()
+        for records in CHUNKS:
+            chunk = IntegrityCheck(integrity.now)
+            chunk.observe(project_rows(records))
+            integrity.merge(chunk)
+        self.check_report(integrity.report())
+
+    def test_contract_is_orphan_if_its_award_came_earlier_in_another_chunk_only(self):
+        integrity = IntegrityCheck()
+        integrity.observe(project_rows([release('ocds-1', awards=['A1'])]))
+        integrity.observe(project_rows([release('ocds-2', contracts=[('C2', 'A1')])]))
+        self.assertEqual(integrity.report()['contracts_without_award'], 1)
+
+    def test_pending_contracts_are_capped(self):
+        contracts = [(f"C{index}", f"A{index}") for index in range(5)]
+        with mock.patch.object(verification, 'PENDING_CONTRACTS_LIMIT', 2):
+            integrity = IntegrityCheck()
+            integrity.observe(project_rows([release('ocds-1', contracts=contracts)]))
+            integrity.observe(project_rows([release('ocds-2', awards=[f"A{index}" for index in range(5)])]))
+        # Solo dos contratos pudieron esperar a su Award; los otros tres ya se contaron
+        report = integrity.report()
+        self.assertEqual(report['contracts_without_award'], 3)
+        self.assertEqual(report['contracts_without_award_sample'], ['C2', 'C3', 'C4'])
+
+    def test_orphan_sample_is_capped(self):
+        records = [release(f"ocds-{index}", awards=[f"A{index}"], tender=False) for index in range(50)]
+        integrity = IntegrityCheck()
+        for start in range(0, 50, 10):
+            chunk = IntegrityCheck(integrity.now)
+            chunk.observe(project_rows(records[start:start + 10]))
+            integrity.merge(chunk)
+        report = integrity.report()
+        self.assertEqual(report['awards_without_procurement'], 50)
+        self.assertEqual(report['awards_without_procurement_sample'],
+                         [f"A{index}" for index in range(verification.ORPHAN_SAMPLE_SIZE)])
+
+
+if __name__ == '__main__':
+    unittest.main()
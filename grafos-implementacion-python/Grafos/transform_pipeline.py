@@ -0,0 +1,167 @@
+"""Pipeline de carga en etapas: de los payloads del staging a lotes escritos en Neo4j.
+
+1. El hilo que llama (productor) lee lotes del staging y los envía a un pool de procesos;
+   a lo sumo `max_pending` lotes se transforman a la vez.
+2. Cada proceso descomprime y decodifica el JSON, proyecta las filas, resuelve valores por
+   defecto y fechas (EntityRows.load_rows) y calcula los chequeos de integridad del lote.
+3. Los lotes transformados pasan, en el orden de lectura, por una cola de `queue_size`
+   lugares hacia `writers` hilos que los escriben, cada uno con sus propias sesiones.
+
+Si la base no da abasto la cola se llena, el productor espera y deja de alimentar al pool,
+así que en memoria hay a lo sumo unos max_pending + queue_size + writers lotes. La
+profundidad de ambas colas se registra en Instrumentation.queue_depth.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from projection import EntityRows, project_rows
+from staging import decode_payload
+from verification import PENDING_CONTRACTS_LIMIT, IntegrityCheck
+
+
+class TransformedChunk:
+    """Lote listo para escribir: `batches` tiene las filas de `UNWIND $rows` por tipo de
+    entidad y relación; `seconds` es el tiempo de transformación en el proceso del pool.
+    `deferred` son las filas de contratos cuyo Award no vino en el lote."""
+
+    def __init__(self, ocids, batches, integrity, contracts_without_award, seconds, deferred=()):
+        self.ocids = ocids
+        self.batches = batches
+        self.integrity = integrity
+        self.contracts_without_award = contracts_without_award
+        self.seconds = seconds
+        self.deferred = list(deferred)
+
+    def row_count(self):
+        return sum(len(rows) for rows in self.batches.values())
+
+
+def transform_payloads(payloads, now=None):
+    """Payloads comprimidos del staging -> TransformedChunk; corre en los procesos del pool"""
+    started = time.perf_counter()
+    records = [decode_payload(payload) for payload in payloads]
+    rows = project_rows(records)
+    integrity = IntegrityCheck(now)
+    integrity.observe(rows)
+    # Un contrato sin su Award en el lote espera a que el Award llegue en otro lote
+    deferred = [row.load_dict() for row in rows.contracts.values() if row['awardID'] not in rows.awards]
+    rows.contracts = {key: row for key, row in rows.contracts.items() if row['awardID'] in rows.awards}
+    rows.has_contract = {key: edge for key, edge in rows.has_contract.items() if edge['awardId'] in rows.awards}
+    batches = {kind: rows.load_rows(kind) for kind in EntityRows.NODE_KINDS + EntityRows.EDGE_KINDS}
+    contracts_without_award = sum(
+        1 for record in records for contract in record['compiledRelease'].get('contracts', [])
+        if not contract.get('awardID'))
+    ocids = [record['compiledRelease']['ocid'] for record in records]
+    return TransformedChunk(ocids, batches, integrity, contracts_without_award, time.perf_counter() - started,
+                            deferred)
+
+
+class TransformPipeline:
+    """Productor, pool de transformación y escritores unidos por colas acotadas.
+
+    `write(chunk)` escribe un TransformedChunk y se llama desde `writers` hilos a la vez.
+    Sin `pool` la transformación corre en el hilo productor (útil con un solo núcleo).
+    """
+
+    def __init__(self, write, pool=None, writers=2, queue_size=4, max_pending=4, metrics=None, now=None):
+        self.write = write
+        self.pool = pool
+        self.writers = max(1, writers)
+        self.queue_size = max(1, queue_size)
+        self.max_pending = max(1, max_pending)
+        self.metrics = metrics
+        self.now = now
+        # awardID -> filas de contratos que esperan ese Award (ver TransformedChunk.deferred)
+        self._deferred = {}
+        self._deferred_count = 0
+
+    def _attach_deferred(self, chunk):
+        """Agrega al lote los contratos pendientes cuyo Award trae y deja pendientes los
+        suyos, con el mismo tope que IntegrityCheck; los que quedan al final no se cargan"""
+        award_ids = {row['id'] for row in chunk.batches['awards']}
+        for award_id in [award_id for award_id in self._deferred if award_id in award_ids]:
+            contracts = self._deferred.pop(award_id)
+            self._deferred_count -= len(contracts)
+            chunk.batches['contracts'].extend(contracts)
+            chunk.batches['has_contract'].extend({'awardId': award_id, 'contractId': row['id']} for row in contracts)
+        for row in chunk.deferred:
+            if self._deferred_count < PENDING_CONTRACTS_LIMIT:
+                self._deferred.setdefault(row['awardID'], []).append(row)
+                self._deferred_count += 1
+        chunk.deferred = []
+
+    def _submit(self, payloads):
+        if self.pool is not None:
+            return self.pool.submit(transform_payloads, payloads, self.now)
+        future = Future()
+        future.set_result(transform_payloads(payloads, self.now))
+        return future
+
+    def _depth(self, name, depth, capacity):
+        if self.metrics is not None:
+            self.metrics.queue_depth(name, depth, capacity)
+
+    def run(self, batches, observe=None):
+        """Transforma y escribe cada lote de payloads de `batches`. `observe(chunk)` corre en
+        este hilo, en el orden de lectura, antes de encolar el lote para escritura.
+        Devuelve la cantidad de lotes escritos; el primer error detiene el pipeline."""
+        work = queue.Queue(maxsize=self.queue_size)
+        errors = []
+        stop = threading.Event()
+        written = []
+
+        def writer():
+            while True:
+                chunk = work.get()
+                if chunk is None:
+                    return
+                self._depth('write', work.qsize(), self.queue_size)
+                # Tras un error se sigue vaciando la cola para no bloquear al productor
+                if stop.is_set():
+                    continue
+                try:
+                    self.write(chunk)
+                    written.append(len(chunk.ocids))
+                except BaseException as error:
+                    errors.append(error)
+                    stop.set()
+
+        threads = [threading.Thread(target=writer, name=f"writer-{index}", daemon=True)
+                   for index in range(self.writers)]
+        for thread in threads:
+            thread.start()
+
+        def forward(future):
+            chunk = future.result()
+            self._attach_deferred(chunk)
+            if self.metrics is not None:
+                self.metrics.record('transform', chunk.seconds, rows_in=len(chunk.ocids), rows_out=chunk.row_count())
+            if observe is not None:
+                observe(chunk)
+            self._depth('write', work.qsize(), self.queue_size)
+            work.put(chunk)
+
+        pending = deque()
+        try:
+            for payloads in batches:
+                if stop.is_set():
+                    break
+                pending.append(self._submit(payloads))
+                self._depth('transform', len(pending), self.max_pending)
+                if len(pending) >= self.max_pending:
+                    forward(pending.popleft())
+            while pending and not stop.is_set():
+                forward(pending.popleft())
+        finally:
+            for future in pending:
+                future.cancel()
+            for _ in threads:
+                work.put(None)
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
+        return len(written)
@@ -0,0 +1,152 @@
+"""Verificación de la carga sin volver a recorrer la base.
+
+Los chequeos de integridad se calculan sobre las filas proyectadas de cada lote, los
+contadores de escritura salen del resumen de cada transacción y los conteos finales se
+piden a Neo4j en una sola consulta respaldada por el count store.
+"""
+import json
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from projection import EPOCH, MICROSECOND
+
+COUNTER_FIELDS = ('nodes_created', 'nodes_deleted', 'relationships_created', 'relationships_deleted',
+                  'properties_set', 'labels_added')
+
+
+class WriteCounters:
+    """Suma los contadores de ResultSummary por etapa; se comparte entre hilos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+
+    def add(self, key, counters):
+        with self._lock:
+            totals = self._totals[key]
+            for field in COUNTER_FIELDS:
+                totals[field] += getattr(counters, field, 0)
+
+    def as_dict(self):
+        with self._lock:
+            return {key: dict(totals) for key, totals in self._totals.items()}
+
+
+# Ids huérfanos que se guardan como muestra en el reporte; del resto solo se cuentan
+ORPHAN_SAMPLE_SIZE = 20
+# Contratos cuyo Award no vino en su lote que se esperan en lotes posteriores; pasado
+# este tope se dan por huérfanos (transform_pipeline usa el mismo tope para cargarlos)
+PENDING_CONTRACTS_LIMIT = 10000
+
+
+def _sample(sample, ids):
+    sample.extend(ids[:ORPHAN_SAMPLE_SIZE - len(sample)])
+
+
+class IntegrityCheck:
+    """Chequeos de integridad sobre projection.EntityRows, lote a lote.
+
+    Los registros llegan deduplicados por OCID y sus ítems y adjudicaciones son del propio
+    registro, así que los huérfanos se resuelven dentro de cada lote: entre lotes solo se
+    acumulan conteos y una muestra acotada de ids. Un contrato puede apuntar a un Award
+    de otro registro: queda pendiente (hasta PENDING_CONTRACTS_LIMIT) y se resuelve si el
+    Award llega en un lote posterior.
+    """
+
+    def __init__(self, now=None):
+        self.now = now or datetime.now(timezone.utc)
+        self._now_micros = (self.now - EPOCH) // MICROSECOND
+        self.procurements = 0
+        self.procurements_without_buyer = 0
+        self.missing_fields = 0
+        self.future_dates = 0
+        self.contracts_without_award = 0
+        self.orphan_items = 0
+        self.orphan_awards = 0
+        self.orphan_item_sample = []
+        self.orphan_award_sample = []
+        self.orphan_contract_sample = []
+        # awardID -> contratos que lo esperan; ids de Award del último lote observado
+        self._pending_contracts = {}
+        self._pending_count = 0
+        self._chunk_awards = frozenset()
+
+    def observe(self, rows):
+        published = {edge['ocid'] for edge in rows.published.values() if edge['buyerId'] in rows.buyers}
+        for ocid, procurement in rows.procurements.items():
+            self.procurements += 1
+            if ocid not in published:
+                self.procurements_without_buyer += 1
+            if procurement.publishedMicros is None or any(
+                    procurement[field] is None for field in ('title', 'procurementMethod', 'mainCategory')):
+                self.missing_fields += 1
+            if procurement.publishedMicros is not None and procurement.publishedMicros > self._now_micros:
+                self.future_dates += 1
+
+        linked_items = {edge['itemId'] for edge in rows.includes.values() if edge['ocid'] in rows.procurements}
+        orphan_items = [item_id for item_id in rows.items if item_id not in linked_items]
+        linked_awards = {edge['awardId'] for edge in rows.has_award.values() if edge['ocid'] in rows.procurements}
+        orphan_awards = [award_id for award_id in rows.awards if award_id not in linked_awards]
+        self.orphan_items += len(orphan_items)
+        self.orphan_awards += len(orphan_awards)
+        _sample(self.orphan_item_sample, orphan_items)
+        _sample(self.orphan_award_sample, orphan_awards)
+        self._resolve(rows.awards)
+        self._chunk_awards = frozenset(rows.awards)
+        self._defer([(contract['awardID'], contract_id) for contract_id, contract in rows.contracts.items()
+                     if contract['awardID'] not in rows.awards])
+
+    def _resolve(self, award_ids):
+        """Descarta los contratos pendientes cuyo Award está en `award_ids`"""
+        for award_id in [award_id for award_id in self._pending_contracts if award_id in award_ids]:
+            self._pending_count -= len(self._pending_contracts.pop(award_id))
+
+    def _defer(self, contracts):
+        for award_id, contract_id in contracts:
+            if self._pending_count < PENDING_CONTRACTS_LIMIT:
+                self._pending_contracts.setdefault(award_id, []).append(contract_id)
+                self._pending_count += 1
+            else:
+                self.contracts_without_award += 1
+                _sample(self.orphan_contract_sample, [contract_id])
+
+    def merge(self, other):
+        """Suma los chequeos de `other`, calculados sobre otro lote (p. ej. en otro proceso)"""
+        self.procurements += other.procurements
+        self.procurements_without_buyer += other.procurements_without_buyer
+        self.missing_fields += other.missing_fields
+        self.future_dates += other.future_dates
+        self.contracts_without_award += other.contracts_without_award
+        _sample(self.orphan_contract_sample, other.orphan_contract_sample)
+        # `other` es posterior: su lote puede traer el Award de contratos pendientes
+        self._resolve(other._chunk_awards)
+        self._defer([(award_id, contract_id) for award_id, contract_ids in other._pending_contracts.items()
+                     for contract_id in contract_ids])
+        self.orphan_items += other.orphan_items
+        self.orphan_awards += other.orphan_awards
+        _sample(self.orphan_item_sample, other.orphan_item_sample)
+        _sample(self.orphan_award_sample, other.orphan_award_sample)
+
+    def report(self):
+        """Los contratos que siguen pendientes al final se cuentan como sin Award"""
+        pending = [contract_id for contract_ids in self._pending_contracts.values() for contract_id in contract_ids]
+        contract_sample = list(self.orphan_contract_sample)
+        _sample(contract_sample, pending)
+        return {
+            'procurements_checked': self.procurements,
+            'procurements_without_buyer': self.procurements_without_buyer,
+            'items_without_procurement': self.orphan_items,
+            'items_without_procurement_sample': self.orphan_item_sample,
+            'awards_without_procurement': self.orphan_awards,
+            'awards_without_procurement_sample': self.orphan_award_sample,
+            'contracts_without_award': self.contracts_without_award + self._pending_count,
+            'contracts_without_award_sample': contract_sample,
+            'procurements_missing_fields': self.missing_fields,
+            'procurements_with_future_dates': self.future_dates,
+        }
+
+
+def write_report(path, report):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2, default=str)
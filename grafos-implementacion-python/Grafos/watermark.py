@@ -0,0 +1,74 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+# SEACE publica las fechas con la zona horaria de Lima
+LIMA_TZ = timezone(timedelta(hours=-5))
+WATERMARK_FILE = 'watermarks.json'
+
+
+def parse_timestamp(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=LIMA_TZ)
+
+
+def record_timestamp(record):
+    """Fecha de última modificación de un registro: la mayor entre `date` y `publishedDate`"""
+    release = record.get('compiledRelease', {})
+    timestamps = [parse_timestamp(release.get('date')), parse_timestamp(release.get('publishedDate'))]
+    timestamps = [ts for ts in timestamps if ts is not None]
+    return max(timestamps) if timestamps else None
+
+
+class WatermarkStore:
+    """Marca de agua (high-water mark) por fuente, persistida en JSON"""
+
+    def __init__(self, path):
+        self.path = path
+        self.marks = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                self.marks = json.load(file)
+
+    def get(self, source_id):
+        return parse_timestamp(self.marks.get(source_id))
+
+    def set(self, source_id, timestamp):
+        self.marks[source_id] = timestamp.isoformat()
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(self.marks, file, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class DeltaFilter:
+    """Deja pasar solo los registros posteriores a la marca de agua y registra la nueva"""
+
+    def __init__(self, watermark):
+        self.watermark = watermark
+        self.new_watermark = watermark
+        self.seen = 0
+        self.emitted = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, records):
+        delta = []
+        for record in records:
+            timestamp = record_timestamp(record)
+            if self.watermark is not None and timestamp is not None and timestamp <= self.watermark:
+                continue
+            delta.append(record)
+            if timestamp is not None:
+                with self._lock:
+                    if self.new_watermark is None or timestamp > self.new_watermark:
+                        self.new_watermark = timestamp
+        with self._lock:
+            self.seen += len(records)
+            self.emitted += len(delta)
+        return delta